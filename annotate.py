@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from gestures import ACTIONS, HandArray
+from video_pipeline import probe_video
+
+# Headless batch annotation of recorded sessions:
+#
+#   python annotate.py session1.mp4 session2.mp4 --out annotations/ --workers 8
+#
+# Each video is split into frame ranges that a process pool works through, one
+# MediaPipe Hands instance per worker process. Results are written per video as
+# <out>/<name>.npz holding one array per column (see load_annotations); inputs
+# that share a file name get a short hash of their path appended.
+
+DEFAULT_CHUNK = 600  # frames per task; each task pays one seek, so not too small
+
+_hands = None       # this worker process's Hands instance
+_init_error = None
+
+
+def mediapipe_hands(max_num_hands: int, min_detection_confidence: float):
+    from gesture_worker import load_mediapipe
+    return load_mediapipe().Hands(max_num_hands=max_num_hands, min_detection_confidence=min_detection_confidence)
+
+
+def _init_worker(max_num_hands: int, min_detection_confidence: float, hands_factory):
+    # Failures are reported per task; raising here would make the pool respawn workers forever
+    global _hands, _init_error
+    try:
+        cv2.setNumThreads(1)  # parallelism comes from the pool, not from inside each worker
+        _hands = hands_factory(max_num_hands, min_detection_confidence)
+    except Exception as e:
+        _init_error = f"hand tracking unavailable: {e}"
+
+
+def split_ranges(frame_count: int, chunk: int):
+    # [(start, end)], with the last range open-ended (end=None) so frames past a
+    # low container frame count are still annotated
+    chunk = max(1, int(chunk))
+    starts = list(range(0, max(frame_count, 1), chunk))
+    return [(s, s + chunk) for s in starts[:-1]] + [(starts[-1], None)]
+
+
+def _annotate_range(task):
+    path, start = task[:2]
+    if _hands is None:
+        return path, start, None, _init_error
+    try:
+        return path, start, _annotate(*task), None
+    except Exception as e:
+        return path, start, None, str(e)
+
+
+def _annotate(path, start, end, stride, max_num_hands):
+    # Tracking state must not carry over from whatever range this worker did last
+    reset = getattr(_hands, "reset", None)
+    if reset is not None:
+        reset()
+
+    frames, landmarks, fingers, labels = [], [], [], []
+    cap = cv2.VideoCapture(path)
+    try:
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while end is None or index < end:
+            if index % stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # Same orientation and colour order as the live worker
+            rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+            results = _hands.process(rgb)
+            hands = (results.multi_hand_landmarks if results else None) or []
+
+            points = np.full((max_num_hands, 21, 3), np.nan, dtype=np.float32)
+            up = np.full((max_num_hands, 5), -1, dtype=np.int8)
+            label = -1
+            if hands:
+                batch = HandArray.from_hands(hands[:max_num_hands])
+                up[:len(batch)], codes = batch.classify()
+                points[:len(batch)] = batch.points
+                label = int(codes[-1])  # the player acts on the last hand reported
+            frames.append(index)
+            landmarks.append(points)
+            fingers.append(up)
+            labels.append(label)
+            index += 1
+    finally:
+        cap.release()
+
+    return {
+        "frame": np.asarray(frames, dtype=np.int32),
+        "landmarks": np.asarray(landmarks, dtype=np.float32).reshape(-1, max_num_hands, 21, 3),
+        "fingers": np.asarray(fingers, dtype=np.int8).reshape(-1, max_num_hands, 5),
+        "label": np.asarray(labels, dtype=np.int8),
+    }
+
+
+def output_paths(out_dir: str, video_paths) -> dict:
+    # {video path: .npz path}. Recorded sessions often reuse names (day1/cam.mp4,
+    # day2/cam.mp4), so those get a hash of their absolute path instead of
+    # overwriting each other; unique names are kept as they are.
+    stems = {path: os.path.splitext(os.path.basename(path))[0] for path in video_paths}
+    sources = {}
+    for path, stem in stems.items():
+        sources.setdefault(os.path.normcase(stem), set()).add(os.path.abspath(path))
+    targets = {}
+    for path, stem in stems.items():
+        if len(sources[os.path.normcase(stem)]) > 1:
+            stem += "-" + hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+        targets[path] = os.path.join(out_dir, stem + ".npz")
+    return targets
+
+
+def _write(target: str, path: str, info, chunks, max_num_hands: int, stride: int):
+    columns = {}
+    for name in ("frame", "landmarks", "fingers", "label"):
+        columns[name] = np.concatenate([chunks[start][name] for start in sorted(chunks)])
+    fps = info.fps or 30.0
+    columns["time"] = (columns["frame"] / fps).astype(np.float32)
+    meta = {"source": os.path.abspath(path), "fps": fps, "width": info.width, "height": info.height,
+            "max_num_hands": max_num_hands, "stride": stride, "actions": ACTIONS}
+    columns["meta"] = np.asarray(json.dumps(meta))
+    np.savez(target + ".part.npz", **columns)
+    os.replace(target + ".part.npz", target)
+    return target, len(columns["frame"])
+
+
+def annotate_videos(paths, out_dir: str, workers: int = None, chunk: int = DEFAULT_CHUNK, stride: int = 1,
+                    max_num_hands: int = 1, min_detection_confidence: float = 0.5, hands_factory=None):
+    # Returns {video path: output path}; videos that cannot be opened are skipped.
+    # hands_factory(max_num_hands, min_detection_confidence) stands in for MediaPipe
+    # and must be picklable (a module-level function).
+    workers = max(1, workers or os.cpu_count() or 1)
+    stride = max(1, int(stride))
+    os.makedirs(out_dir, exist_ok=True)
+    targets = output_paths(out_dir, paths)
+
+    tasks, infos, remaining = [], {}, {}
+    for path in paths:
+        try:
+            info = probe_video(path)
+        except Exception as e:
+            print(f"⚠️ Skipping {os.path.basename(path)}: {e}")
+            continue
+        infos[path] = info
+        ranges = split_ranges(info.frame_count, chunk)
+        remaining[path] = len(ranges)
+        tasks += [(path, start, end, stride, max_num_hands) for start, end in ranges]
+
+    written = {}
+    failed = set()
+    chunks = {path: {} for path in infos}
+    t0 = time.perf_counter()
+    total_frames = 0
+    # spawn: workers must not inherit the parent's OpenCV/ffmpeg threads
+    ctx = multiprocessing.get_context("spawn")
+    initargs = (max_num_hands, min_detection_confidence, hands_factory or mediapipe_hands)
+    with ctx.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        for path, start, columns, error in pool.imap_unordered(_annotate_range, tasks):
+            remaining[path] -= 1
+            if error is not None:
+                if path not in failed:
+                    print(f"⚠️ Annotation failed for {os.path.basename(path)} at frame {start}: {error}")
+                failed.add(path)
+            else:
+                chunks[path][start] = columns
+            if remaining[path] == 0 and path in failed:
+                chunks.pop(path, None)
+            elif remaining[path] == 0:
+                target, frames = _write(targets[path], path, infos[path], chunks.pop(path), max_num_hands, stride)
+                total_frames += frames
+                written[path] = target
+                print(f"✅ {os.path.basename(path)}: {frames} frames -> {target}")
+
+    elapsed = time.perf_counter() - t0
+    if elapsed > 0 and total_frames:
+        print(f"⏱️ {total_frames} frames in {elapsed:.1f}s ({total_frames / elapsed:.1f} frames/s, {workers} workers)")
+    return written
+
+
+def load_annotations(path: str):
+    # {column: array} plus "meta" as a dict
+    with np.load(path) as data:
+        columns = {name: data[name] for name in data.files}
+    columns["meta"] = json.loads(str(columns["meta"]))
+    return columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Annotate recorded videos with hand landmarks and gestures")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--out", default="annotations", help="output directory, one .npz per video")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="frames per task")
+    parser.add_argument("--stride", type=int, default=1, help="annotate every Nth frame")
+    parser.add_argument("--max-hands", type=int, default=1)
+    parser.add_argument("--min-confidence", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    written = annotate_videos(args.videos, args.out, workers=args.workers, chunk=args.chunk, stride=args.stride,
+                              max_num_hands=args.max_hands, min_detection_confidence=args.min_confidence)
+    return 0 if len(written) == len(args.videos) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import math
+
+import numpy as np
+
+# Output-side processing for FFmpegAudioPlayer. Stages work in place on a
+# float32 (frames, channels) block and must not allocate: every buffer they
+# need is created in prepare(), and the chain skips itself entirely while no
+# stage has anything to do.
+
+
+def db_to_gain(db: float) -> float:
+    return 10.0 ** (float(db) / 20.0)
+
+
+def gain_to_db(gain: float, floor: float = -120.0) -> float:
+    return 20.0 * math.log10(gain) if gain > 0 else floor
+
+
+# === Stages ===
+class DSPStage:
+    enabled = True
+    modifies = True  # False for analysis-only stages; the chain then skips the write-back
+
+    def prepare(self, block_frames: int, channels: int, full_scale: float):
+        pass
+
+    def active(self) -> bool:
+        # False lets the block through untouched (and, if no stage is active, unconverted)
+        return self.enabled
+
+    def process(self, work, frames: int):
+        raise NotImplementedError
+
+
+class GainRamp(DSPStage):
+    # Multiplies by `target`, moving there from the current gain by at most
+    # `step` per block along a linear ramp, so gain changes never click
+    def __init__(self, gain: float = 1.0, ramp_seconds: float = 0.02, samplerate: int = 44100):
+        self.gain = float(gain)
+        self.target = float(gain)
+        self.ramp_seconds = float(ramp_seconds)
+        self.samplerate = int(samplerate)
+        self.step = 1.0
+        self._ramp = None
+        self._gains = None
+
+    def prepare(self, block_frames: int, channels: int, full_scale: float):
+        self.step = block_frames / max(1.0, self.ramp_seconds * self.samplerate)
+        # Full (frames, channels) shape: multiplying by a broadcast column makes numpy buffer
+        ramp = np.arange(1, block_frames + 1, dtype=np.float32) / block_frames
+        self._ramp = np.repeat(ramp[:, None], channels, axis=1)
+        self._gains = np.empty((block_frames, channels), dtype=np.float32)
+
+    def set_target(self, gain: float):
+        self.target = max(0.0, float(gain))
+
+    def jump(self, gain: float):
+        # Set the current gain without a ramp, e.g. 0 so a new position fades in
+        self.gain = max(0.0, float(gain))
+
+    def active(self) -> bool:
+        return self.enabled and not (self.gain == 1.0 and self.target == 1.0)
+
+    def process(self, work, frames: int):
+        current, target = self.gain, self.target
+        if target > current:
+            new = min(target, current + self.step)
+        else:
+            new = max(target, current - self.step)
+        self.gain = new
+        if current == new:
+            work *= new
+            return
+        whole = frames == len(self._gains)
+        gains = self._gains if whole else self._gains[:frames]
+        np.multiply(self._ramp if whole else self._ramp[:frames], np.float32(new - current), out=gains)
+        gains += np.float32(current)
+        work *= gains
+
+
+class LoudnessGain(GainRamp):
+    # Per-track normalization gain (see loudness.py). Ramps slowly so a
+    # measurement that lands mid-track eases in instead of jumping.
+    def __init__(self, samplerate: int = 44100, ramp_seconds: float = 0.5):
+        super().__init__(1.0, ramp_seconds, samplerate)
+        self.gain_db = 0.0
+
+    def set_gain_db(self, db: float):
+        self.gain_db = float(db)
+        self.set_target(db_to_gain(db))
+
+
+class Meter(DSPStage):
+    # Peak and RMS per channel over `window` seconds, published for the UI
+    # through a double buffer: the writer fills the idle half, then bumps seq
+    modifies = False
+
+    def __init__(self, window: float = 0.05, samplerate: int = 44100):
+        self.window = float(window)
+        self.samplerate = int(samplerate)
+        self.window_frames = 1
+        self.full_scale = 1.0
+        self.seq = 0
+
+    def prepare(self, block_frames: int, channels: int, full_scale: float):
+        self.window_frames = max(block_frames, int(self.window * self.samplerate))
+        self.full_scale = float(full_scale)
+        self._scratch = np.empty((block_frames, channels), dtype=np.float32)
+        self._block = np.empty(channels, dtype=np.float32)
+        self._peak = np.zeros(channels, dtype=np.float32)
+        self._sumsq = np.zeros(channels, dtype=np.float64)
+        self._count = 0
+        self._published = np.zeros((2, 2, channels), dtype=np.float32)  # [half][peak, rms][channel]
+
+    def process(self, work, frames: int):
+        scratch = self._scratch if frames == len(self._scratch) else self._scratch[:frames]
+        np.abs(work, out=scratch)
+        np.maximum.reduce(scratch, axis=0, out=self._block)
+        np.maximum(self._peak, self._block, out=self._peak)
+        np.square(work, out=scratch)
+        np.add.reduce(scratch, axis=0, out=self._block)
+        self._sumsq += self._block
+        self._count += frames
+        if self._count >= self.window_frames:
+            half = self._published[(self.seq + 1) % 2]
+            np.copyto(half[0], self._peak)
+            np.divide(self._sumsq, self._count, out=half[1], casting="unsafe")
+            np.sqrt(half[1], out=half[1])
+            self.seq += 1
+            self._peak.fill(0.0)
+            self._sumsq.fill(0.0)
+            self._count = 0
+
+    def levels(self):
+        # ([peak dBFS per channel], [rms dBFS per channel]) of the last full window
+        peak, rms = self._published[self.seq % 2].tolist()
+        scale = self.full_scale
+        return ([gain_to_db(p / scale) for p in peak], [gain_to_db(r / scale) for r in rms])
+
+
+# === Chain ===
+class DSPChain:
+    # Runs the stages in order over one output block. int16 blocks are
+    # converted once into a float32 scratch buffer and back (clipped); float32
+    # blocks are processed where they are.
+    def __init__(self, block_frames: int, channels: int, stages=(), dtype=np.int16):
+        self.block_frames = int(block_frames)
+        self.channels = int(channels)
+        self.dtype = np.dtype(dtype)
+        self.full_scale = 32768.0 if self.dtype == np.int16 else 1.0
+        self._work = np.empty((self.block_frames, self.channels), dtype=np.float32)
+        self._low, self._high = np.float32(-32768), np.float32(32767)
+        self.stages = []
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage, index: int = None):
+        stage.prepare(self.block_frames, self.channels, self.full_scale)
+        self.stages.insert(len(self.stages) if index is None else index, stage)
+        return stage
+
+    def process(self, block, frames: int):
+        if frames > self.block_frames:
+            # PortAudio honours a fixed blocksize, but never write past the scratch buffers
+            return
+        for stage in self.stages:
+            if stage.active():
+                break
+        else:
+            return
+        whole = frames == self.block_frames
+        if block.dtype == np.float32:
+            work = block if whole else block[:frames]
+        else:
+            work = self._work if whole else self._work[:frames]
+            np.copyto(work, block if whole else block[:frames])
+        modified = False
+        for stage in self.stages:
+            if stage.active():
+                stage.process(work, frames)
+                modified = modified or stage.modifies
+        if modified and block.dtype != np.float32:
+            # maximum/minimum with preallocated scalars; np.clip converts its bounds on every call
+            np.maximum(work, self._low, out=work)
+            np.minimum(work, self._high, out=work)
+            np.copyto(block if whole else block[:frames], work, casting="unsafe")
@@ -0,0 +1,543 @@
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from audio_dsp import DSPChain, GainRamp, LoudnessGain, Meter
+from perf import startup
+from playback_clock import clamp_rate
+
+# Importing sounddevice initialises PortAudio, which enumerates every device;
+# both it and the ffmpeg lookup are deferred until first use or warm-up
+sd = None
+_sounddevice_loaded = False
+_ffmpeg_exe = None
+_load_lock = threading.Lock()
+
+
+def load_sounddevice():
+    global sd, _sounddevice_loaded
+    with _load_lock:
+        if not _sounddevice_loaded:
+            with startup.phase("audio_devices"):
+                try:
+                    import sounddevice
+                    sounddevice.query_devices(kind="output")
+                    sd = sounddevice
+                except Exception:  # PortAudio or an output device missing, e.g. headless CI boxes
+                    sd = None
+            _sounddevice_loaded = True
+    return sd
+
+
+def find_ffmpeg():
+    global _ffmpeg_exe
+    if _ffmpeg_exe is None:
+        with startup.phase("ffmpeg_lookup"):
+            try:
+                import imageio_ffmpeg
+                _ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+            except Exception:
+                _ffmpeg_exe = "ffmpeg"
+    return _ffmpeg_exe
+
+
+def spawn_pcm_decoder(ffmpeg_exe: str, file_path: str, start_time: float, samplerate: int, channels: int,
+                      tempo: float = 1.0):
+    # tempo != 1 time-stretches with atempo, which keeps the pitch (0.5-100x in one stage)
+    args = [
+        ffmpeg_exe,
+        "-loglevel", "quiet",
+        "-ss", f"{max(0.0, float(start_time))}",
+        "-i", file_path,
+        "-vn",
+    ]
+    if tempo != 1.0:
+        args += ["-af", f"atempo={float(tempo):.6f}"]
+    args += [
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "-ac", str(channels),
+        "-ar", str(samplerate),
+        "pipe:1",
+    ]
+    return subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=0,
+        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+    )
+
+
+def kill_process(proc):
+    if proc is None:
+        return
+    # Decoders hold no state worth flushing, so skip the polite terminate()
+    try:
+        proc.kill()
+        proc.wait(timeout=0.5)
+    except Exception:
+        pass
+
+
+# === Decoded PCM cache ===
+class PCMCache:
+    # Decodes the whole track once, in the background, into a memory-mapped temp
+    # file. Everything in [0, decoded) can be served without touching ffmpeg.
+    def __init__(self, ffmpeg_exe: str, file_path: str, samplerate: int, channels: int, duration: float):
+        self.ffmpeg_exe = ffmpeg_exe
+        self.file_path = file_path
+        self.sr = int(samplerate)
+        self.channels = int(channels)
+        self.capacity = int((float(duration) + 1.0) * self.sr)
+        self.decoded = 0
+        self.complete = False
+        self.proc = None
+        self.thread = None
+        self.stop_flag = threading.Event()
+
+        fd, self.path = tempfile.mkstemp(prefix="gesture_player_pcm_", suffix=".s16")
+        os.close(fd)
+        self.data = np.memmap(self.path, dtype=np.int16, mode="w+", shape=(self.capacity, self.channels))
+
+    def start(self):
+        self.thread = threading.Thread(target=self._fill, daemon=True)
+        self.thread.start()
+
+    def _fill(self):
+        frame_bytes = 2 * self.channels
+        raw = memoryview(self.data.reshape(-1).view(np.uint8))
+        try:
+            self.proc = spawn_pcm_decoder(self.ffmpeg_exe, self.file_path, 0.0, self.sr, self.channels)
+            offset = 0
+            pending = 0  # bytes of a partially received frame
+            while not self.stop_flag.is_set() and offset < len(raw):
+                n = self.proc.stdout.readinto(raw[offset:offset + 65536])
+                if not n:
+                    break
+                offset += n
+                pending = offset % frame_bytes
+                self.decoded = (offset - pending) // frame_bytes
+        except Exception as e:
+            if not self.stop_flag.is_set():
+                print(f"⚠️ PCM cache error: {e}")
+        finally:
+            self.complete = True
+            kill_process(self.proc)
+            self.proc = None
+
+    def covers(self, start_frame: int, frames: int) -> bool:
+        return start_frame + frames <= self.decoded or (self.complete and start_frame < self.decoded)
+
+    def read(self, start_frame: int, frames: int):
+        end = min(start_frame + frames, self.decoded)
+        if start_frame >= end:
+            return None
+        return self.data[start_frame:end]
+
+    def close(self):
+        self.stop_flag.set()
+        kill_process(self.proc)
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        self.data = None
+        try:
+            os.remove(self.path)
+        except Exception:
+            pass
+
+
+# === Lock-free PCM ring ===
+class AudioRing:
+    # Single-producer/single-consumer ring of int16 frames. write_pos is only
+    # advanced by the feeder and read_pos only by the audio callback; both are
+    # plain ints that grow forever, so publishing one is a single atomic store.
+    # A flush is a request (flush_seq, flush_pos) the consumer applies itself.
+    def __init__(self, capacity_frames: int, channels: int):
+        self.capacity = int(capacity_frames)
+        self.data = np.zeros((self.capacity, int(channels)), dtype=np.int16)
+        self.write_pos = 0
+        self.read_pos = 0
+        self.flush_pos = 0
+        self.flush_seq = 0
+
+    def readable(self) -> int:
+        return self.write_pos - self.read_pos
+
+    def writable(self) -> int:
+        return self.capacity - (self.write_pos - self.read_pos)
+
+    def write_region(self, frames: int):
+        # Largest contiguous writable view, up to `frames` long
+        start = self.write_pos % self.capacity
+        n = min(frames, self.writable(), self.capacity - start)
+        return self.data[start:start + n]
+
+    def commit(self, frames: int):
+        self.write_pos += frames
+
+    def request_flush(self):
+        # Producer side: everything written so far is stale
+        self.flush_pos = self.write_pos
+        self.flush_seq += 1
+
+    def read_into(self, out, read_pos: int, frames: int):
+        start = read_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        out[:first] = self.data[start:start + first]
+        if first < frames:
+            out[first:frames] = self.data[:frames - first]
+
+
+# === FFmpeg Audio Player ===
+class FFmpegAudioPlayer:
+    # PortAudio pulls blocks from an AudioRing in a callback; a feeder thread
+    # keeps the ring topped up from the PCM cache or, outside it, from a live
+    # ffmpeg. The output stream stays open for the life of the player: pausing
+    # outputs silence and seeking flushes the ring. With a pcm_source (e.g. the
+    # SharedPCM of ffmpeg_backend's single-pass decoder) that takes the place
+    # of the cache and the player never spawns a decoder of its own. Away from
+    # 1x, audio always comes from a live ffmpeg running atempo; one output
+    # frame then stands for `rate` media frames.
+    def __init__(self, file_path: str, samplerate: int = 44100, channels: int = 2, duration: float = 0.0,
+                 block_frames: int = 512, buffer_seconds: float = 0.25, ramp_seconds: float = 0.02,
+                 stream_factory=None, pcm_source=None):
+        self.file_path = file_path
+        self.stream_factory = stream_factory
+        self.ffmpeg_exe = find_ffmpeg()
+        self.sr = int(samplerate)
+        self.channels = int(channels)
+        self.duration = float(duration or 0.0)
+        self.block_frames = int(block_frames)
+        self.proc = None        # live decoder, only used outside the cached range
+        self.proc_pos = -1      # frame the live decoder will produce next
+        self.proc_rate = 1.0    # tempo the live decoder was started with
+        self.stream = None
+        self.thread = None
+        self.cache = None
+        self.pcm_source = pcm_source
+        self.stop_flag = threading.Event()
+        self.wake = threading.Event()
+        self.volume = 1.0
+        self.muted = False
+        self.lock = threading.Lock()
+        self.rate = 1.0            # tempo of the segment being fed
+        self.requested_rate = 1.0  # applied at the next seek
+        self._rate_residual = 0.0  # fraction of a media frame carried between blocks
+
+        self.ring = AudioRing(max(self.block_frames * 2, int(buffer_seconds * self.sr)), self.channels)
+        self.at_end = False
+        # (ring position, media frame, rate, seek generation) of the segment started by the last seek
+        self.timeline = (0, 0, 1.0, 0)
+        self.seen_flush_seq = 0
+
+        # Output processing, run in the callback on each block (see audio_dsp):
+        # per-track loudness normalization, then volume/mute, then the level meter.
+        # Every buffer is preallocated so steady-state output never allocates.
+        self.loudness = LoudnessGain(self.sr)
+        self.fader = GainRamp(1.0, ramp_seconds, self.sr)
+        self.meter = Meter(samplerate=self.sr)
+        self.dsp = DSPChain(self.block_frames, self.channels, [self.loudness, self.fader, self.meter])
+
+        # Requests from the UI thread, applied by the feeder
+        self.paused = True
+        self.seek_target = None
+        self.seek_generation = 0  # bumped by every seek(); the clock ignores older segments
+        self.fresh = True  # ring still holds the start of the track, untouched
+
+        # Audio clock: (media time of the last block handed to the device, monotonic time it
+        # hits the DAC, rate, seek generation)
+        self.position = 0
+        self.write_mark = None
+        self.stall_timeout = 0.5
+
+        self.underruns = 0          # callbacks that found the ring short of a full block
+        self.device_underflows = 0  # underflows reported by PortAudio itself
+        self.seeks_cached = 0
+        self.seeks_respawned = 0
+
+    def is_open(self) -> bool:
+        return self.stream is not None and self.is_primed()
+
+    def is_primed(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def prime(self):
+        # Start decoding and fill the ring from the top of the track without touching
+        # the output device, so a later start(0) has audio ready immediately
+        if self.is_primed():
+            return
+        self.stop_flag.clear()
+        if self.pcm_source is not None:
+            self.cache = self.pcm_source
+        elif self.cache is None and self.duration > 0:
+            try:
+                self.cache = PCMCache(self.ffmpeg_exe, self.file_path, self.sr, self.channels, self.duration)
+                self.cache.start()
+            except Exception as e:
+                print(f"⚠️ PCM cache disabled: {e}")
+                self.cache = None
+        self.thread = threading.Thread(target=self._pump, daemon=True)
+        self.thread.start()
+
+    def open(self):
+        if self.is_open():
+            return
+        self.prime()
+        factory = self.stream_factory
+        if factory is None and load_sounddevice() is not None:
+            factory = sd.OutputStream
+        if factory is None:
+            raise RuntimeError("no audio output available (PortAudio not found)")
+        self.stream = factory(
+            samplerate=self.sr,
+            channels=self.channels,
+            dtype="int16",
+            blocksize=self.block_frames,
+            latency="low",
+            callback=self._callback,
+        )
+        self.stream.start()
+
+    def start(self, start_time: float = 0.0):
+        # Opens the stream on first use; afterwards this is just seek + resume
+        try:
+            self.open()
+            if start_time > 0 or not self.fresh or self.requested_rate != self.rate:
+                self.seek(start_time)
+            self.resume()
+        except Exception as e:
+            print(f"⚠️ Audio start failed: {e}")
+            self.stop()
+
+    def seek(self, seconds: float):
+        self.fresh = False
+        with self.lock:
+            self.seek_target = max(0.0, float(seconds))
+            self.seek_generation += 1
+            self.write_mark = None
+        self.fader.jump(0.0)  # fade the new position in rather than jumping into it
+        self.wake.set()
+
+    def set_rate(self, rate: float, seconds: float = None):
+        # Takes effect at the next seek; pass the current media time to switch right away
+        self.requested_rate = clamp_rate(rate)
+        if seconds is not None and self.requested_rate != self.rate:
+            self.seek(seconds)
+
+    def pause(self):
+        self.paused = True
+        self.write_mark = None
+        self.fader.jump(0.0)
+
+    def resume(self):
+        self.paused = False
+        self.fresh = False
+        self.wake.set()
+
+    # ----- consumer (PortAudio thread) -----
+    def _callback(self, outdata, frames, time_info, status):
+        if status.output_underflow:
+            self.device_underflows += 1
+        ring = self.ring
+
+        flush_seq = ring.flush_seq
+        if flush_seq != self.seen_flush_seq:
+            self.seen_flush_seq = flush_seq
+            ring.read_pos = max(ring.read_pos, ring.flush_pos)
+
+        if self.paused:
+            outdata.fill(0)
+            return
+
+        read_pos = ring.read_pos
+        n = min(frames, ring.readable())
+        if n > 0:
+            ring.read_into(outdata, read_pos, n)
+            ring.read_pos = read_pos + n
+        if n < frames:
+            outdata[n:].fill(0)
+            if not self.at_end:
+                self.underruns += 1
+
+        self.fader.set_target(0.0 if self.muted else self.volume)
+        self.dsp.process(outdata, frames)
+
+        # Until the feeder has flushed the ring for the latest seek, what is playing
+        # belongs to the old position and must not move the clock
+        base_pos, base_frame, rate, generation = self.timeline
+        if n > 0 and read_pos >= base_pos and generation == self.seek_generation:
+            try:
+                dac_delay = max(0.0, time_info.outputBufferDacTime - time_info.currentTime)
+            except Exception:
+                dac_delay = 0.0
+            if dac_delay <= 0.0 or dac_delay > 1.0:
+                dac_delay = float(self.stream.latency) if self.stream is not None else 0.0
+            media_time = (base_frame + (read_pos - base_pos) * rate) / self.sr
+            self.write_mark = (media_time, time.monotonic() + dac_delay, rate, generation)
+
+    # ----- producer (feeder thread) -----
+    def _pump(self):
+        frame_bytes = 2 * self.channels
+        ring = self.ring
+        try:
+            while not self.stop_flag.is_set():
+                with self.lock:
+                    target, self.seek_target = self.seek_target, None
+                    generation = self.seek_generation
+
+                if target is not None:
+                    self.position = int(target * self.sr)
+                    self.rate = self.requested_rate
+                    self._rate_residual = 0.0
+                    if self.rate == 1.0 and self.cache is not None and self.cache.covers(self.position,
+                                                                                        self.block_frames):
+                        self.seeks_cached += 1
+                    elif self.proc_pos != self.position or self.proc_rate != self.rate:
+                        self.seeks_respawned += 1
+                    # Publish the new timeline before the flush so the callback never
+                    # maps fresh frames to the old position
+                    self.timeline = (ring.write_pos, self.position, self.rate, generation)
+                    ring.request_flush()
+                    self.at_end = False
+
+                if self.at_end or ring.writable() < self.block_frames:
+                    self.wake.wait(self.block_frames / self.sr / 2)
+                    self.wake.clear()
+                    continue
+
+                region = ring.write_region(self.block_frames * 4)
+                n = self._fill(region, frame_bytes)
+                if n < 0:
+                    # Shared source has not decoded this far yet
+                    self.wake.wait(self.block_frames / self.sr / 2)
+                    self.wake.clear()
+                    continue
+                if n == 0:
+                    self.at_end = True
+                    continue
+                ring.commit(n)
+                step = self._media_frames(n)
+                if self.proc is not None and self.proc_pos == self.position:
+                    self.proc_pos += step
+                self.position += step
+        except Exception as e:
+            if not self.stop_flag.is_set():
+                print(f"⚠️ Audio pump error: {e}")
+
+    def _media_frames(self, n: int) -> int:
+        # Media frames covered by n output frames at the current rate
+        if self.rate == 1.0:
+            return n
+        exact = n * self.rate + self._rate_residual
+        step = int(exact)
+        self._rate_residual = exact - step
+        return step
+
+    def _fill(self, region, frame_bytes: int) -> int:
+        frames = len(region)
+        stretched = self.rate != 1.0
+        if not stretched and self.cache is not None and self.cache.covers(self.position, frames):
+            if self.proc is not None:
+                # Back inside the cache; the live decoder is no longer needed
+                kill_process(self.proc)
+                self.proc = None
+                self.proc_pos = -1
+            block = self.cache.read(self.position, frames)
+            if block is None:
+                return 0
+            np.copyto(region[:len(block)], block)
+            return len(block)
+        if self.pcm_source is not None and not stretched:
+            return 0 if self.pcm_source.exhausted(self.position) else -1
+
+        if self.proc is None or self.proc_pos != self.position or self.proc_rate != self.rate:
+            kill_process(self.proc)
+            self.proc = spawn_pcm_decoder(self.ffmpeg_exe, self.file_path, self.position / self.sr, self.sr,
+                                          self.channels, tempo=self.rate)
+            self.proc_pos = self.position
+            self.proc_rate = self.rate
+
+        raw = memoryview(region.reshape(-1).view(np.uint8))
+        got = self.proc.stdout.readinto(raw)
+        if got and got % frame_bytes:
+            # Finish the partial frame so the ring stays frame aligned
+            got += self.proc.stdout.readinto(raw[got:got + frame_bytes - got % frame_bytes]) or 0
+        if not got or got % frame_bytes:
+            kill_process(self.proc)
+            self.proc = None
+            self.proc_pos = -1
+            return 0
+        return got // frame_bytes
+
+    def clock_time(self):
+        # Media time currently audible, or None when audio is not driving playback
+        mark = self.write_mark
+        if mark is None or self.stream is None or self.paused:
+            return None
+        media_time, dac_time, rate, generation = mark
+        if generation != self.seek_generation:
+            return None  # published by a callback that raced seek()
+        now = time.monotonic()
+        if now - dac_time > self.stall_timeout:
+            return None
+        return media_time + (now - dac_time) * rate
+
+    def buffer_stats(self) -> dict:
+        return {
+            "block_frames": self.block_frames,
+            "ring_frames": self.ring.capacity,
+            "buffered_frames": self.ring.readable(),
+            "latency_s": float(self.stream.latency) if self.stream is not None else 0.0,
+            "underruns": self.underruns,
+            "device_underflows": self.device_underflows,
+        }
+
+    def set_volume(self, vol: float):
+        self.volume = max(0.0, min(1.0, float(vol)))
+
+    def set_muted(self, muted: bool):
+        self.muted = bool(muted)
+
+    def set_loudness_gain(self, db: float):
+        # Normalization gain for this track, eased in over the loudness stage's ramp
+        self.loudness.set_gain_db(db)
+
+    def levels(self):
+        # ([peak dBFS], [rms dBFS]) per channel of what was last played, or None while silent
+        if self.paused or self.stream is None:
+            return None
+        return self.meter.levels()
+
+    def stop(self):
+        self.stop_flag.set()
+        self.wake.set()
+        self.paused = True
+
+        if self.thread and self.thread.is_alive() and threading.current_thread() != self.thread:
+            try:
+                self.thread.join(timeout=1.0)
+            except Exception:
+                pass
+        self.thread = None
+
+        if self.stream:
+            try:
+                self.stream.abort()  # Force immediate stop
+                self.stream.close()
+            except Exception:
+                pass
+        self.stream = None
+
+        kill_process(self.proc)
+        self.proc = None
+        self.proc_pos = -1
+        self.write_mark = None
+
+        if self.cache is not None and self.cache is not self.pcm_source:
+            self.cache.close()  # a shared source belongs to its decoder
+        self.cache = None
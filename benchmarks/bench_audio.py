@@ -0,0 +1,211 @@
+import time
+
+import numpy as np
+
+from benchmarks.common import benchmark, time_calls, NullOutputStream, SkipBenchmark
+from audio_dsp import DSPChain, GainRamp, LoudnessGain, Meter
+from audio_player import FFmpegAudioPlayer, find_ffmpeg, spawn_pcm_decoder
+from loudness import measure_loudness
+
+
+def _wait_for_clock(player, near: float = None, timeout: float = 5.0):
+    # Time until the player reports audible media time (near `near`, if given)
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        t = player.clock_time()
+        if t is not None and (near is None or abs(t - near) < 0.25):
+            return time.perf_counter() - t0
+        time.sleep(0.0005)
+    raise SkipBenchmark("audio clock never started")
+
+
+def _wait_for_cache(player, timeout: float = 10.0):
+    t0 = time.time()
+    while player.cache is not None and not player.cache.complete and time.time() - t0 < timeout:
+        time.sleep(0.01)
+
+
+def _player(path: str, duration: float):
+    return FFmpegAudioPlayer(path, duration=duration, stream_factory=NullOutputStream)
+
+
+@benchmark("audio.start_latency")
+def start_latency(ctx):
+    path = ctx.video(640, 480, seconds=10.0)
+    samples = []
+    for i in range(min(ctx.iterations, 15)):
+        player = _player(path, 10.0)
+        t0 = time.perf_counter()
+        player.start(1.0 + (i % 5))
+        _wait_for_clock(player)
+        samples.append(time.perf_counter() - t0)
+        player.stop()
+    return samples
+
+
+@benchmark("audio.seek_latency.cached")
+def seek_cached(ctx):
+    path = ctx.video(640, 480, seconds=10.0)
+    player = _player(path, 10.0)
+    player.start(0.0)
+    _wait_for_clock(player)
+    _wait_for_cache(player)
+    samples = []
+    try:
+        for i in range(min(ctx.iterations, 40)):
+            target = 1.0 + (i * 1.7) % 7.0
+            t0 = time.perf_counter()
+            player.seek(target)
+            _wait_for_clock(player, near=target)
+            samples.append(time.perf_counter() - t0)
+    finally:
+        player.stop()
+    return samples
+
+
+@benchmark("audio.seek_latency.uncached")
+def seek_uncached(ctx):
+    # duration=0 disables the PCM cache, so every seek respawns ffmpeg
+    path = ctx.video(640, 480, seconds=10.0)
+    player = _player(path, 0.0)
+    player.start(0.0)
+    _wait_for_clock(player)
+    samples = []
+    try:
+        for i in range(min(ctx.iterations, 20)):
+            target = 1.0 + (i * 1.7) % 7.0
+            t0 = time.perf_counter()
+            player.seek(target)
+            _wait_for_clock(player, near=target)
+            samples.append(time.perf_counter() - t0)
+    finally:
+        player.stop()
+    return samples
+
+
+@benchmark("audio.rate_change_latency")
+def rate_change_latency(ctx):
+    # Switching speed restarts the feeder on an atempo decoder at the current position
+    path = ctx.video(640, 480, seconds=10.0)
+    player = _player(path, 10.0)
+    player.start(0.0)
+    _wait_for_clock(player)
+    samples = []
+    try:
+        for i in range(min(ctx.iterations, 20)):
+            target = 1.0 + (i * 1.7) % 7.0
+            t0 = time.perf_counter()
+            player.set_rate((2.0, 1.0, 4.0, 0.5)[i % 4], target)
+            _wait_for_clock(player, near=target)
+            samples.append(time.perf_counter() - t0)
+    finally:
+        player.stop()
+    return samples
+
+
+def _atempo_samples(ctx, tempo: float):
+    # Time-stretches a whole track as fast as ffmpeg allows; speed is media seconds per wall second
+    path = ctx.video(640, 480, seconds=10.0)
+    samples = []
+    for _ in range(min(ctx.iterations, 5)):
+        t0 = time.perf_counter()
+        proc = spawn_pcm_decoder(find_ffmpeg(), path, 0.0, 44100, 2, tempo=tempo)
+        proc.stdout.read()
+        proc.wait()
+        samples.append(time.perf_counter() - t0)
+    return {"samples": samples, "speed": 10.0 / min(samples)}
+
+
+@benchmark("audio.atempo.1x")
+def atempo_1x(ctx):
+    return _atempo_samples(ctx, 1.0)
+
+
+@benchmark("audio.atempo.4x")
+def atempo_4x(ctx):
+    return _atempo_samples(ctx, 4.0)
+
+
+# === Output DSP ===
+def _dsp_block(frames: int = 512, channels: int = 2):
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal((frames, channels)) * 6000).astype(np.int16)
+
+
+def _dsp_samples(ctx, stages, before=None):
+    # Per-block cost of a chain over a 512-frame int16 block, as the audio
+    # callback runs it. peak_alloc_bytes is the most memory the calls ever held on
+    # top of what was there before: a block-sized temporary would add 4 KB, while
+    # numpy's reductions account for about 1 KB of bookkeeping.
+    import tracemalloc
+    source = _dsp_block()
+    block = source.copy()
+    chain = DSPChain(len(block), block.shape[1], stages)
+
+    def step():
+        if before is not None:
+            before()
+        np.copyto(block, source)
+        chain.process(block, len(block))
+
+    samples = time_calls(step, ctx.iterations)
+    tracemalloc.start()
+    step()
+    start = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for _ in range(100):
+        step()
+    peak = tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return {"samples": samples, "peak_alloc_bytes": peak}
+
+
+@benchmark("audio.dsp.passthrough")
+def dsp_passthrough(ctx):
+    # Unity gains and no meter: the chain returns without converting the block
+    return _dsp_samples(ctx, [LoudnessGain(), GainRamp()])
+
+
+@benchmark("audio.dsp.loudness")
+def dsp_loudness(ctx):
+    stage = LoudnessGain()
+    stage.set_gain_db(-6.0)
+    stage.jump(stage.target)
+    return _dsp_samples(ctx, [stage])
+
+
+@benchmark("audio.dsp.ramp")
+def dsp_ramp(ctx):
+    # Target flips every block, so every call computes a ramp
+    stage = GainRamp(0.5)
+
+    def flip():
+        stage.set_target(0.2 if stage.target > 0.5 else 0.8)
+
+    return _dsp_samples(ctx, [stage], before=flip)
+
+
+@benchmark("audio.dsp.meter")
+def dsp_meter(ctx):
+    return _dsp_samples(ctx, [Meter()])
+
+
+@benchmark("audio.dsp.chain")
+def dsp_chain(ctx):
+    # The player's chain: normalization, a fader at 70% and the meter
+    loudness, fader = LoudnessGain(), GainRamp(0.7)
+    loudness.set_gain_db(-6.0)
+    loudness.jump(loudness.target)
+    return _dsp_samples(ctx, [loudness, fader, Meter()])
+
+
+@benchmark("audio.loudness.measure")
+def loudness_measure(ctx):
+    # Whole-track integrated loudness; speed is media seconds per wall second
+    path = ctx.video(640, 480, seconds=10.0)
+    samples = []
+    for _ in range(min(ctx.iterations, 5)):
+        t0 = time.perf_counter()
+        info = measure_loudness(path)
+        samples.append(time.perf_counter() - t0)
+    return {"samples": samples, "speed": info["seconds"] / min(samples), "integrated_lufs": info["integrated_lufs"]}
@@ -0,0 +1,328 @@
+import itertools
+import time
+
+import cv2
+
+from benchmarks.common import benchmark, time_calls, SkipBenchmark
+from benchmarks.fixtures import GESTURE_SEQUENCE, gesture_sequence
+from gestures import get_fingers_up, get_gesture_name, GestureEngine, HandArray, replay_sequence
+
+
+def _fixture_hands():
+    frames, _, _ = gesture_sequence()
+    return [hands[0] for hands in frames if hands]
+
+
+@benchmark("gesture.get_fingers_up")
+def fingers_up(ctx):
+    hands = _fixture_hands()
+    next_hand = itertools.cycle(hands).__next__
+    return time_calls(lambda: get_fingers_up(next_hand()), ctx.iterations)
+
+
+@benchmark("gesture.get_gesture_name")
+def gesture_name(ctx):
+    vectors = [get_fingers_up(hand) for hand in _fixture_hands()]
+    next_vector = itertools.cycle(vectors).__next__
+    return time_calls(lambda: get_gesture_name(next_vector()), ctx.iterations)
+
+
+BATCH_HANDS = 64  # hands per call in the gesture.classify.* benchmarks
+
+
+@benchmark("gesture.classify.loop")
+def classify_loop(ctx):
+    # Per-hand Python path: get_fingers_up + get_gesture_name for each hand
+    hands = (_fixture_hands() * BATCH_HANDS)[:BATCH_HANDS]
+
+    def step():
+        return [get_gesture_name(get_fingers_up(hand)) for hand in hands]
+
+    return {"samples": time_calls(step, ctx.iterations), "hands": len(hands)}
+
+
+@benchmark("gesture.classify.vectorized")
+def classify_vectorized(ctx):
+    # Same hands as one (hands, 21, 3) array: one pass for fingers and table lookup
+    batch = HandArray.from_hands((_fixture_hands() * BATCH_HANDS)[:BATCH_HANDS])
+    return {"samples": time_calls(batch.classify, ctx.iterations), "hands": len(batch)}
+
+
+@benchmark("gesture.classify.vectorized_from_hands")
+def classify_from_hands(ctx):
+    # Including the conversion from landmark objects, as the live worker pays it
+    hands = (_fixture_hands() * BATCH_HANDS)[:BATCH_HANDS]
+    return {"samples": time_calls(lambda: HandArray.from_hands(hands).classify(), ctx.iterations),
+            "hands": len(hands)}
+
+
+@benchmark("gesture.features")
+def features(ctx):
+    batch = HandArray.from_hands((_fixture_hands() * BATCH_HANDS)[:BATCH_HANDS])
+    return {"samples": time_calls(batch.features, ctx.iterations), "hands": len(batch)}
+
+
+@benchmark("gesture.hands_process")
+def hands_process(ctx):
+    try:
+        import mediapipe as mp
+        hands = mp.solutions.hands.Hands(max_num_hands=1)
+    except Exception as e:
+        raise SkipBenchmark(f"MediaPipe Hands unavailable: {e}")
+    cap = cv2.VideoCapture(ctx.video(640, 480))
+    frames = []
+    while len(frames) < 30:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+    cap.release()
+    next_frame = itertools.cycle(frames).__next__
+    try:
+        return time_calls(lambda: hands.process(next_frame()), min(ctx.iterations, 100))
+    finally:
+        hands.close()
+
+
+@benchmark("gesture.engine_update")
+def engine_update(ctx):
+    # Per-frame cost of the smoothing engine, plus how its output compares to the fixture labels
+    frames, labels, fps = gesture_sequence()
+    engine = GestureEngine(repeat={"forward": 3.0, "rewind": 3.0})
+    inputs = [(get_fingers_up(h[0]) if h else None, h[0] if h else None) for h in frames]
+    samples = []
+    for _ in range(max(1, ctx.iterations // len(frames))):
+        engine.reset()
+        for i, (fingers, hand) in enumerate(inputs):
+            t0 = time.perf_counter()
+            engine.update(fingers, hand, timestamp=i / fps)
+            samples.append(time.perf_counter() - t0)
+
+    fired = replay_sequence(frames, fps, GestureEngine(repeat={"forward": 3.0, "rewind": 3.0}))
+    raw = [get_gesture_name(f)[1] for f, _ in inputs if f is not None]
+    spurious = sum(1 for i, action in fired if labels[i] != action)
+    return {"samples": samples, "fired": len(fired), "spurious": spurious,
+            "raw_changes": sum(1 for a, b in zip(raw, raw[1:]) if a != b)}
+
+
+def _ui_work():
+    # A slice of pure-Python work standing in for a Tk tick; it needs the GIL throughout
+    total = 0
+    for i in range(2000):
+        total += i * i
+    return total
+
+
+def _run_pipeline(source, frames: int, timeout: float = 60.0, max_num_hands: int = 1, policy: str = "first",
+                  busy_consumer: bool = False, **worker_args):
+    # Drives GestureWorker from `source` exactly as the player does: the UI side
+    # peeks the newest result, feeds inferred ones to the hand tracker and
+    # arbiter and counts dispatched gestures. Latency is capture -> result seen
+    # by the consumer. busy_consumer does _ui_work() between peeks instead of
+    # sleeping, and reports how much of it got done (ui_work_per_s).
+    from gesture_worker import GestureWorker
+    from hand_tracker import GestureArbiter, HandTracker
+
+    worker = GestureWorker(source=source, max_num_hands=max_num_hands, active_rate=10000.0, idle_rate=10000.0,
+                           **worker_args)
+    tracker = HandTracker(make_engine=lambda: GestureEngine(repeat={"forward": 3.0, "rewind": 3.0}),
+                          rotation_invariant=max_num_hands > 1)
+    arbiter = GestureArbiter(policy)
+    hands_seen = 0
+    worker.start()
+    if not worker.ready.wait(timeout) or worker.error:
+        worker.stop()
+        raise SkipBenchmark(f"capture source unavailable: {worker.error or 'timed out'}")
+    latencies = []
+    fired = 0
+    last_seq = 0
+    first_seq = None
+    ui_work = 0
+    inferences = worker.scheduler.inferences
+    t_start = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    try:
+        while len(latencies) < frames and time.monotonic() < deadline:
+            if busy_consumer:
+                _ui_work()
+                ui_work += 1
+            result = worker.results.peek()
+            if result is None or result.seq == last_seq:
+                if not busy_consumer:
+                    time.sleep(0.0005)
+                continue
+            latencies.append(time.monotonic() - result.captured)
+            last_seq = result.seq
+            first_seq = first_seq or result.seq
+            if result.inferred:
+                hands_seen += len(result.landmarks or ())
+                fired += len(arbiter.select(tracker, tracker.update(result.landmarks, result.timestamp)))
+        elapsed = time.perf_counter() - t_start
+        inferences = worker.scheduler.inferences - inferences
+    finally:
+        worker.stop()
+    produced = last_seq - (first_seq or last_seq) + 1
+    return {
+        "samples": latencies,
+        "frames_per_s": produced / elapsed if elapsed > 0 else 0.0,
+        "inferences_per_s": inferences / elapsed if elapsed > 0 else 0.0,
+        "ui_work_per_s": ui_work / elapsed if busy_consumer and elapsed > 0 else None,
+        "consumed": len(latencies),
+        "produced": produced,
+        "fired": fired,
+        "hands_per_frame": hands_seen / max(1, len(latencies)),
+        "source": source.describe(),
+    }
+
+
+@benchmark("gesture.pipeline.synthetic")
+def pipeline_synthetic(ctx):
+    from capture_sources import SyntheticSource
+    return _run_pipeline(SyntheticSource(width=640, height=480, fps=30, realtime=False), ctx.iterations)
+
+
+@benchmark("gesture.pipeline.landmarks")
+def pipeline_landmarks(ctx):
+    from capture_sources import LandmarkFileSource
+    gesture_sequence()  # writes the fixture if it is missing
+    source = LandmarkFileSource(GESTURE_SEQUENCE, width=640, height=480, realtime=False)
+    return _run_pipeline(source, ctx.iterations)
+
+
+@benchmark("gesture.pipeline.file")
+def pipeline_file(ctx):
+    # Full path including MediaPipe inference on decoded video frames
+    from capture_sources import VideoFileSource
+    try:
+        from gesture_worker import load_mediapipe
+        load_mediapipe()
+    except Exception as e:
+        raise SkipBenchmark(f"MediaPipe Hands unavailable: {e}")
+    source = VideoFileSource(ctx.video(640, 480), realtime=False)
+    return _run_pipeline(source, min(ctx.iterations, 200))
+
+
+@benchmark("gesture.annotate.scaling")
+def annotate_scaling(ctx):
+    # Offline annotation throughput with 1 worker vs one per core
+    import os
+    import tempfile
+    from annotate import annotate_videos, load_annotations
+    try:
+        from gesture_worker import load_mediapipe
+        load_mediapipe()
+    except Exception as e:
+        raise SkipBenchmark(f"MediaPipe Hands unavailable: {e}")
+    video = ctx.video(640, 480)
+    cores = os.cpu_count() or 1
+    samples, fps_by_workers = [], {}
+    for workers in sorted({1, cores}):
+        with tempfile.TemporaryDirectory() as out:
+            t0 = time.perf_counter()
+            written = annotate_videos([video], out, workers=workers, chunk=60)
+            elapsed = time.perf_counter() - t0
+            frames = len(load_annotations(written[video])["frame"])
+        samples.append(elapsed)
+        fps_by_workers[workers] = frames / elapsed
+    return {"samples": samples, "frames_per_s": fps_by_workers,
+            "speedup": fps_by_workers[cores] / fps_by_workers[1]}
+
+
+def _tracking_benchmark(hands: int):
+    # Per-frame cost of tracking + per-hand debouncing + arbitration with `hands` in view
+    def run(ctx):
+        from capture_sources import SyntheticSource
+        from hand_tracker import GestureArbiter, HandTracker
+        source = SyntheticSource(hands=hands, realtime=False)
+        frames = []
+        while len(frames) < 300:
+            source.grab()
+            frames.append(source.landmarks())
+        tracker = HandTracker(make_engine=lambda: GestureEngine(repeat={"forward": 3.0, "rewind": 3.0}),
+                              rotation_invariant=hands > 1)
+        arbiter = GestureArbiter("combo")
+        state = {"i": 0}
+
+        def step():
+            i = state["i"] = state["i"] + 1
+            arbiter.select(tracker, tracker.update(frames[i % len(frames)], i / 30.0))
+
+        samples = time_calls(step, ctx.iterations)
+        return {"samples": samples, "hands": hands, "tracks_created": tracker.next_id - 1}
+    return run
+
+
+def _pipeline_hands_benchmark(hands: int):
+    # End-to-end throughput with `hands` synthetic hands in view
+    def run(ctx):
+        from capture_sources import SyntheticSource
+        source = SyntheticSource(width=640, height=480, fps=30, realtime=False, hands=hands)
+        result = _run_pipeline(source, ctx.iterations, max_num_hands=hands, policy="combo")
+        result["hands_per_s"] = result["frames_per_s"] * result["hands_per_frame"]
+        return result
+    return run
+
+
+for _hands in (1, 2, 4, 8):
+    benchmark(f"gesture.tracking.hands{_hands}")(_tracking_benchmark(_hands))
+    benchmark(f"gesture.pipeline.synthetic.hands{_hands}")(_pipeline_hands_benchmark(_hands))
+
+
+# === Inference in-thread vs in a separate process ===
+class _NullHands:
+    # Finds nothing, instantly: what is left is the cost of getting frames to the model and back
+    def __init__(self, max_num_hands: int = 1):
+        pass
+
+    def process(self, image):
+        return None
+
+    def close(self):
+        pass
+
+
+class _PythonHands(_NullHands):
+    # Holds the GIL for ~10 ms per frame, like MediaPipe's Python-side pre- and
+    # post-processing does for part of each call
+    def process(self, image):
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < 0.010:
+            _ui_work()
+        return None
+
+
+def _mediapipe_factory(max_num_hands: int):
+    from inference_process import mediapipe_hands
+    return mediapipe_hands(max_num_hands)
+
+
+INFERENCE_MODELS = {"transport": _NullHands, "python": _PythonHands, "mediapipe": _mediapipe_factory}
+
+
+def _inference_benchmark(model: str, mode: str, paced: bool = False):
+    # Whole gesture path on decoded 640x480 video with the UI side doing
+    # pure-Python work between peeks: frames_per_s, inferences_per_s, capture ->
+    # consumer latency and how much UI work still got done. Flat out by
+    # default; paced reads at 30 fps like a webcam.
+    def run(ctx):
+        from capture_sources import VideoFileSource
+        if model == "mediapipe":
+            try:
+                from gesture_worker import load_mediapipe
+                load_mediapipe()
+            except Exception as e:
+                raise SkipBenchmark(f"MediaPipe Hands unavailable: {e}")
+        source = VideoFileSource(ctx.video(640, 480), fps=30.0, realtime=paced)
+        frames = min(ctx.iterations, 150 if paced else 300)
+        result = _run_pipeline(source, frames, busy_consumer=True, inference=mode,
+                               hands_factory=INFERENCE_MODELS[model])
+        result["inference"] = mode
+        return result
+    return run
+
+
+for _model in INFERENCE_MODELS:
+    for _mode in ("thread", "process"):
+        benchmark(f"gesture.inference.{_model}.{_mode}")(_inference_benchmark(_model, _mode))
+        if _model != "transport":
+            benchmark(f"gesture.inference.{_model}.{_mode}.paced")(_inference_benchmark(_model, _mode, paced=True))
@@ -0,0 +1,442 @@
+import random
+import time
+
+import cv2
+import numpy as np
+
+from audio_player import FFmpegAudioPlayer
+from benchmarks.common import benchmark, time_calls, NullOutputStream, SkipBenchmark
+from ffmpeg_backend import create_audio_player, create_decoder
+from keyframe_index import load_or_build, scan_keyframes
+from preloader import Preloader, PreparedMedia
+from video_pipeline import VideoDecoder, fit_size
+
+CANVAS = (960, 540)
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080)}
+
+
+def _read_frames(path: str, count: int):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def _decode_samples(path: str, iterations: int):
+    cap = cv2.VideoCapture(path)
+
+    def step():
+        ret, _ = cap.read()
+        if not ret:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    samples = time_calls(step, iterations)
+    cap.release()
+    return samples
+
+
+def _register(label: str, width: int, height: int):
+    @benchmark(f"video.decode.{label}")
+    def decode(ctx):
+        return _decode_samples(ctx.video(width, height), ctx.iterations)
+
+    @benchmark(f"video.cvtColor.{label}")
+    def convert(ctx):
+        frame = _read_frames(ctx.video(width, height), 1)[0]
+        return time_calls(lambda: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), ctx.iterations)
+
+    @benchmark(f"video.resize.{label}")
+    def resize(ctx):
+        frame = cv2.cvtColor(_read_frames(ctx.video(width, height), 1)[0], cv2.COLOR_BGR2RGB)
+        size = fit_size(width, height, *CANVAS)
+        return time_calls(lambda: cv2.resize(frame, size), ctx.iterations)
+
+    @benchmark(f"video.decoder_convert.{label}")
+    def decoder_convert(ctx):
+        # Scale + colour conversion as VideoDecoder does it, into a ring slot
+        decoder = VideoDecoder(ctx.video(width, height))
+        frame = _read_frames(ctx.video(width, height), 1)[0]
+        decoder.set_display_box(*CANVAS)
+        samples = time_calls(lambda: decoder.convert_into(frame, 0), ctx.iterations)
+        decoder.release()
+        return samples
+
+
+for _label, (_w, _h) in RESOLUTIONS.items():
+    _register(_label, _w, _h)
+
+
+@benchmark("video.dim")
+def dim(ctx):
+    frame = np.full((CANVAS[1], CANVAS[0], 3), 128, dtype=np.uint8)
+    return time_calls(lambda: cv2.convertScaleAbs(frame, alpha=0.7), ctx.iterations)
+
+
+@benchmark("video.photoimage")
+def photoimage(ctx):
+    try:
+        import tkinter
+        from PIL import Image, ImageTk
+        root = tkinter.Tk()
+        root.withdraw()
+    except Exception as e:
+        raise SkipBenchmark(f"no display: {e}")
+    frame = np.full((CANVAS[1], CANVAS[0], 3), 128, dtype=np.uint8)
+    try:
+        return time_calls(lambda: ImageTk.PhotoImage(Image.fromarray(frame)), ctx.iterations)
+    finally:
+        root.destroy()
+
+
+@benchmark("video.photoimage_paste")
+def photoimage_paste(ctx):
+    # CanvasRenderer path: one PhotoImage reused via paste()
+    try:
+        import tkinter
+        from PIL import Image, ImageTk
+        root = tkinter.Tk()
+        root.withdraw()
+    except Exception as e:
+        raise SkipBenchmark(f"no display: {e}")
+    frame = np.full((CANVAS[1], CANVAS[0], 3), 128, dtype=np.uint8)
+    photo = ImageTk.PhotoImage(Image.fromarray(frame))
+    try:
+        return time_calls(lambda: photo.paste(Image.fromarray(frame)), ctx.iterations)
+    finally:
+        root.destroy()
+
+
+@benchmark("gesture.preview")
+def gesture_preview(ctx):
+    # Flip + colour conversion + 320x240 downscale done per webcam frame
+    frame = _read_frames(ctx.video(640, 480), 1)[0]
+
+    def step():
+        flipped = cv2.flip(frame, 1)
+        cv2.cvtColor(cv2.resize(flipped, (320, 240)), cv2.COLOR_BGR2RGB)
+
+    return time_calls(step, ctx.iterations)
+
+
+# === Seeking ===
+# A long GOP makes keyframe placement matter; scrub targets mix short forward
+# hops (gesture forward/rewind) with random jumps (progress bar clicks)
+SEEK_VIDEO = dict(width=1280, height=720, fps=30, seconds=20, gop=300)
+
+
+def _seek_targets(frame_count: int, count: int):
+    rng = random.Random(7)
+    targets, pos = [], 0
+    for i in range(count):
+        if i % 3 == 2:
+            pos = rng.randrange(frame_count)
+        else:
+            pos = max(0, min(frame_count - 1, pos + rng.choice([60, 60, -60])))
+        targets.append(pos)
+    return targets
+
+
+def _seek_samples(ctx, indexed: bool):
+    # Time from seek request to the target frame being decoded, as VideoDecoder does it
+    path = ctx.video(**SEEK_VIDEO)
+    decoder = VideoDecoder(path)
+    if indexed:
+        decoder.set_index(load_or_build(path))
+    # Each seek decodes up to a GOP, so run a tenth of the usual iterations
+    iterations = max(10, ctx.iterations // 10)
+    targets = iter(_seek_targets(decoder.frame_count, iterations + 3))
+
+    def step():
+        decoder._seek_to(next(targets))
+        decoder.cap.read()
+        decoder.next_index += 1
+
+    samples = time_calls(step, iterations)
+    decoder.release()
+    return samples
+
+
+@benchmark("video.seek.opencv")
+def seek_opencv(ctx):
+    return _seek_samples(ctx, indexed=False)
+
+
+@benchmark("video.seek.indexed")
+def seek_indexed(ctx):
+    return _seek_samples(ctx, indexed=True)
+
+
+@benchmark("video.keyframe_scan")
+def keyframe_scan(ctx):
+    path = ctx.video(**SEEK_VIDEO)
+    return time_calls(lambda: scan_keyframes(path), max(3, ctx.iterations // 20), warmup=1)
+
+
+# === Track transitions ===
+def _switch_samples(ctx, preloaded: bool):
+    # Switch request -> first frame poppable and the audio clock running, with the
+    # same objects MediaPlayer swaps in
+    path = ctx.video(1280, 720, seconds=10.0)
+
+    def make_audio(file_path, video):
+        player = create_audio_player(file_path, video, stream_factory=NullOutputStream)
+        player.prime()
+        return player
+
+    samples = []
+    for _ in range(min(ctx.iterations, 15)):
+        media = None
+        if preloaded:
+            preloader = Preloader(make_audio=make_audio)
+            preloader.prepare(path, CANVAS)
+            deadline = time.monotonic() + 10.0
+            while media is None and time.monotonic() < deadline:
+                media = preloader.take(path)
+                time.sleep(0.01)
+            if media is None:
+                raise SkipBenchmark("preload never became ready")
+            # What a few seconds of the previous track would have given the PCM cache
+            time.sleep(0.3)
+
+        t0 = time.perf_counter()
+        if media is None:
+            video = VideoDecoder(path)
+            video.set_display_box(*CANVAS)
+            video.start()
+            audio = FFmpegAudioPlayer(path, duration=video.duration, stream_factory=NullOutputStream)
+        else:
+            video, audio = media.video, media.audio_player
+        audio.start(0.0)
+        while video.pop_next() is None:
+            time.sleep(0.0002)
+        while audio.clock_time() is None:
+            time.sleep(0.0002)
+        samples.append(time.perf_counter() - t0)
+        PreparedMedia(path, video, audio).release()
+    return samples
+
+
+@benchmark("playlist.switch.cold")
+def switch_cold(ctx):
+    return _switch_samples(ctx, preloaded=False)
+
+
+@benchmark("playlist.switch.preloaded")
+def switch_preloaded(ctx):
+    return _switch_samples(ctx, preloaded=True)
+
+
+# === Media backends ===
+def _cpu_seconds() -> float:
+    # This process plus its (reaped) ffmpeg children
+    import resource
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _backend_samples(ctx, backend: str):
+    # Plays a whole file's video and audio through the given backend as fast as
+    # decoding allows and reports CPU and how many times the container was demuxed
+    path = ctx.video(1920, 1080, seconds=10.0)
+    cpu, t0 = _cpu_seconds, time.perf_counter()
+    cpu0 = cpu()
+    video = create_decoder(path, backend)
+    if backend == "ffmpeg" and getattr(video, "pcm", None) is None:
+        video.release()
+        raise SkipBenchmark("ffmpeg backend unavailable")
+    video.set_display_box(*CANVAS)
+    video.start()
+    audio = create_audio_player(path, video, stream_factory=NullOutputStream)
+    audio.prime()
+    samples = []
+    last = time.perf_counter()
+    deadline = time.monotonic() + 60.0
+    while not video.finished() and time.monotonic() < deadline:
+        if video.pop_next() is None:
+            time.sleep(0.0005)
+            continue
+        now = time.perf_counter()
+        samples.append(now - last)
+        last = now
+    # Audio must be fully decoded too; the OpenCV path does that in its own process
+    while not audio.cache.complete and time.monotonic() < deadline:
+        time.sleep(0.005)
+    # OpenCV demuxes in-process and the PCM cache's ffmpeg demuxes again
+    demuxers = video.spawns if backend == "ffmpeg" else 2
+    PreparedMedia(path, video, audio).release()
+    wall, cpu_s = time.perf_counter() - t0, cpu() - cpu0
+    return {"samples": samples, "wall_s": wall, "cpu_s": cpu_s,
+            "cpu_ms_per_frame": cpu_s * 1000.0 / max(1, len(samples)),
+            "demuxers": demuxers}
+
+
+@benchmark("playback.backend.opencv")
+def backend_opencv(ctx):
+    return _backend_samples(ctx, "opencv")
+
+
+@benchmark("playback.backend.ffmpeg")
+def backend_ffmpeg(ctx):
+    return _backend_samples(ctx, "ffmpeg")
+
+
+# === Display-resolution decoding ===
+SCALED_SOURCES = {"1080p": (1920, 1080, 10.0), "4k": (3840, 2160, 3.0)}
+
+
+class _CountingCapture:
+    def __init__(self, cap, meter):
+        self._cap = cap
+        self._meter = meter
+
+    def __getattr__(self, name):
+        return getattr(self._cap, name)
+
+    def read(self, *args):
+        ret, frame = self._cap.read(*args)
+        if ret:
+            self._meter.decoded += frame.nbytes
+        return ret, frame
+
+
+class _TrafficMeter:
+    # Stands in for the cv2 module inside video_pipeline and ffmpeg_backend and
+    # tallies the frame bytes that actually pass through Python: frames the
+    # decoder hands over (cap.read() arrays, or raw frames read off the ffmpeg
+    # pipe) and what every resize / colour conversion on the way to the ring
+    # slot reads plus writes. Work inside OpenCV's or ffmpeg's decoder is not seen.
+    def __init__(self):
+        self.decoded = 0
+        self.converted = 0
+
+    def __getattr__(self, name):
+        return getattr(cv2, name)
+
+    def VideoCapture(self, *args):
+        return _CountingCapture(cv2.VideoCapture(*args), self)
+
+    def resize(self, src, dsize, *args, **kwargs):
+        out = cv2.resize(src, dsize, *args, **kwargs)
+        self.converted += src.nbytes + out.nbytes
+        return out
+
+    def cvtColor(self, src, code, *args, **kwargs):
+        out = cv2.cvtColor(src, code, *args, **kwargs)
+        self.converted += src.nbytes + out.nbytes
+        return out
+
+    def watch_pipe(self, video):
+        read_frame = video._read_frame
+
+        def counted(buf):
+            ok = read_frame(buf)
+            if ok:
+                self.decoded += buf.nbytes
+            return ok
+
+        video._read_frame = counted
+
+
+def _scaled_samples(ctx, backend: str, width: int, height: int, seconds: float):
+    # Video only, decoded to the end as fast as possible onto a 960x540 canvas
+    import ffmpeg_backend
+    import video_pipeline
+    path = ctx.video(width, height, seconds=seconds)
+    meter = _TrafficMeter()
+    video_pipeline.cv2 = ffmpeg_backend.cv2 = meter
+    try:
+        video = create_decoder(path, backend)
+        if backend != "opencv" and type(video) is VideoDecoder:
+            video.release()
+            raise SkipBenchmark("ffmpeg unavailable")
+        if backend != "opencv":
+            meter.watch_pipe(video)
+        cpu0, t0 = _cpu_seconds(), time.perf_counter()
+        video.set_display_box(*CANVAS)
+        video.start()
+        samples = []
+        last = time.perf_counter()
+        deadline = time.monotonic() + 120.0
+        while not video.finished() and time.monotonic() < deadline:
+            if video.pop_next() is None:
+                time.sleep(0.0005)
+                continue
+            now = time.perf_counter()
+            samples.append(now - last)
+            last = now
+        video.release()
+        wall, cpu_s = time.perf_counter() - t0, _cpu_seconds() - cpu0
+    finally:
+        video_pipeline.cv2 = ffmpeg_backend.cv2 = cv2
+    frames = max(1, len(samples))
+    return {"samples": samples, "wall_s": wall, "fps": len(samples) / wall if wall > 0 else 0.0,
+            "cpu_ms_per_frame": cpu_s * 1000.0 / frames,
+            "decoded_mb_per_frame": meter.decoded / 1e6 / frames,
+            "converted_mb_per_frame": meter.converted / 1e6 / frames,
+            "frame_traffic_mb": (meter.decoded + meter.converted) / 1e6 / frames}
+
+
+def _register_scaled(label: str, width: int, height: int, seconds: float):
+    for backend in ("opencv", "scaled"):
+        @benchmark(f"playback.decode_to_canvas.{backend}.{label}")
+        def decode_to_canvas(ctx, backend=backend):
+            return _scaled_samples(ctx, backend, width, height, seconds)
+
+
+for _label, (_w, _h, _s) in SCALED_SOURCES.items():
+    _register_scaled(_label, _w, _h, _s)
+
+
+# === Playback rate ===
+def _rate_samples(ctx, backend: str, rate: float):
+    # Decodes a 1080p file to the end at the given rate as fast as possible. speed is
+    # media seconds per wall second; keeping up needs speed >= rate (headroom >= 1).
+    # backend "default" is what the player opens at that rate with no backend configured.
+    path = ctx.video(1920, 1080, seconds=10.0)
+    if backend == "default":
+        video = create_decoder(path, "opencv", rate=rate)
+    else:
+        video = create_decoder(path, backend)
+        if backend != "opencv" and type(video) is VideoDecoder:
+            video.release()
+            raise SkipBenchmark("ffmpeg unavailable")
+    video.set_display_box(*CANVAS)
+    video.set_rate(rate)
+    cpu0, t0 = _cpu_seconds(), time.perf_counter()
+    video.start()
+    samples, shown = [], []
+    last = time.perf_counter()
+    deadline = time.monotonic() + 120.0
+    while not video.finished() and time.monotonic() < deadline:
+        item = video.pop_next()
+        if item is None:
+            time.sleep(0.0005)
+            continue
+        now = time.perf_counter()
+        samples.append(now - last)
+        shown.append(item[2])
+        last = now
+    step = video.frame_step
+    video.release()
+    wall, cpu_s = time.perf_counter() - t0, _cpu_seconds() - cpu0
+    media = (shown[-1] + step) / video.fps if shown else 0.0
+    speed = media / wall if wall > 0 else 0.0
+    return {"samples": samples, "frame_step": step, "speed": speed, "headroom": speed / rate,
+            "cpu_s_per_media_s": cpu_s / media if media else 0.0, "decoder": video.backend}
+
+
+def _register_rate(backend: str, rate: float):
+    @benchmark(f"playback.rate.{backend}.{rate:g}x")
+    def playback_rate(ctx):
+        return _rate_samples(ctx, backend, rate)
+
+
+for _backend in ("opencv", "scaled", "default"):
+    for _rate in (1.0, 2.0, 4.0):
+        _register_rate(_backend, _rate)
@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import benchmark, SkipBenchmark
+from session import SessionStore
+
+PLAYLIST_SIZE = 5000
+
+
+def _session_db(ctx):
+    # A session with a kiosk-sized playlist of files that really exist
+    media_dir = os.path.join(ctx.workdir, "session_media")
+    os.makedirs(media_dir, exist_ok=True)
+    paths = []
+    for i in range(PLAYLIST_SIZE):
+        path = os.path.join(media_dir, f"clip_{i:05d}.mp4")
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        paths.append(path)
+
+    db_path = os.path.join(ctx.workdir, "session_bench.sqlite")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    store = SessionStore(db_path)
+    store.start()
+    store.save_playlist(paths)
+    for path in paths[::10]:
+        store.save_position(path, 12.5)
+    store.save_settings(volume=80.0, muted=False, current_path=paths[0])
+    store.close()
+    return db_path
+
+
+@benchmark("session.restore")
+def session_restore(ctx):
+    # Startup load + file validation, all on the store's thread; the UI only polls
+    db_path = _session_db(ctx)
+    samples = []
+    for _ in range(min(ctx.iterations, 20)):
+        store = SessionStore(db_path)
+        t0 = time.perf_counter()
+        store.start()
+        while store.restored is None:
+            time.sleep(0.0005)
+        samples.append(time.perf_counter() - t0)
+        store.close()
+    return {"samples": samples, "playlist_items": PLAYLIST_SIZE}
+
+
+# === Import cost ===
+# Modules that must stay out of `import main`; they are loaded on a warm-up thread
+DEFERRED_MODULES = ("mediapipe", "sounddevice", "imageio_ffmpeg")
+
+
+def _importtime(module: str):
+    # Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+    # returns {imported module: (self_us, cumulative_us)}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if proc.returncode != 0:
+        raise SkipBenchmark(f"import {module} failed: {proc.stderr.strip().splitlines()[-1:]}")
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+@benchmark("startup.import_main")
+def import_main(ctx):
+    samples = []
+    times = {}
+    for _ in range(min(ctx.iterations, 5)):
+        times = _importtime("main")
+        samples.append(times["main"][1] / 1e6)
+    top_level = {name: cum for name, (_, cum) in times.items() if "." not in name and name != "main"}
+    heaviest = sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:8]
+    return {
+        "samples": samples,
+        "heaviest_ms": {name: round(us / 1000.0, 1) for name, us in heaviest},
+        "deferred_but_imported": [m for m in DEFERRED_MODULES if m in times],
+    }
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from audio_player import find_ffmpeg
+
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def benchmark(name: str):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def summarize(samples) -> dict:
+    arr = np.asarray(samples, dtype=np.float64) * 1000.0
+    if arr.size == 0:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "n": int(arr.size),
+        "mean_ms": float(arr.mean()),
+        "min_ms": float(arr.min()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(arr.max()),
+    }
+
+
+def time_calls(fn, iterations: int, warmup: int = 3):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def make_test_video(path: str, width: int = 1280, height: int = 720, fps: int = 30, seconds: float = 10.0,
+                    codec: str = "libx264", gop: int = 60) -> str:
+    # Synthetic testsrc + sine tone, generated once and reused between runs
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    args = [
+        find_ffmpeg(), "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100",
+        "-t", f"{seconds}",
+        "-c:v", codec, "-g", str(gop), "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest",
+        path + ".part.mp4",
+    ]
+    subprocess.run(args, check=True, stdin=subprocess.DEVNULL)
+    os.replace(path + ".part.mp4", path)
+    return path
+
+
+class NullOutputStream:
+    # Stand-in for sd.OutputStream that pulls blocks in real time from a thread,
+    # so the audio path can be timed on machines without a sound card
+    def __init__(self, samplerate, channels, dtype="int16", blocksize=512, latency=None, callback=None, **_):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize or 512
+        self.latency = 0.01
+        self.callback = callback
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        buf = np.zeros((self.blocksize, self.channels), dtype=np.int16)
+        period = self.blocksize / self.samplerate
+        next_t = time.monotonic()
+        while self.running:
+            now = time.monotonic()
+            self.callback(buf, self.blocksize, _TimeInfo(now, now + self.latency), _Status())
+            next_t += period
+            time.sleep(max(0.0, next_t - time.monotonic()))
+
+    def abort(self):
+        self.running = False
+
+    stop = abort
+
+    def close(self):
+        self.running = False
+
+
+class _TimeInfo:
+    def __init__(self, current, dac):
+        self.currentTime = current
+        self.outputBufferDacTime = dac
+
+
+class _Status:
+    output_underflow = False
+
+
+class Context:
+    def __init__(self, iterations: int = 200, workdir: str = None):
+        self.iterations = int(iterations)
+        self.workdir = workdir or os.path.join(tempfile.gettempdir(), "gesture_player_bench")
+        os.makedirs(self.workdir, exist_ok=True)
+
+    def video(self, width: int = 1280, height: int = 720, fps: int = 30, seconds: float = 10.0, gop: int = 60) -> str:
+        name = f"testsrc_{width}x{height}_{fps}fps_{int(seconds)}s_g{gop}.mp4"
+        return make_test_video(os.path.join(self.workdir, name), width, height, fps, seconds, gop=gop)
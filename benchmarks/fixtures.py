@@ -0,0 +1,62 @@
+import os
+import random
+
+from gestures import synthetic_hand, save_landmark_sequence, load_landmark_sequence
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+GESTURE_SEQUENCE = os.path.join(FIXTURE_DIR, "gesture_sequence.json")
+
+# (finger vector or None for "no hand", frames held, expected gesture)
+SESSION_SCRIPT = [
+    (None, 20, None),
+    ([0, 1, 1, 1, 1], 25, "play"),
+    ([0, 1, 1, 0, 0], 1, None),       # single-frame misread while moving the hand
+    ([0, 1, 1, 1, 1], 10, "play"),
+    (None, 15, None),
+    ([0, 1, 0, 0, 0], 45, "forward"),  # held index finger: continuous scrubbing
+    ([0, 0, 0, 0, 0], 2, None),       # transition through a fist
+    ([1, 0, 0, 0, 0], 20, "rewind"),
+    (None, 10, None),
+    ([0, 1, 1, 0, 0], 18, "mute"),
+    ([0, 1, 0, 0, 1], 1, None),
+    ([0, 1, 1, 0, 0], 6, "mute"),
+    (None, 12, None),
+    ([0, 0, 0, 0, 0], 24, "pause"),
+    ([0, 1, 0, 0, 1], 20, "restart"),
+    ([0, 1, 1, 1, 0], 20, "next"),
+    ([0, 0, 1, 1, 1], 20, "previous"),
+    (None, 20, None),
+]
+
+
+def build_gesture_sequence(seed: int = 7, jitter: float = 0.004):
+    rng = random.Random(seed)
+    frames, labels = [], []
+    drift = [0.0, 0.0]
+    for fingers, count, label in SESSION_SCRIPT:
+        for _ in range(count):
+            if fingers is None:
+                frames.append([])
+            else:
+                drift[0] = max(-0.1, min(0.1, drift[0] + rng.gauss(0.0, 0.003)))
+                drift[1] = max(-0.05, min(0.05, drift[1] + rng.gauss(0.0, 0.002)))
+                frames.append([synthetic_hand(fingers, jitter, rng, offset=tuple(drift))])
+            labels.append(label)
+    return frames, labels
+
+
+def gesture_sequence():
+    if not os.path.exists(GESTURE_SEQUENCE):
+        write_fixtures()
+    return load_landmark_sequence(GESTURE_SEQUENCE)
+
+
+def write_fixtures():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    frames, labels = build_gesture_sequence()
+    save_landmark_sequence(GESTURE_SEQUENCE, frames, fps=30.0, labels=labels)
+
+
+if __name__ == "__main__":
+    write_fixtures()
+    print(f"wrote {GESTURE_SEQUENCE}")
@@ -0,0 +1,116 @@
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import sys
+import traceback
+
+from benchmarks.common import BENCHMARKS, Context, SkipBenchmark, summarize
+
+MODULES = [
+    "benchmarks.bench_playback",
+    "benchmarks.bench_gestures",
+    "benchmarks.bench_audio",
+    "benchmarks.bench_startup",
+]
+
+
+def load_benchmarks():
+    for name in MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"⚠️ Skipping {name}: {e}", file=sys.stderr)
+
+
+def run(names, ctx):
+    results = {}
+    for name in names:
+        fn = BENCHMARKS[name]
+        try:
+            out = fn(ctx)
+            if isinstance(out, dict):
+                samples = out.pop("samples", [])
+                results[name] = {**summarize(samples), **out}
+            else:
+                results[name] = summarize(out)
+        except SkipBenchmark as e:
+            results[name] = {"skipped": str(e)}
+        except Exception as e:
+            traceback.print_exc()
+            results[name] = {"error": str(e)}
+        print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def format_row(name: str, result: dict) -> str:
+    if "p50_ms" not in result:
+        reason = result.get("skipped") or result.get("error") or "no samples"
+        return f"{name:<40} {'-':>10} {'-':>10} {'-':>10}   ({reason})"
+    return f"{name:<40} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['p99_ms']:>10.3f}"
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    # Returns the benchmarks whose p95 regressed by more than `threshold`
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old or "p95_ms" not in old or "p95_ms" not in result or old["p95_ms"] <= 0:
+            continue
+        ratio = result["p95_ms"] / old["p95_ms"]
+        if ratio > 1.0 + threshold:
+            regressions.append((name, old["p95_ms"], result["p95_ms"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the playback and gesture hot paths")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--only", action="append", default=[], help="run benchmarks whose name contains this")
+    parser.add_argument("--workdir", default=None, help="where generated test media is cached")
+    parser.add_argument("--compare", default=None, help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 slowdown vs baseline")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args(argv)
+
+    load_benchmarks()
+    names = sorted(BENCHMARKS)
+    if args.only:
+        names = [n for n in names if any(part in n for part in args.only)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    ctx = Context(iterations=args.iterations, workdir=args.workdir)
+    print(f"{'benchmark':<40} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    results = run(names, ctx)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    try:
+        import cv2
+        report["meta"]["opencv"] = cv2.__version__
+    except Exception:
+        pass
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"⚠️ {name}: p95 {old:.3f} ms -> {new:.3f} ms ({ratio:.2f}x)")
+        return 1 if regressions else 0
+    return 0
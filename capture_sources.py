@@ -0,0 +1,277 @@
+import random
+import time
+
+import cv2
+import numpy as np
+
+from gestures import GESTURES, get_gesture_name, load_landmark_sequence, synthetic_hand
+
+# 21-point hand topology, as drawn by MediaPipe
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8), (5, 9), (9, 10), (10, 11),
+    (11, 12), (9, 13), (13, 14), (14, 15), (15, 16), (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+]
+
+
+def draw_hand(frame, hand):
+    # Skeleton in MediaPipe's default colours, for hands that did not come from MediaPipe
+    h, w = frame.shape[:2]
+    points = [(int(lm.x * w), int(lm.y * h)) for lm in hand.landmark]
+    for a, b in HAND_CONNECTIONS:
+        cv2.line(frame, points[a], points[b], (224, 224, 224), 2)
+    for p in points:
+        cv2.circle(frame, p, 3, (48, 48, 255), -1)
+
+
+class _Pacer:
+    # Sleeps so grab() returns at most `fps` times a second, like a camera would;
+    # realtime=False runs flat out for throughput measurements
+    def __init__(self, fps: float, realtime: bool = True):
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.realtime = realtime
+        self.next_t = None
+
+    def wait(self):
+        if not self.realtime or self.period <= 0:
+            return
+        now = time.monotonic()
+        if self.next_t is None or now - self.next_t > self.period:
+            self.next_t = now  # first frame, or we fell behind: don't try to catch up
+        else:
+            time.sleep(max(0.0, self.next_t - now))
+        self.next_t += self.period
+
+
+# === Capture sources ===
+class CaptureSource:
+    # What GestureWorker reads from. grab() advances to the next frame (paced like
+    # a camera), retrieve() returns it as BGR. Sources that already know the hand
+    # positions set provides_landmarks and return them from landmarks(); the
+    # worker then skips MediaPipe but runs the rest of the pipeline unchanged.
+    # mirrored sources produce frames already in preview (selfie) orientation.
+    provides_landmarks = False
+    mirrored = False
+
+    def __init__(self, width: int = None, height: int = None, fps: float = None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+    def open(self) -> bool:
+        return True
+
+    def grab(self) -> bool:
+        raise NotImplementedError
+
+    def retrieve(self):
+        raise NotImplementedError
+
+    def landmarks(self):
+        return None
+
+    def release(self):
+        pass
+
+    def describe(self) -> str:
+        return f"{type(self).__name__} {self.width}x{self.height} @ {self.fps} fps"
+
+
+class CameraSource(CaptureSource):
+    def __init__(self, index: int = 0, width: int = None, height: int = None, fps: float = None):
+        super().__init__(width, height, fps)
+        self.index = index
+        self.cap = None
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            return False
+        try:
+            # Keep the driver queue short so we always infer on a fresh frame
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            if self.width and self.height:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            if self.fps:
+                self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        except Exception:
+            pass
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        return True
+
+    def grab(self) -> bool:
+        # Only dequeues; frames we skip are never decoded
+        return self.cap.grab()
+
+    def retrieve(self):
+        return self.cap.retrieve()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = None
+
+
+class VideoFileSource(CaptureSource):
+    # A recorded webcam session played back as if it were live
+    def __init__(self, path: str, width: int = None, height: int = None, fps: float = None,
+                 loop: bool = True, realtime: bool = True):
+        super().__init__(width, height, fps)
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = None
+        self.pacer = None
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            return False
+        self.fps = self.fps or float(self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.width = self.width or int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = self.height or int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.pacer = _Pacer(self.fps, self.realtime)
+        return True
+
+    def grab(self) -> bool:
+        self.pacer.wait()
+        if self.cap.grab():
+            return True
+        if not self.loop:
+            return False
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return self.cap.grab()
+
+    def retrieve(self):
+        ret, frame = self.cap.retrieve()
+        if ret and (frame.shape[1], frame.shape[0]) != (self.width, self.height):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = None
+
+
+class _LandmarkReplay(CaptureSource):
+    # Shared by sources that hand the worker ready-made landmarks. Frames are a
+    # blank canvas; the worker draws the hands onto it like it does for the camera.
+    provides_landmarks = True
+    mirrored = True
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0, realtime: bool = True):
+        super().__init__(width or 640, height or 480, fps or 30.0)
+        self.realtime = realtime
+        self.pacer = _Pacer(self.fps, realtime)
+        self.current = []
+        self.canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def next_hands(self):
+        raise NotImplementedError
+
+    def grab(self) -> bool:
+        self.pacer.wait()
+        hands = self.next_hands()
+        if hands is None:
+            return False
+        self.current = hands
+        return True
+
+    def retrieve(self):
+        return True, self.canvas.copy()
+
+    def landmarks(self):
+        return self.current or None
+
+
+class LandmarkFileSource(_LandmarkReplay):
+    # Replays a sequence saved with save_landmark_sequence()
+    def __init__(self, path: str, width: int = None, height: int = None, fps: float = None,
+                 loop: bool = True, realtime: bool = True):
+        frames, _, recorded_fps = load_landmark_sequence(path)
+        super().__init__(width, height, fps or recorded_fps, realtime)
+        self.path = path
+        self.frames = frames
+        self.loop = loop
+        self.index = 0
+
+    def next_hands(self):
+        if self.index >= len(self.frames):
+            if not self.loop or not self.frames:
+                return None
+            self.index = 0
+        hands = self.frames[self.index]
+        self.index += 1
+        return hands
+
+
+class SyntheticSource(_LandmarkReplay):
+    # Endless scripted gestures: script is [(fingers or None, seconds), ...], by
+    # default every action held for 1.5 s with a 0.5 s empty gap after each.
+    # With hands > 1 the hands sit side by side, each running the script from
+    # a different point.
+    def __init__(self, script=None, width: int = None, height: int = None, fps: float = None,
+                 jitter: float = 0.004, seed: int = 0, realtime: bool = True, hands: int = 1):
+        super().__init__(width, height, fps, realtime)
+        if script is None:
+            script = []
+            for _, fingers, _ in GESTURES:
+                script += [(list(fingers), 1.5), (None, 0.5)]
+        self.timeline = []  # one entry per frame: fingers or None
+        for fingers, seconds in script:
+            self.timeline += [fingers] * max(1, int(round(seconds * self.fps)))
+        self.jitter = float(jitter)
+        self.rng = random.Random(seed)
+        self.index = 0
+        self.hands = max(1, int(hands))
+        # Evenly spaced slots across the frame, hands scaled down to fit them
+        self.scale = min(1.0, 2.2 / self.hands)
+        self.offsets = [(0.1 + 0.8 * (i + 0.5) / self.hands - 0.5, 0.0) for i in range(self.hands)]
+        if self.hands == 1:
+            self.offsets = [(0.0, 0.0)]
+
+    def next_hands(self):
+        hands = []
+        for i, offset in enumerate(self.offsets):
+            shift = i * len(self.timeline) // self.hands
+            fingers = self.timeline[(self.index + shift) % len(self.timeline)]
+            if fingers is not None:
+                hands.append(synthetic_hand(fingers, jitter=self.jitter, rng=self.rng, offset=offset,
+                                            scale=self.scale))
+        self.index += 1
+        return hands
+
+    def expected_action(self, frame_index: int):
+        fingers = self.timeline[frame_index % len(self.timeline)]
+        if fingers is None:
+            return None
+        return get_gesture_name(fingers)[1]
+
+
+def parse_size(text: str):
+    if not text:
+        return None, None
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def source_from_spec(spec: str, width: int = None, height: int = None, fps: float = None) -> CaptureSource:
+    # "camera[:index]", "file:<video>", "landmarks:<json>" or "synthetic[:hands]"
+    kind, _, arg = (spec or "camera").partition(":")
+    kind = kind.strip().lower()
+    if kind == "camera":
+        return CameraSource(int(arg or 0), width, height, fps)
+    if kind == "file":
+        return VideoFileSource(arg, width, height, fps)
+    if kind == "landmarks":
+        return LandmarkFileSource(arg, width, height, fps)
+    if kind == "synthetic":
+        return SyntheticSource(width=width, height=height, fps=fps, hands=int(arg or 1))
+    raise ValueError(f"unknown capture source '{spec}'")
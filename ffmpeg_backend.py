@@ -0,0 +1,354 @@
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from audio_player import FFmpegAudioPlayer, find_ffmpeg, kill_process
+from perf import profiler
+from video_pipeline import VideoDecoder, VideoInfo, probe_video
+
+# "opencv": cv2.VideoCapture for video plus a separate ffmpeg for audio (default)
+# "scaled": ffmpeg decodes video only, straight to RGB at the canvas size; audio as for opencv
+# "ffmpeg": one ffmpeg process demuxes and decodes both (FFmpegMediaDecoder)
+BACKENDS = ("opencv", "scaled", "ffmpeg")
+
+# Forward seeks up to this far are decoded through instead of restarting ffmpeg
+SKIP_AHEAD_SECONDS = 1.0
+
+# While the window is being resized, frames keep coming at the old size and are
+# scaled in-process; ffmpeg is only restarted once the size has held this long
+RESIZE_SETTLE_SECONDS = 0.3
+
+# OpenCV has to decode every frame it skips, which stops keeping up past this
+# speed; faster playback goes through the ffmpeg decoder's -skip_frame path
+FAST_RATE = 2.0
+
+
+def default_backend() -> str:
+    backend = os.environ.get("GESTURE_PLAYER_BACKEND", "opencv").strip().lower()
+    return backend if backend in BACKENDS else "opencv"
+
+
+def backend_for_rate(rate: float, backend: str = None) -> str:
+    backend = backend or default_backend()
+    if backend == "opencv" and rate > FAST_RATE:
+        return "scaled"
+    return backend
+
+
+def ffmpeg_available(ffmpeg_exe: str) -> bool:
+    return os.path.isfile(ffmpeg_exe) or shutil.which(ffmpeg_exe) is not None
+
+
+def has_audio_stream(ffmpeg_exe: str, file_path: str) -> bool:
+    # ffmpeg with only an input prints the stream list and exits after reading the header
+    try:
+        out = subprocess.run([ffmpeg_exe, "-hide_banner", "-nostdin", "-i", file_path],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=10).stderr
+    except Exception:
+        return False
+    return re.search(rb"Stream #\d+:\d+.*: Audio:", out) is not None
+
+
+# === Shared PCM buffer ===
+class SharedPCM:
+    # Audio the demuxing process decodes alongside the video, in a memory-mapped
+    # temp file sized for the whole track and indexed by sample frame. Only one
+    # contiguous range [start, end) is valid: a restart inside or at the end of
+    # it extends the range, one elsewhere begins a new one.
+    def __init__(self, samplerate: int, channels: int, duration: float):
+        self.sr = int(samplerate)
+        self.channels = int(channels)
+        self.capacity = int((float(duration) + 1.0) * self.sr)
+        self.start = 0
+        self.end = 0
+        self.complete = False
+        self.lock = threading.Lock()
+        fd, self.path = tempfile.mkstemp(prefix="gesture_player_pcm_", suffix=".s16")
+        os.close(fd)
+        self.data = np.memmap(self.path, dtype=np.int16, mode="w+", shape=(self.capacity, self.channels))
+
+    def begin(self, position: int):
+        with self.lock:
+            if not self.start <= position <= self.end:
+                self.start = self.end = position
+            self.complete = False
+
+    def advance(self, position: int):
+        # Frames up to `position` have been written by the current segment
+        with self.lock:
+            if position > self.end:
+                self.end = position
+
+    def finish(self):
+        with self.lock:
+            self.complete = True
+
+    def covers(self, start_frame: int, frames: int) -> bool:
+        if start_frame < self.start:
+            return False
+        return start_frame + frames <= self.end or (self.complete and start_frame < self.end)
+
+    def exhausted(self, start_frame: int) -> bool:
+        # Nothing more will ever arrive for start_frame from the running segment
+        return self.complete and start_frame >= self.end
+
+    def read(self, start_frame: int, frames: int):
+        end = min(start_frame + frames, self.end)
+        if start_frame >= end:
+            return None
+        return self.data[start_frame:end]
+
+    def close(self):
+        self.data = None
+        try:
+            os.remove(self.path)
+        except Exception:
+            pass
+
+
+# === Single-pass ffmpeg decoder ===
+class FFmpegMediaDecoder(VideoDecoder):
+    # Drop-in VideoDecoder that runs one ffmpeg for the file: RGB frames already
+    # scaled to the display size on stdout (swscale does scaling and colour
+    # conversion in one pass over the decoded YUV, so no full-size BGR frame is
+    # ever materialized here), and with audio=True PCM on a second pipe into a
+    # SharedPCM that create_audio_player() hands to FFmpegAudioPlayer. Both
+    # streams come from the same -ss, so audio frame (t * samplerate) lines up
+    # with video frame (t * fps). Frames are read straight into ring buffers.
+    def __init__(self, file_path: str, capacity: int = 12, samplerate: int = 44100, channels: int = 2,
+                 audio: bool = True):
+        # Audio is only decoded as far ahead as the video ring lets ffmpeg run,
+        # so the ring is a little deeper than the OpenCV one
+        self.file_path = file_path
+        self.cap = None
+        self.backend = "ffmpeg" if audio else "scaled"
+        self.ffmpeg_exe = find_ffmpeg()
+        self.proc = None
+        self.proc_size = None
+        self.proc_step = 1
+        self.audio_thread = None
+        self.spawns = 0
+        self.resized_at = 0.0
+        self._staging = None
+        # The PCM pipe is an inherited fd, which needs posix; video alone only needs ffmpeg
+        self.supported = ffmpeg_available(self.ffmpeg_exe) and (os.name == "posix" or not audio)
+        info = VideoInfo(0, 0, 0.0, 0, 0.0)
+        if self.supported:
+            try:
+                info = probe_video(file_path)
+            except Exception as e:
+                print(f"⚠️ ffmpeg backend cannot open {os.path.basename(file_path)}: {e}")
+        super().__init__(file_path, capacity, info=info)
+        self.pcm = None
+        if audio and self.is_opened() and has_audio_stream(self.ffmpeg_exe, file_path):
+            self.pcm = SharedPCM(samplerate, channels, self.duration)
+
+    def is_opened(self) -> bool:
+        return self.supported and self.fps > 0 and self.width > 0 and self.height > 0
+
+    def set_display_box(self, box_width: int, box_height: int):
+        size = self.display_size
+        super().set_display_box(box_width, box_height)
+        if self.display_size != size:
+            self.resized_at = time.monotonic()
+
+    def staging(self):
+        # Scratch frame at the size ffmpeg is currently producing
+        width, height = self.proc_size
+        if self._staging is None or self._staging.shape[:2] != (height, width):
+            self._staging = np.empty((height, width, 3), dtype=np.uint8)
+        return self._staging
+
+    def _spawn(self, frame_index: int):
+        self._kill()
+        width, height = self.display_size
+        # Half a frame early so rounding never drops the target frame itself; passthrough
+        # so frames are never duplicated or dropped and indices stay in step with OpenCV's.
+        # Scaling stays in YUV and the RGB conversion runs on the small frame, which is
+        # cheaper than swscale's combined scale-and-convert path
+        start = max(0.0, (frame_index - 0.5) / self.fps)
+        step = self.frame_step
+        skip, video_filter = [], f"scale={width}:{height}:flags=bilinear,format=yuv420p"
+        if step > 1:
+            # Fast playback: frames nothing references are never decoded at all, and the fps
+            # filter emits every step-th frame time from the rest (a skipped frame becomes
+            # the reference frame before it, at most a frame or two off)
+            skip = ["-skip_frame", "noref"]
+            video_filter = f"fps={self.fps / step:.6f}," + video_filter
+        args = [self.ffmpeg_exe, "-loglevel", "error", "-nostdin", *skip, "-ss", f"{start:.6f}",
+                "-i", self.file_path, "-map", "0:v:0", "-vf", video_filter, "-pix_fmt", "rgb24",
+                "-vsync", "passthrough", "-f", "rawvideo", "pipe:1"]
+        read_fd = write_fd = None
+        if self.pcm is not None:
+            read_fd, write_fd = os.pipe()
+            args += ["-map", "0:a:0", "-ac", str(self.pcm.channels), "-ar", str(self.pcm.sr),
+                     "-f", "s16le", f"pipe:{write_fd}"]
+        try:
+            self.proc = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL, bufsize=0,
+                                         pass_fds=(write_fd,) if write_fd is not None else ())
+        finally:
+            if write_fd is not None:
+                os.close(write_fd)  # the child has its own copy; EOF arrives when it exits
+        self.spawns += 1
+        self.proc_size = (width, height)
+        self.proc_step = step
+        self.next_index = frame_index
+        if read_fd is not None:
+            position = int(round(start * self.pcm.sr))
+            self.pcm.begin(position)
+            self.audio_thread = threading.Thread(target=self._read_audio, args=(self.proc, read_fd, position),
+                                                 daemon=True)
+            self.audio_thread.start()
+
+    def _read_audio(self, proc, fd: int, position: int):
+        pcm = self.pcm
+        frame_bytes = 2 * pcm.channels
+        raw = memoryview(pcm.data.reshape(-1).view(np.uint8))
+        offset = position * frame_bytes
+        try:
+            with open(fd, "rb", buffering=0, closefd=True) as pipe:
+                while True:
+                    if offset >= len(raw):
+                        # Longer than the container said; keep draining so ffmpeg never blocks on us
+                        if not pipe.read(65536):
+                            break
+                        continue
+                    n = pipe.readinto(raw[offset:offset + 65536])
+                    if not n:
+                        break
+                    offset += n
+                    pcm.advance(offset // frame_bytes)
+        except Exception as e:
+            if proc is self.proc and not self.stop_flag.is_set():
+                print(f"⚠️ ffmpeg audio pipe error: {e}")
+            return
+        # A clean EOF from the process that is still current means the track ended
+        if proc is self.proc and proc.wait() == 0:
+            pcm.finish()
+
+    def _kill(self):
+        proc, self.proc = self.proc, None
+        kill_process(proc)
+        if self.audio_thread is not None and self.audio_thread is not threading.current_thread():
+            self.audio_thread.join(timeout=1.0)
+        self.audio_thread = None
+
+    def _read_frame(self, buf) -> bool:
+        view = memoryview(buf.reshape(-1))
+        got = 0
+        while got < len(view):
+            n = self.proc.stdout.readinto(view[got:])
+            if not n:
+                return False
+            got += n
+        return True
+
+    def _seek_to(self, target: int):
+        ahead = target - self.next_index
+        if self.proc is not None and self.proc.poll() is None and self.proc_step == 1 \
+                and 0 <= ahead <= SKIP_AHEAD_SECONDS * self.fps:
+            # Cheaper to decode through than to restart ffmpeg and seek
+            scratch = self.staging()
+            for _ in range(ahead):
+                if not self._read_frame(scratch):
+                    break
+                self.next_index += 1
+            self.next_index = target
+            return
+        self._spawn(target)
+
+    def _run(self):
+        try:
+            while not self.stop_flag.is_set():
+                slot = self.ring.acquire()
+                if slot is None:
+                    continue
+
+                with self.ring.cond:
+                    target, self.seek_target = self.seek_target, None
+                    generation = self.ring.generation
+                    at_eof = self.eof
+                if target is not None:
+                    t0 = time.perf_counter()
+                    self._seek_to(target)
+                    elapsed = time.perf_counter() - t0
+                    self.seek_times.append(elapsed)
+                    profiler.record("video_seek", elapsed, t0)
+                elif at_eof:
+                    self.ring.release(slot)
+                    self.stop_flag.wait(0.02)
+                    continue
+                if self.proc is None or self.proc_step != self.frame_step or (
+                        self.proc_size != self.display_size
+                        and time.monotonic() - self.resized_at >= RESIZE_SETTLE_SECONDS):
+                    # First frame, a new playback rate, or the canvas size has settled:
+                    # restart at the same frame
+                    self._spawn(self.next_index)
+
+                width, height = self.display_size
+                buf = self.ring.buffer(slot, width, height)
+                t0 = profiler.start()
+                if self.proc_size == self.display_size:
+                    ok = self._read_frame(buf)
+                    profiler.stop("video_decode", t0)
+                else:
+                    # Mid-resize: scale the old size into the new one until ffmpeg is restarted
+                    scratch = self.staging()
+                    ok = self._read_frame(scratch)
+                    profiler.stop("video_decode", t0)
+                    if ok:
+                        t0 = profiler.start()
+                        cv2.resize(scratch, (width, height), dst=buf)
+                        profiler.stop("video_scale", t0)
+                if not ok:
+                    self.ring.release(slot)
+                    with self.ring.cond:
+                        if generation == self.ring.generation:
+                            self.eof = True
+                    continue
+                self.ring.commit(slot, generation, self.frame_time(self.next_index), self.next_index)
+                self.next_index += self.proc_step
+        except Exception as e:
+            print(f"⚠️ ffmpeg decoder error: {e}")
+            self.eof = True
+
+    def release(self):
+        super().release()
+        self._kill()
+        if self.pcm is not None:
+            self.pcm.close()
+        self.pcm = None
+
+
+def create_decoder(file_path: str, backend: str = None, rate: float = 1.0):
+    # Decoder for the selected backend (swapped for one that can skip frames when
+    # `rate` is past FAST_RATE), falling back to OpenCV when ffmpeg cannot handle the file
+    backend = backend_for_rate(rate, backend)
+    decoder = None
+    if backend in ("ffmpeg", "scaled"):
+        decoder = FFmpegMediaDecoder(file_path, audio=backend == "ffmpeg")
+        if not decoder.is_opened():
+            decoder.release()
+            print(f"⚠️ ffmpeg backend unavailable for {os.path.basename(file_path)}, using OpenCV")
+            decoder = None
+    if decoder is None:
+        decoder = VideoDecoder(file_path)
+    decoder.set_rate(rate)
+    return decoder
+
+
+def create_audio_player(file_path: str, video, samplerate: int = 44100, channels: int = 2, **kwargs):
+    # Reuses the decoder's PCM when it demuxes audio itself; otherwise the player decodes its own
+    pcm = getattr(video, "pcm", None)
+    if pcm is not None:
+        samplerate, channels = pcm.sr, pcm.channels
+    return FFmpegAudioPlayer(file_path, samplerate=samplerate, channels=channels, duration=video.duration,
+                             pcm_source=pcm, **kwargs)
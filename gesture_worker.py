@@ -0,0 +1,430 @@
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from capture_sources import CameraSource, draw_hand
+from gestures import HandArray, HandLandmarks, format_finger_status, get_gesture_name
+from inference_process import InferenceProcess, mediapipe_hands
+from perf import profiler, startup
+
+# MediaPipe takes about a second to import, so it is loaded on first use (or by
+# the startup warm-up thread) instead of with this module
+mp_hands = None
+mp_draw = None
+_mediapipe_lock = threading.Lock()
+
+
+def load_mediapipe():
+    global mp_hands, mp_draw
+    with _mediapipe_lock:
+        if mp_hands is None:
+            with startup.phase("mediapipe_import"):
+                import mediapipe as mp
+                mp_draw = mp.solutions.drawing_utils
+                mp_hands = mp.solutions.hands
+    return mp_hands
+
+PREVIEW_SIZE = (320, 240)
+INFERENCE_MODES = ("thread", "process")
+
+GestureResult = namedtuple(
+    "GestureResult",
+    ["seq", "timestamp", "preview", "landmarks", "fingers", "gesture_display", "gesture", "finger_status", "inferred",
+     "captured"],
+)
+
+
+def landmark_bounds(hands_landmarks, margin: float = 0.3):
+    # Square box (normalized x0, y0, x1, y1) around every landmark, padded by margin
+    xs = [lm.x for hand in hands_landmarks for lm in hand.landmark]
+    ys = [lm.y for hand in hands_landmarks for lm in hand.landmark]
+    cx = (min(xs) + max(xs)) / 2
+    cy = (min(ys) + max(ys)) / 2
+    half = max(max(xs) - min(xs), max(ys) - min(ys)) * (0.5 + margin)
+    return (max(0.0, cx - half), max(0.0, cy - half), min(1.0, cx + half), min(1.0, cy + half))
+
+
+# === Adaptive inference scheduling ===
+class InferenceScheduler:
+    # Runs inference at active_rate while a hand is around and drops to
+    # idle_rate once none has been seen for idle_after seconds. Between full
+    # frame detections (every full_every inferences) only the region around the
+    # last hand is processed. Inference is also capped at `budget` of the
+    # worker's time: MediaPipe's cost grows with every extra hand, and past
+    # that point the rate drops instead of the preview and capture stalling.
+    def __init__(self, active_rate: float = 30.0, idle_rate: float = 5.0, idle_after: float = 1.0,
+                 full_every: int = 15, budget: float = 0.75):
+        self.active_rate = float(active_rate)
+        self.idle_rate = float(idle_rate)
+        self.idle_after = float(idle_after)
+        self.full_every = int(full_every)
+        self.last_inference = 0.0
+        self.last_hand_seen = 0.0
+        self.since_full = 0
+        self.inferences = 0
+        self.skipped = 0
+        self.budget = float(budget)
+        self.cost = 0.0  # smoothed seconds per inference
+
+    def rate(self, now: float) -> float:
+        if now - self.last_hand_seen < self.idle_after:
+            rate = self.active_rate
+        else:
+            rate = min(self.idle_rate, self.active_rate)
+        if self.cost > 0 and self.budget > 0:
+            rate = min(rate, self.budget / self.cost)
+        return rate
+
+    def due(self, now: float) -> bool:
+        rate = self.rate(now)
+        # A few ms of slack so camera-paced frames at exactly 1/rate are not skipped
+        if rate <= 0 or now - self.last_inference < 1.0 / rate - 0.005:
+            self.skipped += 1
+            return False
+        return True
+
+    def full_due(self) -> bool:
+        return self.since_full >= self.full_every
+
+    def observe(self, now: float, hand_found: bool, full: bool, cost: float = None):
+        # now: when the inferred frame was taken; with a separate inference process
+        # results come back after later frames have already been submitted
+        if cost is not None:
+            self.cost = cost if self.cost == 0 else self.cost * 0.9 + cost * 0.1
+        self.last_inference = max(self.last_inference, now)
+        self.inferences += 1
+        self.since_full = 0 if full else self.since_full + 1
+        if hand_found:
+            self.last_hand_seen = now
+
+
+# === Single-slot mailbox ===
+class LatestSlot:
+    # Writers overwrite, readers only ever see the newest item. Rebinding one
+    # attribute is atomic under the GIL, so neither side takes a lock and a
+    # slow reader simply misses intermediate results instead of queueing them.
+    def __init__(self):
+        self._item = None
+
+    def put(self, item):
+        self._item = item
+
+    def peek(self):
+        return self._item
+
+    def clear(self):
+        self._item = None
+
+
+# === Gesture worker ===
+class GestureWorker:
+    # Reads frames from a CaptureSource (the webcam by default; see capture_sources
+    # for recorded video, recorded landmarks and synthetic input) and publishes
+    # GestureResults through a LatestSlot. inference="process" runs the hand
+    # model in a child process (see inference_process) instead of on this thread.
+    def __init__(self, camera_index: int = 0, max_num_hands: int = 1, active_rate: float = 30.0,
+                 idle_rate: float = 5.0, use_roi: bool = True, roi_size: int = 256, source=None,
+                 inference: str = "thread", hands_factory=None):
+        if inference not in INFERENCE_MODES:
+            raise ValueError(f"unknown inference mode '{inference}' (expected one of {', '.join(INFERENCE_MODES)})")
+        self.source = source if source is not None else CameraSource(camera_index)
+        self.inference = inference
+        self.hands_factory = hands_factory or mediapipe_hands  # max_num_hands -> object with process()/close()
+        self.remote = None
+        self.max_num_hands = max_num_hands
+        self.scheduler = InferenceScheduler(active_rate=active_rate, idle_rate=idle_rate)
+        self.use_roi = use_roi
+        self.roi_size = int(roi_size)
+        self.roi = None
+        self.last_landmarks = None
+        self.opened = False
+        self.thread = None
+        self.stop_flag = threading.Event()
+        self.results = LatestSlot()
+        self.seq = 0
+        self.ready = threading.Event()  # source open and hand model loaded
+        self.error = None               # set instead of ready when startup failed
+
+    def open(self) -> bool:
+        self.opened = self.source.open()
+        return self.opened
+
+    def start(self):
+        # Returns at once; the camera and model come up on the worker thread and
+        # the UI polls `ready` / `error`
+        self.stop_flag.clear()
+        self.ready.clear()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True, name="gesture-worker")
+        self.thread.start()
+        return True
+
+    def _run(self):
+        if not self.opened:
+            with startup.phase("camera_open"):
+                try:
+                    opened = self.open()
+                except Exception as e:
+                    print(f"⚠️ Capture source error: {e}")
+                    opened = False
+            if not opened:
+                self.error = "Cannot access webcam." if isinstance(self.source, CameraSource) \
+                    else f"Cannot open capture source ({type(self.source).__name__})."
+                return
+        # The Hands graphs are created here so they are only ever touched by this thread.
+        # Crops get their own instance so its tracking state never mixes with full frames.
+        # Sources that already carry landmarks never need MediaPipe at all.
+        hands = roi_hands = remote = None
+        if not self.source.provides_landmarks and self.inference == "process":
+            with startup.phase("hands_model"):
+                remote = self._start_process()
+            if remote is None:
+                return
+        elif not self.source.provides_landmarks:
+            try:
+                if self.hands_factory is mediapipe_hands:
+                    load_mediapipe()
+                with startup.phase("hands_model"):
+                    hands = self.hands_factory(self.max_num_hands)
+                    roi_hands = self.hands_factory(self.max_num_hands) if self.use_roi else None
+            except Exception as e:
+                self.error = f"Hand tracking unavailable: {e}"
+                return
+        self.ready.set()
+        try:
+            while not self.stop_flag.is_set():
+                t0 = profiler.start()
+                ret = self.source.grab()
+                profiler.stop("camera_read", t0)
+                if not ret:
+                    time.sleep(0.01)
+                    continue
+                captured = time.monotonic()
+                infer = self.scheduler.due(captured)
+                ret, frame = self.source.retrieve()
+                if not ret:
+                    continue
+                try:
+                    if remote is not None:
+                        result = self.process_frame_remote(remote, frame, infer=infer, captured=captured)
+                    else:
+                        result = self.process_frame(hands, frame, infer=infer, roi_hands=roi_hands,
+                                                    captured=captured)
+                    self.results.put(result)
+                except Exception as e:
+                    print(f"⚠️ Gesture worker error: {e}")
+                if remote is not None and remote.error is not None:
+                    self.error = f"Hand tracking unavailable: {remote.error}"
+                    break
+        except Exception as e:
+            print(f"⚠️ Gesture worker fatal: {e}")
+        finally:
+            if hands is not None:
+                hands.close()
+            if roi_hands is not None:
+                roi_hands.close()
+            self._close_process()
+
+    def _start_process(self):
+        size = (self.source.width or 640, self.source.height or 480)
+        remote = InferenceProcess(self.max_num_hands, size, use_roi=self.use_roi, hands_factory=self.hands_factory)
+        self.remote = remote
+        try:
+            started = remote.start(cancel=self.stop_flag)
+        except Exception as e:
+            remote.error = str(e)
+            started = False
+        if not started:
+            self.error = f"Hand tracking unavailable: {remote.error}"
+            self._close_process()
+            return None
+        return remote
+
+    def _close_process(self):
+        # The worker thread closes the process on its way out
+        remote, self.remote = self.remote, None
+        if remote is not None:
+            try:
+                remote.close()
+            except Exception as e:
+                print(f"⚠️ Inference process shutdown failed: {e}")
+
+    def roi_box(self, shape):
+        # Pixel box (x0, y0, x1, y1) to run the crop model on, or None for a full-frame pass
+        if self.roi is None or self.scheduler.full_due():
+            return None
+        h, w = shape[:2]
+        x0, y0, x1, y1 = self.roi
+        px0, py0, px1, py1 = int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h)
+        if px1 - px0 > 8 and py1 - py0 > 8:
+            return px0, py0, px1, py1
+        return None
+
+    def crop_size(self, box):
+        # (width, height) a crop is shrunk to before inference
+        width, height = box[2] - box[0], box[3] - box[1]
+        scale = min(1.0, self.roi_size / max(width, height))
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    @staticmethod
+    def from_crop(hands, box, shape):
+        # Map crop-relative coordinates back onto the full frame
+        h, w = shape[:2]
+        sx, sy = (box[2] - box[0]) / w, (box[3] - box[1]) / h
+        ox, oy = box[0] / w, box[1] / h
+        mapped = []
+        for hand in hands:
+            if isinstance(hand, HandLandmarks):
+                hand = HandLandmarks(hand.array * (sx, sy, 1.0) + (ox, oy, 0.0))
+            else:
+                for lm in hand.landmark:
+                    lm.x = ox + lm.x * sx
+                    lm.y = oy + lm.y * sy
+            mapped.append(hand)
+        return mapped
+
+    def detect(self, hands, rgb, roi_hands=None):
+        # Returns (multi_hand_landmarks or None, ran_full_frame)
+        if self.source.provides_landmarks:
+            profiler.count("inference_full")
+            return self.source.landmarks(), True
+        box = self.roi_box(rgb.shape) if roi_hands is not None else None
+        if box is not None:
+            px0, py0, px1, py1 = box
+            crop = rgb[py0:py1, px0:px1]
+            size = self.crop_size(box)
+            if size != (px1 - px0, py1 - py0):
+                crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+            else:
+                crop = np.ascontiguousarray(crop)
+            results = roi_hands.process(crop)
+            if results and results.multi_hand_landmarks:
+                profiler.count("inference_roi")
+                return self.from_crop(results.multi_hand_landmarks, box, rgb.shape), False
+            # Lost the hand inside the ROI; fall back to the full frame right away
+
+        results = hands.process(rgb)
+        profiler.count("inference_full")
+        return (results.multi_hand_landmarks if results else None), True
+
+    def process_frame(self, hands, frame, infer: bool = True, roi_hands=None, captured: float = None):
+        if not self.source.mirrored:
+            frame = cv2.flip(frame, 1)
+
+        landmarks = None
+        if infer:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            t0 = time.perf_counter()
+            landmarks, full = self.detect(hands, rgb, roi_hands)
+            t1 = time.perf_counter()
+            profiler.record("inference", t1 - t0, t0)
+            self.scheduler.observe(time.monotonic(), bool(landmarks), full, cost=t1 - t0)
+        return self.make_result(frame, landmarks, infer, captured)
+
+    def process_frame_remote(self, remote, frame, infer: bool = True, captured: float = None):
+        # Process-mode counterpart of process_frame. This frame goes to the child
+        # if a slot is free; results are then awaited until the next frame is due,
+        # so a child that keeps up adds no latency, and one that does not keeps
+        # working on the other slot while this thread goes back to the source.
+        if not self.source.mirrored:
+            frame = cv2.flip(frame, 1)
+        captured = captured if captured is not None else time.monotonic()
+
+        slot = remote.free_slot() if infer else None
+        if slot is not None:
+            h, w = frame.shape[:2]
+            if not remote.capacity(w, h):
+                remote.resize(w, h)
+            else:
+                box = self.roi_box(frame.shape) if remote.use_roi else None
+                image = frame
+                if box is not None:
+                    image = frame[box[1]:box[3], box[0]:box[2]]
+                    size = self.crop_size(box)
+                    if size != (image.shape[1], image.shape[0]):
+                        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+                # Converted straight into shared memory; the child reads it from there
+                cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=remote.frame(slot, image.shape[0], image.shape[1]))
+                remote.submit(slot, image.shape[0], image.shape[1], roi=box is not None,
+                              tag=(captured, box, frame.shape))
+
+        fps = self.source.fps if getattr(self.source, "realtime", True) else None
+        wait = captured + 1.0 / fps - time.monotonic() if fps else 0.0
+        finished = None
+        for tag, landmarks, cost in remote.poll(max(0.0, wait)):
+            taken, box, shape = tag
+            full = box is None
+            if landmarks and not full:
+                landmarks = self.from_crop(landmarks, box, shape)
+            profiler.record("inference", cost)
+            profiler.count("inference_full" if full else "inference_roi")
+            # A crop that lost the hand clears the ROI, so the next request is a full frame
+            self.scheduler.observe(taken, bool(landmarks), full, cost=cost)
+            finished = (landmarks, taken)
+
+        if finished is None:
+            return self.make_result(frame, None, False, captured)
+        landmarks, taken = finished
+        return self.make_result(frame, landmarks, True, taken)
+
+    def make_result(self, frame, landmarks, inferred: bool, captured: float = None):
+        # inferred: landmarks are a fresh detection to classify; otherwise the last one is drawn
+        fingers = None
+        gesture = None
+        gesture_display = "None"
+
+        if inferred:
+            self.roi = landmark_bounds(landmarks) if landmarks else None
+            self.last_landmarks = landmarks
+
+            if landmarks:
+                # All hands in one pass; like before, the last hand reported is the one acted on
+                all_fingers, _ = HandArray.from_hands(landmarks).classify()
+                fingers = all_fingers[-1].tolist()
+                gesture_display, gesture = get_gesture_name(fingers)
+        else:
+            landmarks = self.last_landmarks
+
+        if landmarks:
+            for handLms in landmarks:
+                if isinstance(handLms, HandLandmarks):
+                    draw_hand(frame, handLms)
+                else:
+                    mp_draw.draw_landmarks(frame, handLms, mp_hands.HAND_CONNECTIONS)
+
+        self.seq += 1
+        return GestureResult(
+            seq=self.seq,
+            timestamp=time.time(),
+            preview=cv2.cvtColor(cv2.resize(frame, PREVIEW_SIZE), cv2.COLOR_BGR2RGB),
+            landmarks=landmarks,
+            fingers=fingers,
+            gesture_display=gesture_display,
+            gesture=gesture,
+            finger_status=format_finger_status(fingers),
+            inferred=inferred,
+            captured=captured if captured is not None else time.monotonic(),
+        )
+
+    def stop(self):
+        self.stop_flag.set()
+        remote = self.remote
+        if self.thread and self.thread.is_alive() and threading.current_thread() != self.thread:
+            try:
+                # Shutting the inference process down takes up to a couple of seconds
+                self.thread.join(timeout=1.0 if remote is None else 3.0)
+            except Exception:
+                pass
+            if remote is not None and self.thread.is_alive():
+                remote.kill()
+        self.thread = None
+        if self.opened:
+            try:
+                self.source.release()
+            except Exception:
+                pass
+        self.opened = False
+        self.results.clear()
@@ -0,0 +1,336 @@
+import json
+import time
+from collections import namedtuple
+
+import numpy as np
+
+FINGER_TIPS = [4, 8, 12, 16, 20]
+FINGER_NAMES = ["👍", "☝️", "🖕", "💍", "🤙"]
+
+Landmark = namedtuple("Landmark", ["x", "y", "z"])
+
+
+class HandLandmarks:
+    # Plain stand-in for a MediaPipe NormalizedLandmarkList, so recorded hands
+    # can go through the same code as live ones. `array` holds the same points as (21, 3).
+    def __init__(self, points):
+        self.array = np.zeros((21, 3), dtype=np.float32)
+        pts = np.asarray(points, dtype=np.float32)
+        self.array[:, :pts.shape[1]] = pts
+        self.landmark = [Landmark(float(p[0]), float(p[1]), float(p[2])) for p in self.array]
+
+    @classmethod
+    def from_mediapipe(cls, hand):
+        return cls([(lm.x, lm.y, lm.z) for lm in hand.landmark])
+
+    def to_list(self):
+        return [[lm.x, lm.y, lm.z] for lm in self.landmark]
+
+
+def hand_points(hand) -> np.ndarray:
+    # (21, 3) float32 for a HandLandmarks or a MediaPipe landmark list
+    points = getattr(hand, "array", None)
+    if points is not None:
+        return points
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand.landmark], dtype=np.float32)
+
+
+def get_fingers_up(hand):
+    fingers = []
+    fingers.append(1 if hand.landmark[4].x < hand.landmark[3].x else 0)
+    for tip in FINGER_TIPS[1:]:
+        fingers.append(1 if hand.landmark[tip].y < hand.landmark[tip - 2].y else 0)
+    return fingers
+
+
+# (action, fingers as thumb..pinky, display text)
+GESTURES = [
+    ("play", (0, 1, 1, 1, 1), "✋ PLAY"),
+    ("pause", (0, 0, 0, 0, 0), "✊ PAUSE"),
+    ("forward", (0, 1, 0, 0, 0), "☝️ FORWARD"),
+    ("rewind", (1, 0, 0, 0, 0), "👍 REWIND"),
+    ("mute", (0, 1, 1, 0, 0), "✌️ MUTE/UNMUTE"),
+    ("restart", (0, 1, 0, 0, 1), "🤘 RESTART"),
+    ("next", (0, 1, 1, 1, 0), "⏭ NEXT"),
+    ("previous", (0, 0, 1, 1, 1), "⏮ PREVIOUS"),
+    ("faster", (1, 1, 0, 0, 0), "⏩ FASTER"),
+    ("slower", (1, 0, 0, 0, 1), "⏪ SLOWER"),
+]
+UNKNOWN_GESTURE = ("❓ UNKNOWN", None)
+_GESTURE_BY_FINGERS = {tuple(fingers): (display, action) for action, fingers, display in GESTURES}
+
+# Finger vectors as a 5-bit code (thumb = highest bit) -> index into ACTIONS, or -1
+FINGER_BITS = np.array([16, 8, 4, 2, 1], dtype=np.int16)
+GESTURE_TABLE = np.full(32, -1, dtype=np.int8)
+for _i, (_, _fingers, _) in enumerate(GESTURES):
+    GESTURE_TABLE[int(np.dot(_fingers, FINGER_BITS))] = _i
+
+
+def get_gesture_name(fingers):
+    return _GESTURE_BY_FINGERS.get(tuple(fingers), UNKNOWN_GESTURE)
+
+
+def format_finger_status(fingers):
+    if not fingers:
+        return "- - - - -"
+    return " ".join([FINGER_NAMES[i] if fingers[i] == 1 else "✖" for i in range(5)])
+
+
+# ===== Vectorized hand features =====
+_PIPS = [6, 10, 14, 18]
+_TIPS = FINGER_TIPS[1:]
+
+
+def canonical_points(points: np.ndarray, aspect: float = 1.0) -> np.ndarray:
+    # (n, 21, 3) image-space landmarks -> (n, 21, 2) in each hand's own frame:
+    # wrist at the origin, wrist -> middle-finger knuckle pointing along -y (up,
+    # as in an upright hand on screen) and palm length 1. aspect is frame
+    # width / height, so x and y are rotated in the same units.
+    xy = points[..., :2] - points[:, :1, :2]
+    if aspect != 1.0:
+        xy = xy * np.array([aspect, 1.0], dtype=np.float32)
+    axis = xy[:, 9]
+    length = np.linalg.norm(axis, axis=1)
+    length[length == 0] = 1.0
+    up = axis / length[:, None]
+    # Columns project onto (right, up): right is up rotated 90 degrees clockwise on screen
+    local_x = xy[..., 0] * -up[:, None, 1] + xy[..., 1] * up[:, None, 0]
+    local_y = -(xy[..., 0] * up[:, None, 0] + xy[..., 1] * up[:, None, 1])
+    return np.stack([local_x, local_y], axis=-1) / length[:, None, None]
+
+
+def hand_chirality(points: np.ndarray) -> np.ndarray:
+    # +1 when the thumb sits on the image-left of the palm (a right hand in the
+    # mirrored preview, palm to camera), -1 for the mirror image; per hand
+    v1 = points[:, 5, :2] - points[:, 0, :2]
+    v2 = points[:, 17, :2] - points[:, 0, :2]
+    cross = v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0]
+    return np.where(cross >= 0, 1, -1).astype(np.int8)
+
+
+def fingers_up_batch(points: np.ndarray, rotation_invariant: bool = False, chirality=None) -> np.ndarray:
+    # (n, 21, 3) -> (n, 5) int8. The default matches get_fingers_up() exactly.
+    # rotation_invariant reads fingers relative to the palm instead of the image
+    # axes, and points the thumb test the right way for either hand.
+    if not rotation_invariant:
+        fingers = np.empty((len(points), 5), dtype=np.int8)
+        fingers[:, 0] = points[:, 4, 0] < points[:, 3, 0]
+        fingers[:, 1:] = points[:, _TIPS, 1] < points[:, _PIPS, 1]
+        return fingers
+    local = canonical_points(points)
+    if chirality is None:
+        chirality = hand_chirality(points)
+    fingers = np.empty((len(points), 5), dtype=np.int8)
+    fingers[:, 0] = (local[:, 4, 0] - local[:, 3, 0]) * chirality < 0
+    fingers[:, 1:] = local[:, _TIPS, 1] < local[:, _PIPS, 1]
+    return fingers
+
+
+def gesture_codes(fingers: np.ndarray) -> np.ndarray:
+    # (n, 5) finger vectors -> (n,) index into ACTIONS, -1 for no gesture
+    return GESTURE_TABLE[fingers.astype(np.int16) @ FINGER_BITS]
+
+
+def hand_features(points: np.ndarray, aspect: float = 1.0) -> np.ndarray:
+    # (n, 21, 3) -> (n, 48) float32 descriptor that does not change with the
+    # hand's position, size, in-plane rotation or handedness: canonical x/y of
+    # every landmark (left hands mirrored onto right ones), then per finger the
+    # tip's distance from the wrist over the knuckle's, then the hand's roll
+    local = canonical_points(points, aspect)
+    chirality = hand_chirality(points)
+    local[..., 0] *= chirality[:, None]
+    tips = np.linalg.norm(local[:, FINGER_TIPS], axis=-1)
+    knuckles = np.linalg.norm(local[:, [2, 5, 9, 13, 17]], axis=-1)
+    extension = tips / np.maximum(knuckles, 1e-6)
+    axis = points[:, 9, :2] - points[:, 0, :2]
+    roll = np.arctan2(axis[:, 0] * aspect, -axis[:, 1]) * chirality
+    return np.concatenate([local.reshape(len(points), -1), extension, roll[:, None]], axis=1).astype(np.float32)
+
+
+class HandArray:
+    # Landmarks of several hands as one (hands, 21, 3) float32 array, so finger
+    # state, features and gesture lookup run once per frame for all hands
+    def __init__(self, points, chirality=None):
+        self.points = np.asarray(points, dtype=np.float32).reshape(-1, 21, 3)
+        self.chirality = chirality
+
+    @classmethod
+    def from_hands(cls, hands):
+        if not hands:
+            return cls(np.zeros((0, 21, 3), dtype=np.float32))
+        return cls(np.stack([hand_points(hand) for hand in hands]))
+
+    def __len__(self):
+        return len(self.points)
+
+    def hand(self, i: int) -> HandLandmarks:
+        return HandLandmarks(self.points[i])
+
+    def fingers_up(self, rotation_invariant: bool = False) -> np.ndarray:
+        return fingers_up_batch(self.points, rotation_invariant, self.chirality)
+
+    def classify(self, rotation_invariant: bool = False):
+        # (fingers (n, 5), gesture codes (n,)); map codes through ACTIONS
+        fingers = self.fingers_up(rotation_invariant)
+        return fingers, gesture_codes(fingers)
+
+    def features(self, aspect: float = 1.0) -> np.ndarray:
+        return hand_features(self.points, aspect)
+
+
+# ===== Temporal smoothing =====
+ACTIONS = [action for action, _, _ in GESTURES]
+MOTION_POINTS = [0, 4, 8, 12, 16, 20]  # wrist and fingertips
+
+
+class GestureEngine:
+    # Debounces per-frame classifications before anything is dispatched:
+    #   idle -> active  once one gesture wins `required` of the last `window` votes
+    #                   (and the newest frame agrees); fires the action once
+    #   active          gestures listed in `repeat` fire again every 1/rate s after
+    #                   `repeat_delay` while held, e.g. continuous scrubbing
+    #   active -> idle  after `release_frames` consecutive frames disagree
+    # Frames where the hand moves faster than `max_motion` (normalized units per
+    # frame) vote for nothing, which swallows misreads during transitions.
+    def __init__(self, window: int = 8, required: int = 5, release_frames: int = 3, repeat=None,
+                 repeat_delay: float = 0.4, max_motion: float = 0.08):
+        self.window = int(window)
+        self.required = int(required)
+        self.release_frames = int(release_frames)
+        self.repeat = dict(repeat or {})
+        self.repeat_delay = float(repeat_delay)
+        self.max_motion = float(max_motion)
+
+        self.fingers = np.zeros((self.window, 5), dtype=np.int8)
+        self.points = np.zeros((self.window, len(MOTION_POINTS), 2), dtype=np.float32)
+        self.votes = np.full(self.window, -1, dtype=np.int8)
+        self.has_hand = np.zeros(self.window, dtype=bool)
+        self.head = 0
+        self.filled = 0
+
+        self.active = None
+        self.active_since = 0.0
+        self.last_fire = 0.0
+        self.disagree = 0
+        self.confidence = 0.0
+
+    def reset(self):
+        self.votes.fill(-1)
+        self.has_hand.fill(False)
+        self.head = 0
+        self.filled = 0
+        self.active = None
+        self.disagree = 0
+        self.confidence = 0.0
+
+    def _push(self, fingers, hand):
+        prev = (self.head - 1) % self.window
+        i = self.head
+        vote = -1
+        motion = 0.0
+        if fingers is not None:
+            self.fingers[i] = fingers
+            if hand is not None:
+                self.points[i] = hand_points(hand)[MOTION_POINTS, :2]
+                if self.has_hand[prev]:
+                    motion = float(np.abs(self.points[i] - self.points[prev]).mean())
+            action = int(GESTURE_TABLE[int(np.dot(self.fingers[i], FINGER_BITS))])
+            if action >= 0 and motion <= self.max_motion:
+                vote = action
+        self.votes[i] = vote
+        self.has_hand[i] = hand is not None
+        self.head = (i + 1) % self.window
+        self.filled = min(self.filled + 1, self.window)
+        return vote
+
+    def update(self, fingers, hand=None, timestamp: float = None):
+        # Feed one classified frame (fingers=None when no hand); returns an action to fire or None
+        now = timestamp if timestamp is not None else time.monotonic()
+        vote = self._push(fingers, hand)
+
+        counts = np.bincount(self.votes[self.votes >= 0], minlength=len(ACTIONS))
+        best = int(counts.argmax())
+        self.confidence = counts[best] / self.window
+
+        if self.active is not None:
+            if vote == ACTIONS.index(self.active):
+                self.disagree = 0
+            else:
+                self.disagree += 1
+                if self.disagree >= self.release_frames:
+                    self.active = None
+
+        winner = ACTIONS[best] if counts[best] >= self.required and vote == best else None
+        if winner is not None and winner != self.active:
+            self.active = winner
+            self.active_since = now
+            self.last_fire = now
+            self.disagree = 0
+            return winner
+
+        if self.active is not None and self.active in self.repeat and self.disagree == 0:
+            interval = 1.0 / max(1e-6, float(self.repeat[self.active]))
+            if now - self.active_since >= self.repeat_delay and now - self.last_fire >= interval:
+                self.last_fire = now
+                return self.active
+        return None
+
+
+def replay_sequence(frames, fps: float, engine=None):
+    # Runs a recorded landmark sequence through the engine; returns [(frame_index, action)]
+    engine = engine or GestureEngine()
+    fired = []
+    for i, hands in enumerate(frames):
+        hand = hands[-1] if hands else None
+        fingers = get_fingers_up(hand) if hand is not None else None
+        action = engine.update(fingers, hand, timestamp=i / fps)
+        if action:
+            fired.append((i, action))
+    return fired
+
+# ===== Synthetic and recorded landmarks =====
+# Finger joints as (x, y) for the right hand seen in the mirrored preview
+_THUMB_UP = [(0.44, 0.80), (0.40, 0.74), (0.37, 0.69), (0.33, 0.64)]
+_THUMB_FOLDED = [(0.44, 0.80), (0.41, 0.74), (0.40, 0.69), (0.44, 0.68)]
+_FINGER_X = [0.44, 0.50, 0.56, 0.61]
+_FINGER_UP_Y = [0.65, 0.55, 0.48, 0.42]
+_FINGER_DOWN_Y = [0.65, 0.58, 0.62, 0.66]
+
+
+def synthetic_hand(fingers, jitter: float = 0.0, rng=None, offset=(0.0, 0.0), scale: float = 1.0):
+    # Builds 21 landmarks that get_fingers_up() reads back as `fingers`
+    points = [(0.5, 0.85)]
+    points += _THUMB_UP if fingers[0] else _THUMB_FOLDED
+    for i, up in enumerate(fingers[1:]):
+        ys = _FINGER_UP_Y if up else _FINGER_DOWN_Y
+        points += [(_FINGER_X[i], y) for y in ys]
+
+    out = []
+    for x, y in points:
+        x = 0.5 + (x - 0.5) * scale + offset[0]
+        y = 0.85 + (y - 0.85) * scale + offset[1]
+        if jitter and rng is not None:
+            x += rng.gauss(0.0, jitter)
+            y += rng.gauss(0.0, jitter)
+        out.append((x, y, 0.0))
+    return HandLandmarks(out)
+
+
+def save_landmark_sequence(path: str, frames, fps: float = 30.0, labels=None):
+    # frames: one list of hands per frame (empty list when no hand was seen)
+    data = {"fps": fps, "frames": []}
+    for i, hands in enumerate(frames):
+        entry = {"hands": [[[round(c, 4) for c in p] for p in hand.to_list()] for hand in hands]}
+        if labels is not None:
+            entry["label"] = labels[i]
+        data["frames"].append(entry)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def load_landmark_sequence(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    frames = [[HandLandmarks(points) for points in entry.get("hands", [])] for entry in data["frames"]]
+    labels = [entry.get("label") for entry in data["frames"]]
+    return frames, labels, float(data.get("fps", 30.0))
@@ -0,0 +1,200 @@
+import numpy as np
+
+from gestures import GestureEngine, HandArray, hand_chirality
+
+PALM_POINTS = [0, 5, 9, 13, 17]  # wrist and knuckles; steadier than fingertips for matching
+POLICIES = ("first", "dominant", "largest", "combo", "any")
+
+# Two hands holding these gestures at once fire the combined action (order does not matter)
+DEFAULT_COMBOS = {
+    ("forward", "forward"): "next",
+    ("rewind", "rewind"): "previous",
+}
+# Frames the first hand's half of a combo waits for the other hand's engine to catch up
+COMBO_GRACE_FRAMES = 2
+
+
+class TrackedHand:
+    def __init__(self, track_id: int, engine, now: float):
+        self.id = track_id
+        self.engine = engine  # per-hand debouncing
+        self.first_seen = now
+        self.last_seen = now
+        self.missed = 0
+        self.center = None
+        self.size = 0.0       # wrist -> middle knuckle, larger when closer to the camera
+        self.chirality = 1    # see gestures.hand_chirality
+        self.fingers = None
+        self.hand = None
+
+    @property
+    def visible(self) -> bool:
+        return self.missed == 0
+
+
+# === Hand tracker ===
+class HandTracker:
+    # Gives every detected hand an ID that persists across frames by matching
+    # palm centres to the previous frame's (greedy nearest first, within
+    # max_distance in normalized units). Each track owns a GestureEngine, so
+    # one hand changing pose never resets another's debouncing. Tracks survive
+    # max_missed frames without a match before their ID is dropped.
+    # rotation_invariant reads fingers relative to the palm, which also gets
+    # the thumb right on left hands (see gestures.fingers_up_batch).
+    def __init__(self, make_engine=GestureEngine, max_distance: float = 0.2, max_missed: int = 10,
+                 rotation_invariant: bool = False):
+        self.make_engine = make_engine
+        self.rotation_invariant = rotation_invariant
+        self.max_distance = float(max_distance)
+        self.max_missed = int(max_missed)
+        self.tracks = []
+        self.next_id = 1
+
+    def _match(self, centers):
+        # [(track index, detection index)] for pairs within max_distance
+        if not self.tracks or not len(centers):
+            return []
+        previous = np.stack([t.center for t in self.tracks])
+        dist = np.linalg.norm(previous[:, None, :] - centers[None, :, :], axis=-1)
+        pairs = []
+        used_tracks, used_hands = set(), set()
+        for flat in np.argsort(dist, axis=None):
+            ti, hi = divmod(int(flat), dist.shape[1])
+            if dist[ti, hi] > self.max_distance:
+                break
+            if ti in used_tracks or hi in used_hands:
+                continue
+            pairs.append((ti, hi))
+            used_tracks.add(ti)
+            used_hands.add(hi)
+        return pairs
+
+    def update(self, hands, timestamp: float):
+        # Feed one inferred frame's landmarks (None or []: no hands); returns
+        # {track id: action} for every hand whose engine fired this frame
+        batch = HandArray.from_hands(hands or [])
+        fingers, _ = batch.classify(self.rotation_invariant)
+        centers = batch.points[:, PALM_POINTS, :2].mean(axis=1)
+        sizes = np.linalg.norm(batch.points[:, 9, :2] - batch.points[:, 0, :2], axis=1)
+        chirality = hand_chirality(batch.points) if len(batch) else []
+
+        matched = dict((hi, self.tracks[ti]) for ti, hi in self._match(centers))
+        for track in self.tracks:
+            track.missed += 1
+        for hi in range(len(batch)):
+            track = matched.get(hi)
+            if track is None:
+                track = TrackedHand(self.next_id, self.make_engine(), timestamp)
+                self.next_id += 1
+                self.tracks.append(track)
+            track.missed = 0
+            track.last_seen = timestamp
+            track.center = centers[hi]
+            track.size = float(sizes[hi])
+            track.chirality = int(chirality[hi])
+            track.fingers = fingers[hi].tolist()
+            track.hand = hands[hi]
+
+        fired = {}
+        for track in self.tracks:
+            if track.visible:
+                action = track.engine.update(track.fingers, track.hand, timestamp)
+            else:
+                track.fingers = track.hand = None
+                action = track.engine.update(None, None, timestamp)
+            if action:
+                fired[track.id] = action
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+        return fired
+
+    def visible(self):
+        return [t for t in self.tracks if t.visible]
+
+    def get(self, track_id: int):
+        return next((t for t in self.tracks if t.id == track_id), None)
+
+    def reset(self):
+        self.tracks = []
+
+
+# === Arbitration ===
+class GestureArbiter:
+    # Decides which of the hands' fired actions are dispatched:
+    #   first     the hand that has been in view longest owns control until it leaves
+    #   dominant  the largest hand of the `dominant` side ("right"/"left"), else the largest
+    #   largest   the hand closest to the camera
+    #   combo     two hands holding a pair in `combos` fire the combined action once;
+    #             otherwise like first, but with another hand in view a gesture that
+    #             starts a combo waits up to `grace` frames and is dropped if it completes
+    #   any       every hand's actions
+    def __init__(self, policy: str = "first", dominant: str = "right", combos=None,
+                 grace: int = COMBO_GRACE_FRAMES):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown hand policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        # Right hands have chirality +1 in the mirrored preview, palm to the camera
+        self.dominant = 1 if dominant == "right" else -1
+        self.combos = {tuple(sorted(k)): v for k, v in (DEFAULT_COMBOS if combos is None else combos).items()}
+        self.combo_parts = {action for pair in self.combos for action in pair}
+        self.grace = int(grace)
+        self.owner = None      # track id currently in control
+        self.last_combo = None
+        self.pending = None    # (action, frames left) held back in case it becomes a combo
+
+    def controller(self, tracker):
+        # The track whose gestures count under single-hand policies, or None
+        visible = tracker.visible()
+        if not visible:
+            self.owner = None
+            return None
+        if self.policy in ("first", "combo"):
+            track = tracker.get(self.owner) if self.owner is not None else None
+            if track is None or not track.visible:
+                track = min(visible, key=lambda t: (t.first_seen, t.id))
+        elif self.policy == "dominant":
+            preferred = [t for t in visible if t.chirality == self.dominant] or visible
+            track = max(preferred, key=lambda t: t.size)
+        else:
+            track = max(visible, key=lambda t: t.size)
+        self.owner = track.id
+        return track
+
+    def select(self, tracker, fired):
+        # fired: {track id: action} from HandTracker.update(); returns actions to dispatch
+        if self.policy == "any":
+            return list(dict.fromkeys(fired.values()))
+        if self.policy == "combo":
+            held = sorted(t.engine.active for t in tracker.visible() if t.engine.active)
+            combo = self.combos.get(tuple(held)) if len(held) == 2 else None
+            if combo is not None or self.last_combo is not None:
+                # While a combo is held neither hand fires on its own
+                newly = combo is not None and combo != self.last_combo
+                self.last_combo = combo
+                if newly:
+                    self.pending = None  # it was the first half of this combo
+                    return [combo]
+                if combo is not None:
+                    return []
+        owner = self.controller(tracker)
+        action = fired.get(owner.id) if owner is not None else None
+        if self.policy == "combo":
+            return self._hold_for_combo(tracker, action)
+        return [action] if action else []
+
+    def _hold_for_combo(self, tracker, action):
+        # The two engines rarely fire on the same frame, so the first hand's half
+        # of a combo would otherwise be dispatched a frame before the combo
+        actions = []
+        if self.pending is not None:
+            pending, left = self.pending
+            if left > 1 and action is None:
+                self.pending = (pending, left - 1)
+                return []
+            self.pending = None
+            actions.append(pending)
+        if action is not None:
+            if not actions and action in self.combo_parts and self.grace > 0 and len(tracker.visible()) > 1:
+                self.pending = (action, self.grace)
+            else:
+                actions.append(action)
+        return actions
@@ -0,0 +1,282 @@
+import multiprocessing
+import signal
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from gestures import HandLandmarks, hand_points
+
+# Hand inference in a child process, so MediaPipe's Python-side pre- and
+# post-processing never holds the GIL the Tk thread needs. Frames travel
+# through a two-slot shared memory buffer: the worker fills one slot while the
+# child reads the other, and only fixed-layout records cross the pipe, as raw
+# bytes. Nothing is pickled per frame.
+
+SLOTS = 2
+START_TIMEOUT = 60.0   # spawning re-imports the main module and loads the model
+MAX_RESTARTS = 3       # crashes tolerated within RESTART_WINDOW before giving up
+RESTART_WINDOW = 60.0
+
+OP_PROCESS, OP_STOP = 1, 2
+STATUS_READY, STATUS_RESULT, STATUS_ERROR, STATUS_FAILED = 1, 2, 3, 4
+
+REQUEST = np.dtype([("op", "u1"), ("slot", "u1"), ("roi", "u1"), ("height", "<u2"), ("width", "<u2"),
+                    ("seq", "<u4")])
+
+
+def result_dtype(max_num_hands: int) -> np.dtype:
+    # One reply per request (plus the READY/FAILED handshake). `error` carries
+    # the message for STATUS_ERROR and STATUS_FAILED.
+    return np.dtype([("seq", "<u4"), ("slot", "u1"), ("status", "u1"), ("hands", "u1"), ("cost", "<f4"),
+                     ("points", "<f4", (max_num_hands, 21, 3)), ("error", "S160")])
+
+
+def _raw(record):
+    # Writable byte view of a 0-d record, for send_bytes / recv_bytes_into
+    return record.reshape(1).view(np.uint8)
+
+
+def mediapipe_hands(max_num_hands: int):
+    from gesture_worker import load_mediapipe
+    return load_mediapipe().Hands(max_num_hands=max_num_hands)
+
+
+# === Child process ===
+def _serve(conn, shm_name: str, slot_bytes: int, max_num_hands: int, use_roi: bool, hands_factory):
+    # Ctrl+C reaches the whole process group; the parent decides when this one stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    reply = np.zeros((), dtype=result_dtype(max_num_hands))
+    request = np.zeros((), dtype=REQUEST)
+    shm = hands = roi_hands = None
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        hands = hands_factory(max_num_hands)
+        # Crops get their own instance so its tracking state never mixes with full frames
+        roi_hands = hands_factory(max_num_hands) if use_roi else None
+    except Exception as e:
+        reply["status"] = STATUS_FAILED
+        reply["error"] = str(e).encode("utf-8", "replace")[:160]
+        conn.send_bytes(_raw(reply))
+        return
+    reply["status"] = STATUS_READY
+    conn.send_bytes(_raw(reply))
+    try:
+        while True:
+            try:
+                conn.recv_bytes_into(_raw(request))
+            except (EOFError, OSError):
+                break  # parent went away
+            if request["op"] != OP_PROCESS:
+                break
+            slot = int(request["slot"])
+            image = np.ndarray((int(request["height"]), int(request["width"]), 3), dtype=np.uint8,
+                               buffer=shm.buf, offset=slot * slot_bytes)
+            reply["seq"], reply["slot"], reply["hands"] = request["seq"], slot, 0
+            t0 = time.perf_counter()
+            try:
+                model = roi_hands if request["roi"] and roi_hands is not None else hands
+                results = model.process(image)
+                found = (results.multi_hand_landmarks if results else None) or []
+                n = min(len(found), max_num_hands)
+                for i in range(n):
+                    reply["points"][i] = hand_points(found[i])
+                reply["hands"] = n
+                reply["status"] = STATUS_RESULT
+            except Exception as e:
+                reply["status"] = STATUS_ERROR
+                reply["error"] = str(e).encode("utf-8", "replace")[:160]
+            reply["cost"] = time.perf_counter() - t0
+            del image  # shm.close() refuses while a view is alive
+            conn.send_bytes(_raw(reply))
+    finally:
+        for model in (hands, roi_hands):
+            if model is not None:
+                model.close()
+        shm.close()
+
+
+# === Parent side ===
+class InferenceProcess:
+    # Owned by the gesture worker thread. free_slot() / frame() / submit() hand
+    # a frame over, poll() collects (tag, hands, cost) for finished requests
+    # without blocking. A crashed child is respawned in the background (poll()
+    # reports nothing until it is ready again); after MAX_RESTARTS crashes
+    # within RESTART_WINDOW, `error` is set and it stays down.
+    def __init__(self, max_num_hands: int = 1, frame_size=(640, 480), use_roi: bool = True, hands_factory=None):
+        self.max_num_hands = max(1, int(max_num_hands))
+        self.slot_bytes = int(frame_size[0]) * int(frame_size[1]) * 3
+        self.use_roi = use_roi
+        self.hands_factory = hands_factory or mediapipe_hands
+        self.context = multiprocessing.get_context("spawn")  # never fork the Tk/audio threads
+        self.process = None
+        self.conn = None
+        self.shm = None
+        self.ready = False
+        self.error = None
+        self.pending = {}  # slot -> tag of the request reading it
+        self.seq = 0
+        self.crashes = deque()
+        self.restarts = 0
+        self._request = np.zeros((), dtype=REQUEST)
+        self._reply = np.zeros((), dtype=result_dtype(self.max_num_hands))
+
+    def start(self, wait: bool = True, timeout: float = START_TIMEOUT, cancel=None) -> bool:
+        # Spawns the child; with wait, returns once its model is loaded (False and
+        # `error` on failure). Setting the `cancel` event abandons the wait.
+        self._spawn()
+        if not wait:
+            return True
+        deadline = time.monotonic() + timeout
+        while not self.ready and self.error is None and time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                self.error = "cancelled"
+                break
+            try:
+                if self.conn.poll(0.05):
+                    self._receive()
+                    continue
+            except (EOFError, OSError):
+                pass
+            if not self.process.is_alive():
+                self.process.join()
+                self.error = f"inference process exited during startup (code {self.process.exitcode})"
+        if not self.ready and self.error is None:
+            self.error = "inference process did not start in time"
+        if self.error is not None:
+            self._teardown()
+        return self.ready
+
+    def _spawn(self):
+        self.shm = shared_memory.SharedMemory(create=True, size=SLOTS * self.slot_bytes)
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_serve, name="hand-inference", daemon=True,
+            args=(child_conn, self.shm.name, self.slot_bytes, self.max_num_hands, self.use_roi, self.hands_factory),
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.pending.clear()
+
+    def _teardown(self, stop: bool = False):
+        if stop and self.conn is not None and self.process is not None and self.process.is_alive():
+            try:
+                self._request["op"] = OP_STOP
+                self.conn.send_bytes(_raw(self._request))
+                self.process.join(timeout=1.0)
+            except Exception:
+                pass
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join(timeout=1.0)
+            self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.shm is not None:
+            try:
+                self.shm.close()
+                self.shm.unlink()
+            except Exception as e:
+                print(f"⚠️ Could not release inference frame buffer: {e}")
+            self.shm = None
+        self.ready = False
+        self.pending.clear()
+
+    def capacity(self, width: int, height: int) -> bool:
+        return width * height * 3 <= self.slot_bytes
+
+    def resize(self, width: int, height: int):
+        # The source changed resolution past the slot size: start over with bigger slots
+        self._teardown(stop=True)
+        self.slot_bytes = int(width) * int(height) * 3
+        self._spawn()
+
+    def free_slot(self):
+        if not self.ready:
+            return None
+        return next((slot for slot in range(SLOTS) if slot not in self.pending), None)
+
+    def frame(self, slot: int, height: int, width: int) -> np.ndarray:
+        # Writable (height, width, 3) view of a free slot; fill it with RGB, then submit(). Do not keep it.
+        return np.ndarray((height, width, 3), dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def submit(self, slot: int, height: int, width: int, roi: bool = False, tag=None):
+        self.seq += 1
+        request = self._request
+        request["op"], request["slot"], request["roi"] = OP_PROCESS, slot, bool(roi)
+        request["height"], request["width"], request["seq"] = height, width, self.seq
+        self.pending[slot] = tag
+        try:
+            self.conn.send_bytes(_raw(request))
+        except (OSError, ValueError):
+            self._crashed()
+
+    def poll(self, timeout: float = 0.0):
+        # [(tag, [HandLandmarks], child seconds)] for requests finished since the
+        # last call; waits up to `timeout` for one if any are outstanding
+        done = []
+        if self.error is not None or self.process is None:
+            return done
+        try:
+            waiting = timeout if self.pending else 0.0
+            while self.conn.poll(waiting):
+                item = self._receive()
+                if item is not None:
+                    done.append(item)
+                waiting = 0.0
+        except (EOFError, OSError):
+            self._crashed()
+            return done
+        if not self.process.is_alive():
+            self._crashed()
+        return done
+
+    def _receive(self):
+        reply = self._reply
+        self.conn.recv_bytes_into(_raw(reply))
+        status = int(reply["status"])
+        if status == STATUS_READY:
+            self.ready = True
+            return None
+        if status == STATUS_FAILED:
+            self.error = reply["error"].item().decode("utf-8", "replace")
+            return None
+        tag = self.pending.pop(int(reply["slot"]), None)
+        hands = [HandLandmarks(reply["points"][i]) for i in range(int(reply["hands"]))]
+        if status == STATUS_ERROR:
+            print(f"⚠️ Hand inference error: {reply['error'].item().decode('utf-8', 'replace')}")
+        return tag, hands, float(reply["cost"])
+
+    def _crashed(self):
+        code = None
+        if self.process is not None:
+            self.process.join(timeout=0.5)
+            code = self.process.exitcode
+        self._teardown()
+        now = time.monotonic()
+        self.crashes.append(now)
+        while self.crashes and now - self.crashes[0] > RESTART_WINDOW:
+            self.crashes.popleft()
+        if len(self.crashes) > MAX_RESTARTS:
+            self.error = f"inference process crashed {len(self.crashes)} times in {RESTART_WINDOW:.0f}s"
+            print(f"⚠️ Hand inference disabled: {self.error}")
+            return
+        print(f"⚠️ Inference process exited (code {code}); restarting")
+        self.restarts += 1
+        try:
+            self._spawn()
+        except Exception as e:
+            self.error = f"inference process restart failed: {e}"
+
+    def kill(self):
+        # Safe from any thread: the owner sees the child gone and cleans up as after a crash
+        process = self.process
+        if process is not None and process.is_alive():
+            process.terminate()
+
+    def close(self):
+        self._teardown(stop=True)
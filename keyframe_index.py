@@ -0,0 +1,135 @@
+import json
+import os
+import subprocess
+import threading
+from bisect import bisect_right
+
+from audio_player import find_ffmpeg
+from media_cache import cache_dir, file_key
+
+INDEX_VERSION = 1
+
+
+# === Keyframe index ===
+class KeyframeIndex:
+    # Presentation-ordered frame numbers of every keyframe in the first video
+    # stream, built from a packet scan (no decoding) and cached on disk.
+    def __init__(self, frame_count: int, duration: float, keyframes, time_base: float):
+        self.frame_count = int(frame_count)
+        self.duration = float(duration)
+        self.keyframes = [int(k[0]) for k in keyframes]
+        self.keyframe_times = [float(k[1]) for k in keyframes]
+        self.time_base = float(time_base)
+
+    def keyframe_at_or_before(self, frame_index: int) -> int:
+        i = bisect_right(self.keyframes, int(frame_index)) - 1
+        return self.keyframes[i] if i >= 0 else 0
+
+    def plan_seek(self, current: int, target: int, seek_cost: int = 3, preroll: int = 0):
+        # Cheapest way to get the decoder's next frame to `target`:
+        #   ("grab", n)       keep decoding forward from `current`, dropping n frames
+        #   ("seek", kf, n)   jump to keyframe kf, then drop n frames
+        # `preroll` is for backends that seek to a point that many frames early
+        # and land on the keyframe before *that* (OpenCV's FFmpeg backend does).
+        keyframe = self.keyframe_at_or_before(max(0, target - preroll))
+        from_keyframe = target - keyframe + seek_cost
+        if current <= target and keyframe <= current:
+            # Same GOP, ahead of us: never worth going back to the keyframe
+            return ("grab", target - current)
+        if current <= target and target - current <= from_keyframe:
+            return ("grab", target - current)
+        return ("seek", keyframe, target - keyframe)
+
+    def to_json(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "frame_count": self.frame_count,
+            "duration": self.duration,
+            "time_base": self.time_base,
+            "keyframes": [[k, round(t, 6)] for k, t in zip(self.keyframes, self.keyframe_times)],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict):
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError("stale index version")
+        return cls(data["frame_count"], data["duration"], data["keyframes"], data.get("time_base", 0.0))
+
+
+def scan_keyframes(file_path: str, ffmpeg_exe: str = None) -> KeyframeIndex:
+    # framecrc prints one line per packet: stream, dts, pts, duration, size, crc[, F=flags];
+    # the flags column is only present when it is not plain "keyframe"
+    args = [
+        ffmpeg_exe or find_ffmpeg(), "-v", "error", "-i", file_path,
+        "-map", "0:v:0", "-c", "copy", "-f", "framecrc", "-",
+    ]
+    proc = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+    )
+    time_base = 0.0
+    packets = []  # (pts, duration, is_key)
+    for raw in proc.stdout:
+        line = raw.decode("ascii", "ignore").strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            if line.startswith("#tb 0:"):
+                num, den = line.split(":", 1)[1].strip().split("/")
+                time_base = int(num) / int(den)
+            continue
+        fields = [f.strip() for f in line.split(",")]
+        if len(fields) < 6 or fields[0] != "0":
+            continue
+        is_key = True
+        if len(fields) > 6 and fields[6].startswith("F="):
+            is_key = bool(int(fields[6][2:], 16) & 0x1)
+        packets.append((int(fields[2]), int(fields[3]), is_key))
+    proc.wait()
+    if not packets:
+        raise RuntimeError(f"no video packets found in {file_path}")
+
+    packets.sort(key=lambda p: p[0])
+    first_pts = packets[0][0]
+    keyframes = [(i, (pts - first_pts) * time_base) for i, (pts, _, key) in enumerate(packets) if key]
+    last_pts, last_dur, _ = packets[-1]
+    duration = (last_pts + last_dur - first_pts) * time_base
+    return KeyframeIndex(len(packets), duration, keyframes or [(0, 0.0)], time_base)
+
+
+def index_path(file_path: str) -> str:
+    return os.path.join(cache_dir("keyframes"), file_key(file_path) + ".json")
+
+
+def load_or_build(file_path: str) -> KeyframeIndex:
+    path = index_path(file_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return KeyframeIndex.from_json(json.load(f))
+    except Exception:
+        pass
+    index = scan_keyframes(file_path)
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index.to_json(), f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"⚠️ Could not cache keyframe index: {e}")
+    return index
+
+
+def load_or_build_async(file_path: str, callback):
+    # Runs the (one-time) scan off the UI thread; callback(index) on success
+    def run():
+        try:
+            callback(load_or_build(file_path))
+        except Exception as e:
+            print(f"⚠️ Keyframe index failed for {os.path.basename(file_path)}: {e}")
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
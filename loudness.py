@@ -0,0 +1,182 @@
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from audio_player import find_ffmpeg, kill_process, spawn_pcm_decoder
+from media_cache import cache_dir, file_key
+
+# Integrated loudness after ITU-R BS.1770 / EBU R128: K-weighting, 400 ms
+# blocks every 100 ms, an absolute gate at -70 LUFS and a relative one 10 LU
+# below the ungated level. The K-weighting is applied in the frequency domain
+# over long chunks (with a pre-roll so the filter has settled at each chunk
+# start), so measuring stays a handful of vectorized FFTs per minute of audio.
+
+TARGET_LUFS = -16.0
+MAX_BOOST_DB = 12.0
+MAX_CUT_DB = 24.0
+PEAK_CEILING_DBFS = -1.0  # boosting never pushes the sample peak above this
+
+HOP_SECONDS = 0.1
+CHUNK_HOPS = 100
+PREROLL_SECONDS = 0.5
+
+
+def k_weighting(samplerate: int, n_fft: int):
+    # Complex response of BS.1770's two K-weighting biquads at the rfft bins of an
+    # n_fft-point transform, with the coefficients re-derived for this sample rate
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = math.tan(math.pi * f0 / samplerate)
+    vh = 10.0 ** (gain_db / 20.0)
+    vb = vh ** 0.4996667741545416
+    a0 = 1.0 + k / q + k * k
+    shelf_b = [(vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0]
+    shelf_a = [1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0]
+
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = math.tan(math.pi * f0 / samplerate)
+    a0 = 1.0 + k / q + k * k
+    high_b = [1.0, -2.0, 1.0]
+    high_a = [1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0]
+
+    z = np.exp(-1j * np.linspace(0.0, math.pi, n_fft // 2 + 1))  # z^-1 at each bin
+    response = np.ones_like(z)
+    for b, a in ((shelf_b, shelf_a), (high_b, high_a)):
+        response *= (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+    return response
+
+
+class LoudnessMeter:
+    # Streaming integrated loudness and sample peak: feed int16 (frames,
+    # channels) blocks with add(), then call result()
+    def __init__(self, samplerate: int, channels: int):
+        self.sr = int(samplerate)
+        self.channels = int(channels)
+        self.hop = int(round(HOP_SECONDS * self.sr))
+        self.chunk = self.hop * CHUNK_HOPS
+        self.preroll = int(PREROLL_SECONDS * self.sr)
+        self.n_fft = self.preroll + self.chunk
+        self.response = k_weighting(self.sr, self.n_fft)[:, None]
+        # Pre-roll + current chunk, in full-scale units
+        self.buffer = np.zeros((self.n_fft, self.channels), dtype=np.float32)
+        self.filled = 0
+        self.energies = []  # per chunk: (hops, channels) sums of squared K-weighted samples
+        self.peak = 0
+
+    def add(self, block):
+        if len(block):
+            self.peak = max(self.peak, int(np.abs(block, dtype=np.int32).max()))
+        pos = 0
+        while pos < len(block):
+            n = min(len(block) - pos, self.chunk - self.filled)
+            start = self.preroll + self.filled
+            np.multiply(block[pos:pos + n], 1.0 / 32768.0, out=self.buffer[start:start + n], casting="unsafe")
+            self.filled += n
+            pos += n
+            if self.filled == self.chunk:
+                self._flush()
+
+    def _flush(self):
+        hops = self.filled // self.hop
+        if hops:
+            weighted = np.fft.irfft(np.fft.rfft(self.buffer, axis=0) * self.response, n=self.n_fft, axis=0)
+            body = weighted[self.preroll:self.preroll + hops * self.hop]
+            self.energies.append(np.square(body).reshape(hops, self.hop, self.channels).sum(axis=1))
+        # The end of this chunk is the next one's pre-roll
+        tail = self.buffer[self.filled:self.preroll + self.filled].copy()
+        self.buffer[:self.preroll] = tail
+        self.buffer[self.preroll:] = 0.0
+        self.filled = 0
+
+    def result(self) -> dict:
+        if self.filled:
+            self._flush()
+        peak_dbfs = 20.0 * math.log10(self.peak / 32768.0) if self.peak else -120.0
+        if not self.energies:
+            return {"integrated_lufs": None, "peak_dbfs": peak_dbfs, "seconds": 0.0}
+        energies = np.concatenate(self.energies)
+        # 400 ms blocks = four consecutive hops; mean square per channel, channels summed (G = 1)
+        csum = np.concatenate([np.zeros((1, self.channels)), np.cumsum(energies, axis=0)])
+        if len(energies) >= 4:
+            blocks = (csum[4:] - csum[:-4]).sum(axis=1) / (4 * self.hop)
+        else:
+            blocks = csum[-1:].sum(axis=1) / (len(energies) * self.hop)
+        with np.errstate(divide="ignore"):
+            levels = -0.691 + 10.0 * np.log10(blocks)
+        gated = blocks[levels > -70.0]
+        lufs = None
+        if len(gated):
+            relative = -0.691 + 10.0 * math.log10(gated.mean()) - 10.0
+            gated = blocks[(levels > -70.0) & (levels > relative)]
+            lufs = -0.691 + 10.0 * math.log10(gated.mean())
+        return {"integrated_lufs": lufs, "peak_dbfs": peak_dbfs, "seconds": len(energies) * HOP_SECONDS}
+
+
+def measure_loudness(file_path: str, samplerate: int = 44100, channels: int = 2) -> dict:
+    meter = LoudnessMeter(samplerate, channels)
+    frame_bytes = 2 * channels
+    block = np.empty((meter.hop * 10, channels), dtype=np.int16)
+    raw = memoryview(block.reshape(-1).view(np.uint8))
+    proc = spawn_pcm_decoder(find_ffmpeg(), file_path, 0.0, samplerate, channels)
+    try:
+        pending = 0
+        while True:
+            n = proc.stdout.readinto(raw[pending:])
+            if not n:
+                break
+            pending += n
+            frames = pending // frame_bytes
+            meter.add(block[:frames])
+            # Keep a partial frame for the next read
+            leftover = pending - frames * frame_bytes
+            raw[:leftover] = raw[frames * frame_bytes:pending]
+            pending = leftover
+    finally:
+        kill_process(proc)
+    return meter.result()
+
+
+def normalization_gain_db(info: dict, target_lufs: float = TARGET_LUFS) -> float:
+    # Gain that brings the track to target_lufs, within limits and under the peak ceiling
+    lufs = info.get("integrated_lufs")
+    if lufs is None:
+        return 0.0
+    gain = max(-MAX_CUT_DB, min(MAX_BOOST_DB, target_lufs - lufs))
+    return min(gain, max(0.0, PEAK_CEILING_DBFS - info.get("peak_dbfs", 0.0)))
+
+
+def loudness_path(file_path: str) -> str:
+    return os.path.join(cache_dir("loudness"), file_key(file_path) + ".json")
+
+
+def load_or_measure(file_path: str) -> dict:
+    path = loudness_path(file_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        pass
+    info = measure_loudness(file_path)
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"⚠️ Could not cache loudness: {e}")
+    return info
+
+
+def load_or_measure_async(file_path: str, callback):
+    # Measures (once per file, then cached) off the UI thread; callback(info) on success
+    def run():
+        try:
+            callback(load_or_measure(file_path))
+        except Exception as e:
+            print(f"⚠️ Loudness measurement failed for {os.path.basename(file_path)}: {e}")
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -1,153 +1,39 @@
+from perf import profiler, startup  # first, so startup times are measured from launch
+
 import os
-import cv2
-import mediapipe as mp
+import threading
 import time
 import customtkinter as ctk
-from PIL import Image, ImageTk
-import threading
-from tkinter import Canvas, filedialog, messagebox
 import numpy as np
-import sounddevice as sd
-import subprocess
-import imageio_ffmpeg
-
-# Setup MediaPipe
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1)
-mp_draw = mp.solutions.drawing_utils
+from PIL import Image, ImageTk
+from tkinter import Canvas, Label, filedialog, messagebox
+
+# mediapipe and sounddevice are not imported here; see load_mediapipe() / load_sounddevice()
+from gesture_worker import INFERENCE_MODES, GestureWorker, load_mediapipe
+from capture_sources import parse_size, source_from_spec
+from gestures import GestureEngine, format_finger_status, get_gesture_name
+from hand_tracker import HandTracker, GestureArbiter
+from playback_clock import PlaybackClock, clamp_rate, step_rate
+from audio_player import find_ffmpeg, load_sounddevice
+from renderer import CanvasRenderer
+from keyframe_index import load_or_build_async
+from loudness import TARGET_LUFS, load_or_measure_async, normalization_gain_db
+from thumbnails import ThumbnailCache
+from preloader import Preloader, PreparedMedia
+from ffmpeg_backend import backend_for_rate, create_audio_player, create_decoder
+from playlist import Playlist, MetadataCache
+from playlist_view import PlaylistView
+from session import DEFAULT_PLAYLIST, SessionStore
 
 # Setup theme
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
-
-# === FFmpeg Audio Player ===
-class FFmpegAudioPlayer:
-    def __init__(self, file_path: str, samplerate: int = 44100, channels: int = 2):
-        self.file_path = file_path
-        try:
-            self.ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
-        except:
-            self.ffmpeg_exe = "ffmpeg"
-        self.sr = int(samplerate)
-        self.channels = int(channels)
-        self.proc = None
-        self.stream = None
-        self.thread = None
-        self.stop_flag = threading.Event()
-        self.volume = 1.0
-        self.muted = False
-        self.lock = threading.Lock()
-
-    def start(self, start_time: float = 0.0):
-        self.stop()  # Remove lock from here
-        try:
-            args = [
-                self.ffmpeg_exe,
-                "-loglevel", "quiet",
-                "-ss", f"{max(0.0, float(start_time))}",
-                "-i", self.file_path,
-                "-vn",
-                "-f", "s16le",
-                "-acodec", "pcm_s16le",
-                "-ac", str(self.channels),
-                "-ar", str(self.sr),
-                "pipe:1",
-            ]
-            self.proc = subprocess.Popen(
-                args, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                bufsize=8192,  # Larger buffer
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            self.stream = sd.RawOutputStream(
-                samplerate=self.sr, 
-                channels=self.channels, 
-                dtype="int16", 
-                blocksize=4096  # Larger blocksize
-            )
-            self.stream.start()
-            self.stop_flag.clear()
-            self.thread = threading.Thread(target=self._pump, daemon=True)
-            self.thread.start()
-        except Exception as e:
-            print(f"⚠️ Audio start failed: {e}")
-            self.stop()
-
-    def _pump(self):
-        chunk_size = 4096 * 2 * self.channels  # Larger chunks
-        try:
-            while not self.stop_flag.is_set():
-                if self.proc is None or self.proc.stdout is None:
-                    break
-                try:
-                    # Non-blocking read with timeout
-                    data = self.proc.stdout.read(chunk_size)
-                    if not data:
-                        break
-                    
-                    # Apply volume without holding lock
-                    if self.muted or self.volume <= 0.0:
-                        out = b"\x00" * len(data)
-                    elif self.volume >= 0.999:
-                        out = data
-                    else:
-                        arr = np.frombuffer(data, dtype=np.int16).astype(np.float32)
-                        arr = np.clip(arr * float(self.volume), -32768, 32767).astype(np.int16)
-                        out = arr.tobytes()
-                    
-                    if self.stream and not self.stop_flag.is_set():
-                        self.stream.write(out)
-                except Exception as e:
-                    if not self.stop_flag.is_set():
-                        print(f"⚠️ Audio pump error: {e}")
-                    break
-        except Exception as e:
-            print(f"⚠️ Audio pump fatal: {e}")
-        finally:
-            pass  # Don't call stop() here to avoid deadlock
-
-    def set_volume(self, vol: float):
-        self.volume = max(0.0, min(1.0, float(vol)))
-
-    def set_muted(self, muted: bool):
-        self.muted = bool(muted)
-
-    def stop(self):
-        self.stop_flag.set()
-        
-        # Close stream first
-        if self.stream:
-            try:
-                self.stream.abort()  # Force immediate stop
-                self.stream.close()
-            except Exception:
-                pass
-        self.stream = None
-        
-        # Terminate FFmpeg process
-        if self.proc:
-            try:
-                self.proc.terminate()
-                try:
-                    self.proc.wait(timeout=0.5)
-                except:
-                    self.proc.kill()
-            except Exception:
-                pass
-        self.proc = None
-        
-        # Wait for thread
-        if self.thread and self.thread.is_alive() and threading.current_thread() != self.thread:
-            try:
-                self.thread.join(timeout=1.0)
-            except Exception:
-                pass
-        self.thread = None
+startup.add("imports", startup.origin)
 
 # Create main window
 class MediaPlayer(ctk.CTk):
     def __init__(self):
+        build_start = time.perf_counter()
         super().__init__()
         self.title("Gesture Media Player")
         self.geometry("1200x800")
@@ -196,6 +82,8 @@ class MediaPlayer(ctk.CTk):
                 "🤘 Rock Sign - Restart",
                 "👉 Three Up (Index+Middle+Ring) - Next",
                 "👈 Last Three Up (Middle+Ring+Pinky) - Previous",
+                "👆 Thumb+Index - Faster",
+                "🤙 Thumb+Pinky - Slower",
             ]),
             justify="left",
             font=("Helvetica", 12)
@@ -205,6 +93,7 @@ class MediaPlayer(ctk.CTk):
         # Gesture view with 4:3 aspect ratio for better hand tracking
         self.gesture_canvas = Canvas(self.gesture_frame, width=320, height=240, bg="black")
         self.gesture_canvas.pack(pady=10, padx=10)
+        self.preview_renderer = CanvasRenderer(self.gesture_canvas, fit=False)
 
         # Current gesture display
         self.current_gesture_label = ctk.CTkLabel(
@@ -225,10 +114,29 @@ class MediaPlayer(ctk.CTk):
         self.finger_status_label.pack(pady=5)
 
         # Playlist UI
-        ctk.CTkLabel(self.gesture_frame, text="Playlist", font=("Helvetica", 14, "bold")).pack(pady=(10, 5))
-        self.playlist_frame = ctk.CTkScrollableFrame(self.gesture_frame, width=280, height=200)
-        self.playlist_frame.pack(padx=10, pady=5, fill="x")
-        self.playlist_item_buttons = []
+        self.playlist_label = ctk.CTkLabel(self.gesture_frame, text="Playlist", font=("Helvetica", 14, "bold"))
+        self.playlist_label.pack(pady=(10, 5))
+        # Playlist state; the view only ever draws the rows that are on screen
+        self.playlist = Playlist()
+        self.playlist_name = DEFAULT_PLAYLIST  # saved under this name in the session store
+        self.current_index = -1
+        # The previous session is read (and its files checked) in the background;
+        # update_frames applies it once it is there
+        self.session = SessionStore()
+        self.session.start()
+        self.media_info = MetadataCache(db_path=self.session.path)
+        self.thumbnails = ThumbnailCache()
+        self.playlist_thumbs = {}
+        self.playlist_view = PlaylistView(
+            self.gesture_frame,
+            self.playlist,
+            on_activate=lambda idx: self.load_from_playlist(idx, resume=True),
+            thumbnail=self.playlist_thumbnail,
+            info=self.playlist_info,
+            width=280,
+            height=200,
+        )
+        self.playlist_view.pack(padx=10, pady=5, fill="x")
 
         pl_btns = ctk.CTkFrame(self.gesture_frame)
         pl_btns.pack(pady=5)
@@ -239,9 +147,17 @@ class MediaPlayer(ctk.CTk):
         self.next_btn = ctk.CTkButton(pl_btns, text="⏭ Next", command=lambda: self.play_next(auto=False), width=70)
         self.next_btn.pack(side="left", padx=5)
 
+        pl_names = ctk.CTkFrame(self.gesture_frame)
+        pl_names.pack(pady=5)
+        self.save_playlist_btn = ctk.CTkButton(pl_names, text="💾 Save As", command=self.save_playlist_as, width=110)
+        self.save_playlist_btn.pack(side="left", padx=5)
+        self.open_playlist_btn = ctk.CTkButton(pl_names, text="📂 Open", command=self.open_playlist, width=110)
+        self.open_playlist_btn.pack(side="left", padx=5)
+
         # Video canvas with 16:9 aspect ratio
         self.video_canvas = Canvas(self.video_frame, bg="black", width=960, height=540)
         self.video_canvas.pack(pady=10, padx=10, fill="both", expand=True)
+        self.video_renderer = CanvasRenderer(self.video_canvas, on_resize=self.on_video_resize)
 
         # Video file label
         self.video_file_label = ctk.CTkLabel(
@@ -252,6 +168,16 @@ class MediaPlayer(ctk.CTk):
         )
         self.video_file_label.pack(pady=(5, 0))
 
+        # A/V sync readout
+        self.sync_label = ctk.CTkLabel(
+            self.controls_frame,
+            text="",
+            font=("Helvetica", 10),
+            text_color="gray"
+        )
+        self.sync_label.pack(pady=(0, 0))
+        self.last_sync_report = 0.0
+
         # Time display
         self.time_frame = ctk.CTkFrame(self.controls_frame)
         self.time_frame.pack(fill="x", padx=10, pady=(5, 5))
@@ -267,6 +193,13 @@ class MediaPlayer(ctk.CTk):
         self.progress_bar.pack(fill="x")
         self.progress_bar.set(0)
         self.progress_bar.bind("<Button-1>", self.seek_video)
+        self.progress_bar.bind("<Motion>", self.show_scrub_preview)
+        self.progress_bar.bind("<Leave>", lambda _e: self.scrub_preview.place_forget())
+
+        # Hover preview above the progress bar, drawn from the cached sprite
+        self.scrub_preview = Label(self, bg="black", fg="white", compound="top", font=("Helvetica", 9),
+                                   bd=1, relief="solid")
+        self.scrub_photo = None
 
         # Control buttons with improved layout
         self.button_frame = ctk.CTkFrame(self.controls_frame)
@@ -303,6 +236,16 @@ class MediaPlayer(ctk.CTk):
         )
         self.mute_button.pack(side="left", padx=5)
 
+        # Playback speed: click for the next step, right-click for the previous one
+        self.speed_button = ctk.CTkButton(
+            self.left_controls,
+            text="1×",
+            width=60,
+            command=lambda: self.set_rate(step_rate(self.rate, 1))
+        )
+        self.speed_button.pack(side="left", padx=5)
+        self.speed_button.bind("<Button-3>", lambda _e: self.set_rate(step_rate(self.rate, -1)))
+
         # Right side volume control
         self.right_controls = ctk.CTkFrame(self.button_frame)
         self.right_controls.pack(side="right")
@@ -311,55 +254,166 @@ class MediaPlayer(ctk.CTk):
         self.volume_slider = ctk.CTkSlider(self.right_controls, from_=0, to=100, width=100, command=self.on_volume_change)
         self.volume_slider.pack(side="right", padx=5)
         self.volume_slider.set(100)
+        # Output level (RMS) from the audio player's meter
+        self.level_meter = ctk.CTkProgressBar(self.right_controls, width=60, height=8)
+        self.level_meter.pack(side="right", padx=5)
+        self.level_meter.set(0)
+        self.last_level = 0.0
 
-        # Initialize video capture as None
+        # Initialize video decoder as None
         self.video = None
         self.video_loaded = False
         self.video_path = None
+        self.clock = PlaybackClock()
+        self.rate = 1.0
 
         # Audio state
         self.audio_player = None
-
-        # Playlist state
-        self.playlist = []
-        self.current_index = -1
-
-        # Start webcam
-        self.cam = cv2.VideoCapture(0)
-        if not self.cam.isOpened():
-            messagebox.showerror("Camera Error", "Cannot access webcam.")
-            self.destroy()
-            return
+        # Tracks are normalized to GESTURE_PLAYER_TARGET_LUFS once their loudness is known
+        self.normalize = os.environ.get("GESTURE_PLAYER_NORMALIZE", "1") not in ("", "0")
+        self.target_lufs = float(os.environ.get("GESTURE_PLAYER_TARGET_LUFS", TARGET_LUFS))
+
+        # The next playlist item is opened this many seconds before the current one ends
+        self.preloader = Preloader(make_audio=self.make_audio_player)
+        self.preload_seconds = float(os.environ.get("GESTURE_PLAYER_PRELOAD_SECONDS", 5))
+        self.transition_start = None
+        self.transition_preloaded = False
+        self.last_transition_ms = None
+
+        # Session restore and resume points
+        self.restore_pending = True
+        self.restore_path = None
+        self.playlist_load_pending = False
+        self.saved_positions = {}
+        self.last_session_save = time.time()
+        self.needs_poster = False
+        self.first_frame_ms = None
+
+        max_hands = max(1, int(os.environ.get("GESTURE_PLAYER_MAX_HANDS", 1)))
+        # Start webcam + hand tracking off the Tk thread; the camera opens and the
+        # model loads there while the window is already up. GESTURE_PLAYER_SOURCE
+        # swaps the webcam for a recording or synthetic input (see capture_sources).
+        # GESTURE_PLAYER_INFERENCE=process moves the hand model into its own process.
+        inference = os.environ.get("GESTURE_PLAYER_INFERENCE", "thread")
+        if inference not in INFERENCE_MODES:
+            print(f"⚠️ Unknown inference mode '{inference}', using 'thread'")
+            inference = "thread"
+        self.gesture_worker = GestureWorker(
+            source=self.make_capture_source(),
+            max_num_hands=max_hands,
+            active_rate=float(os.environ.get("GESTURE_PLAYER_INFERENCE_FPS", 30)),
+            idle_rate=float(os.environ.get("GESTURE_PLAYER_IDLE_FPS", 5)),
+            inference=inference,
+        )
+        self.gesture_worker.start()
+        self.start_warm_up()
+        self.last_gesture_seq = 0
+        self.startup_reported = False
+        self.gesture_error_shown = False
 
         # State variables
         self.playing = False
         self.muted = False
-        self.last_gesture = None
-        self.last_time = time.time()
-        self.gesture_cooldown = 1.2  # seconds
+        # Gestures must hold for 5 of the last 8 inferences before they fire;
+        # forward/rewind keep scrubbing while held. Every tracked hand gets its
+        # own engine and the arbiter picks whose actions count.
+        self.hand_tracker = HandTracker(
+            make_engine=lambda: GestureEngine(window=8, required=5, repeat={"forward": 3.0, "rewind": 3.0}),
+            rotation_invariant=max_hands > 1,
+        )
+        policy = os.environ.get("GESTURE_PLAYER_HAND_POLICY", "first")
+        dominant = os.environ.get("GESTURE_PLAYER_DOMINANT_HAND", "right")
+        try:
+            self.gesture_arbiter = GestureArbiter(policy, dominant=dominant)
+        except ValueError as e:
+            print(f"⚠️ {e}; using 'first'")
+            self.gesture_arbiter = GestureArbiter("first")
         self.running = True
 
+        # Performance overlay: F3 toggles profiling + overlay, F4 exports a trace
+        self.perf_overlay = None
+        self.last_overlay_update = 0.0
+        profiler.set_enabled(os.environ.get("GESTURE_PLAYER_PROFILE", "") not in ("", "0"))
+        self.bind("<F3>", lambda _e: self.toggle_perf_overlay())
+        self.bind("<F4>", lambda _e: self.export_perf_trace())
+        self.bind("<bracketright>", lambda _e: self.set_rate(step_rate(self.rate, 1)))
+        self.bind("<bracketleft>", lambda _e: self.set_rate(step_rate(self.rate, -1)))
+        self.bind("<BackSpace>", lambda _e: self.set_rate(1.0))
+
         self.after(16, self.update_frames)  # ~60 FPS update on main thread
+        self.after_idle(lambda: startup.mark("window_shown"))
+        startup.add("build_ui", build_start)
+
+    def make_capture_source(self):
+        spec = os.environ.get("GESTURE_PLAYER_SOURCE", "camera:0")
+        try:
+            width, height = parse_size(os.environ.get("GESTURE_PLAYER_SOURCE_SIZE", ""))
+            fps = float(os.environ.get("GESTURE_PLAYER_SOURCE_FPS", 0)) or None
+            return source_from_spec(spec, width, height, fps)
+        except Exception as e:
+            print(f"⚠️ Bad capture source '{spec}', using the webcam: {e}")
+            return source_from_spec("camera:0")
+
+    def start_warm_up(self):
+        # Load what the first track and first gesture will need, in parallel with the
+        # camera opening on the worker thread
+        steps = [find_ffmpeg, load_sounddevice]
+        worker = self.gesture_worker
+        # In process mode only the inference process needs MediaPipe
+        if not worker.source.provides_landmarks and worker.inference == "thread":
+            steps.insert(0, load_mediapipe)
+
+        def run():
+            for step in steps:
+                try:
+                    step()
+                except Exception as e:
+                    print(f"⚠️ Warm-up step {step.__name__} failed: {e}")
+
+        threading.Thread(target=run, daemon=True, name="warm-up").start()
+
+    def check_startup(self):
+        worker = self.gesture_worker
+        if worker.error and not self.gesture_error_shown:
+            # The player still works without gestures; say so rather than quitting
+            self.gesture_error_shown = True
+            print(f"⚠️ Gesture control disabled: {worker.error}")
+            self.current_gesture_label.configure(text="Gestures unavailable")
+            messagebox.showwarning("Camera Error", f"{worker.error}\n\nGesture control is disabled.")
+        if self.startup_reported or not (worker.ready.is_set() or worker.error) or self.restore_pending:
+            return
+        if self.video_loaded and self.first_frame_ms is None:
+            return
+        self.startup_reported = True
+        print(startup.report())
+        report_path = os.environ.get("GESTURE_PLAYER_STARTUP_REPORT")
+        if report_path:
+            try:
+                startup.export_json(report_path)
+            except Exception as e:
+                print(f"⚠️ Startup report export failed: {e}")
 
     # ===== Playlist helpers =====
     def render_playlist(self):
-        for w in self.playlist_item_buttons:
-            w.destroy()
-        self.playlist_item_buttons.clear()
-
-        for i, path in enumerate(self.playlist):
-            name = os.path.basename(path)
-            is_current = (i == self.current_index)
-            btn = ctk.CTkButton(
-                self.playlist_frame,
-                text=("▶ " if is_current else "   ") + name,
-                width=250,
-                command=lambda idx=i: self.load_from_playlist(idx)
-            )
-            if is_current:
-                btn.configure(fg_color="#1F6AA5")
-            btn.pack(fill="x", padx=5, pady=2)
-            self.playlist_item_buttons.append(btn)
+        self.playlist_view.refresh()
+
+    def playlist_thumbnail(self, path: str):
+        photo = self.playlist_thumbs.get(path)
+        if photo is None:
+            sprite = self.thumbnails.get(path)
+            if sprite is None:
+                self.thumbnails.request(path)
+                return None
+            thumb = Image.fromarray(np.asarray(sprite.thumbnail())).resize((48, 27), Image.BILINEAR)
+            photo = ImageTk.PhotoImage(thumb)
+            self.playlist_thumbs[path] = photo
+        return photo
+
+    def playlist_info(self, path: str):
+        info = self.media_info.get(path)
+        if info is None:
+            self.media_info.request([path], urgent=True)
+        return info
 
     def add_to_playlist(self):
         files = filedialog.askopenfilenames(
@@ -368,20 +422,69 @@ class MediaPlayer(ctk.CTk):
         )
         if not files:
             return
-        for f in files:
-            if f not in self.playlist:
-                self.playlist.append(f)
-        if self.current_index == -1 and self.playlist:
+        self.media_info.request(self.playlist.extend(files))
+        self.session.save_playlist(list(self.playlist), self.playlist_name)
+        if self.current_index == -1 and len(self.playlist):
             self.load_from_playlist(0)
         self.render_playlist()
 
-    def load_from_playlist(self, index: int):
+    def set_playlist_name(self, name: str):
+        self.playlist_name = name
+        self.playlist_label.configure(text="Playlist" if name == DEFAULT_PLAYLIST else f"Playlist: {name}")
+
+    def ask_playlist_name(self, title: str, prompt: str):
+        name = ctk.CTkInputDialog(title=title, text=prompt).get_input()
+        return name.strip() if name else None
+
+    def save_playlist_as(self):
+        name = self.ask_playlist_name("Save Playlist", "Save this playlist as:")
+        if not name:
+            return
+        self.set_playlist_name(name)
+        self.session.save_playlist(list(self.playlist), name)
+        self.session.save_settings(playlist=name)
+
+    def open_playlist(self):
+        names = self.session.names
+        if not names:
+            messagebox.showinfo("Open Playlist", "No saved playlists yet.")
+            return
+        name = self.ask_playlist_name("Open Playlist", "Playlist to open:\n" + ", ".join(names))
+        if not name:
+            return
+        if name not in names:
+            messagebox.showwarning("Open Playlist", f"No playlist named '{name}'.")
+            return
+        # Read (and its files checked) on the session thread; update_frames swaps it in
+        self.session.load_playlist(name)
+        self.playlist_load_pending = True
+
+    def poll_playlist_load(self):
+        loaded = self.session.loaded
+        if loaded is None:
+            return
+        self.playlist_load_pending = False
+        self.remember_position()
+        self.playlist.clear()
+        self.media_info.request(self.playlist.extend(loaded.playlist))
+        self.set_playlist_name(loaded.name)
+        self.session.save_settings(playlist=loaded.name)
+        if loaded.missing:
+            print(f"⚠️ {loaded.missing} playlist file(s) no longer exist and were skipped")
+        # Whatever is playing keeps playing; it just may not be part of this playlist
+        self.current_index = self.playlist.index_of(self.video_path) if self.video_path else -1
+        self.render_playlist()
+        self.playlist_view.set_current(self.current_index)
+
+    def load_from_playlist(self, index: int, resume: bool = False):
         if index < 0 or index >= len(self.playlist):
             return
         self.current_index = index
         self.load_video_file(self.playlist[index], announce=False)
+        if resume:
+            self.resume_position(self.playlist[index])
         self.set_playing(True)
-        self.render_playlist()
+        self.playlist_view.set_current(index)
 
     def play_next(self, auto=True):
         if not self.playlist:
@@ -418,32 +521,70 @@ class MediaPlayer(ctk.CTk):
             ]
         )
         if file_path:
-            if file_path not in self.playlist:
-                self.playlist.append(file_path)
-            self.current_index = self.playlist.index(file_path)
+            self.current_index = self.playlist.add(file_path)
+            self.media_info.request([file_path])
+            self.session.save_playlist(list(self.playlist), self.playlist_name)
             self.load_video_file(file_path, announce=True)
             self.render_playlist()
+            self.playlist_view.set_current(self.current_index)
+
+    def make_audio_player(self, file_path: str, video):
+        # Runs on the preloader thread: the PCM cache and ring start filling right away
+        player = create_audio_player(file_path, video, samplerate=44100, channels=2)
+        player.prime()
+        self.normalize_loudness(file_path, player)
+        return player
+
+    def normalize_loudness(self, file_path: str, player):
+        # Measured once per file in the background (then cached); the gain eases in when it lands
+        if not self.normalize or player is None:
+            return
+        target = self.target_lufs
+        load_or_measure_async(file_path, lambda info: player.set_loudness_gain(normalization_gain_db(info, target)))
+
+    def preload_next(self):
+        nxt = self.current_index + 1
+        if 0 <= self.current_index and nxt < len(self.playlist):
+            self.preloader.prepare(self.playlist[nxt], (self.video_renderer.width, self.video_renderer.height),
+                                   rate=self.rate)
 
     def load_video_file(self, file_path: str, announce: bool = True):
-        # Stop previous audio
-        self.stop_audio()
-        
-        # Release previous video if any
-        if self.video is not None:
-            self.video.release()
-        
-        # Load new video
-        self.video = cv2.VideoCapture(file_path)
+        self.remember_position()
+        self.transition_start = time.perf_counter()
+        prepared = self.preloader.take(file_path)
+        self.preloader.cancel()
+        self.transition_preloaded = prepared is not None
+
+        # Silence the previous track now; tear it down off the UI thread
+        self.clock.detach_audio()
+        if self.audio_player:
+            self.audio_player.pause()
+        if self.video is not None or self.audio_player is not None:
+            PreparedMedia(self.video_path, self.video, self.audio_player).release_async()
+        self.video = None
+        self.audio_player = None
+
+        if prepared is not None:
+            # Already open, first frames decoded, audio primed
+            self.video = prepared.video
+            self.audio_player = prepared.audio_player
+        else:
+            # Load new video; frames are decoded ahead in a background thread
+            self.video = create_decoder(file_path, rate=self.rate)
         
-        if not self.video.isOpened():
+        if not self.video.is_opened():
             messagebox.showerror("Error", "Cannot open video file.")
+            self.video.release()
             self.video = None
             self.video_loaded = False
+            self.transition_start = None
             return
         
         self.video_path = file_path
         self.video_loaded = True
         self.playing = False
+        self.clock.pause()
+        self.clock.reset(0.0)
         
         # Update UI
         filename = os.path.basename(file_path)
@@ -453,18 +594,29 @@ class MediaPlayer(ctk.CTk):
         
         # Reset progress
         self.progress_bar.set(0)
+        self.needs_poster = True
         
         # Get video info
-        total_frames = self.video.get(cv2.CAP_PROP_FRAME_COUNT)
-        fps = self.video.get(cv2.CAP_PROP_FPS)
-        total_time = total_frames / fps if fps and fps > 0 else 0
-        self.time_label.configure(text=f"0:00 / {self.format_time(total_time)}")
+        self.time_label.configure(text=f"0:00 / {self.format_time(self.video.duration)}")
+        self.video.set_display_box(self.video_renderer.width, self.video_renderer.height)
+        self.video.set_rate(self.rate)
+        if prepared is not None:
+            # Prepared at another speed: may need the other decoder
+            self.match_decoder_to_rate()
+        self.thumbnails.request(file_path, urgent=True)
+        if prepared is None:
+            self.video.start()
+            # One-time packet scan (cached on disk) so seeks can land on keyframes
+            load_or_build_async(file_path, self.video.set_index)
 
         # Prepare audio
         try:
-            self.audio_player = FFmpegAudioPlayer(file_path, samplerate=44100, channels=2)
+            if self.audio_player is None:
+                self.audio_player = create_audio_player(file_path, self.video, samplerate=44100, channels=2)
+                self.normalize_loudness(file_path, self.audio_player)
             self.audio_player.set_volume(self.volume_slider.get() / 100.0)
             self.audio_player.set_muted(self.muted)
+            self.audio_player.set_rate(self.rate)
         except Exception as e:
             print(f"⚠️ Audio init failed: {e}")
             self.audio_player = None
@@ -477,10 +629,30 @@ class MediaPlayer(ctk.CTk):
         if self.audio_player and not self.muted:
             try:
                 self.audio_player.start(start_time)
+                self.clock.attach_audio(self.audio_player)
             except Exception as e:
                 print(f"⚠️ Audio start error: {e}")
 
+    def pause_audio(self):
+        self.clock.detach_audio()
+        if self.audio_player:
+            try:
+                self.audio_player.pause()
+            except Exception as e:
+                print(f"⚠️ Audio pause error: {e}")
+
+    def seek_audio(self, start_time: float):
+        # Keeps the output stream open; the player serves the seek from its PCM cache when it can
+        if self.audio_player and self.audio_player.is_open():
+            try:
+                self.audio_player.seek(start_time)
+            except Exception as e:
+                print(f"⚠️ Audio seek error: {e}")
+        else:
+            self.start_audio(start_time)
+
     def stop_audio(self):
+        self.clock.detach_audio()
         if self.audio_player:
             try:
                 self.audio_player.stop()
@@ -495,14 +667,6 @@ class MediaPlayer(ctk.CTk):
                 print(f"⚠️ Volume change error: {e}")
 
     # ===== Utils and playback controls =====
-    def get_fingers_up(self, hand):
-        tip_ids = [4, 8, 12, 16, 20]
-        fingers = []
-        fingers.append(1 if hand.landmark[4].x < hand.landmark[3].x else 0)
-        for tip in tip_ids[1:]:
-            fingers.append(1 if hand.landmark[tip].y < hand.landmark[tip - 2].y else 0)
-        return fingers
-
     def format_time(self, seconds):
         minutes = int(seconds // 60)
         seconds = int(seconds % 60)
@@ -511,9 +675,45 @@ class MediaPlayer(ctk.CTk):
     def get_current_video_time(self) -> float:
         if not self.video:
             return 0.0
-        fps = self.video.get(cv2.CAP_PROP_FPS) or 0
-        pos = self.video.get(cv2.CAP_PROP_POS_FRAMES) or 0
-        return (pos / fps) if fps > 0 else 0.0
+        return self.video.frame_time(self.video.position)
+
+    def reset_clock(self):
+        self.clock.reset(self.get_current_video_time())
+
+    def update_sync_label(self):
+        report = self.clock.report()
+        drift = report["av_drift"]
+        text = (f"clock: {report['source']}  |  A/V drift {drift['recent_mean_ms']:+.0f} ms "
+                f"(worst {drift['worst_ms']:+.0f})  |  late frames {report['late_frames']}")
+        if self.audio_player and self.audio_player.is_open():
+            stats = self.audio_player.buffer_stats()
+            text += f"  |  audio underruns {stats['underruns'] + stats['device_underflows']}"
+        if self.video:
+            seeks = self.video.seek_stats()
+            if seeks["count"]:
+                text += f"  |  seek {seeks['p50_ms']:.0f} ms{'' if seeks['indexed'] else ' (no index)'}"
+        if self.last_transition_ms is not None:
+            text += f"  |  track switch {self.last_transition_ms:.0f} ms{' (preloaded)' if self.transition_preloaded else ''}"
+        self.sync_label.configure(text=text)
+
+    def update_level_meter(self):
+        # RMS of both channels on a -60..0 dBFS scale; only redrawn when it visibly changes
+        levels = self.audio_player.levels() if self.audio_player else None
+        level = 0.0
+        if levels is not None:
+            level = max(0.0, min(1.0, 1.0 + max(levels[1]) / 60.0))
+        if abs(level - self.last_level) >= 0.02:
+            self.last_level = level
+            self.level_meter.set(level)
+
+    def seek_to_frame(self, frame_index: int):
+        if not self.video:
+            return
+        self.video.seek(frame_index)
+        self.reset_clock()
+        self.needs_poster = not self.playing
+        if self.playing:
+            self.seek_audio(self.get_current_video_time())
 
     def seek_video(self, event):
         if not self.video_loaded or self.video is None:
@@ -523,13 +723,27 @@ class MediaPlayer(ctk.CTk):
         if bar_width <= 0:
             return
         ratio = max(0.0, min(1.0, click_x / bar_width))
-        total_frames = self.video.get(cv2.CAP_PROP_FRAME_COUNT)
-        target_frame = int(total_frames * ratio)
-        self.video.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-        
-        if self.playing:
-            self.stop_audio()
-            self.start_audio(self.get_current_video_time())
+        self.seek_to_frame(int(self.video.frame_count * ratio))
+
+    def show_scrub_preview(self, event):
+        if not self.video_loaded or self.video is None:
+            return
+        bar_width = self.progress_bar.winfo_width()
+        if bar_width <= 0:
+            return
+        seconds = max(0.0, min(1.0, event.x / bar_width)) * self.video.duration
+        sprite = self.thumbnails.get(self.video_path)
+        frame = sprite.frame_at(seconds) if sprite is not None else None
+        if frame is not None:
+            image = Image.fromarray(np.asarray(frame))
+            if self.scrub_photo is None or (self.scrub_photo.width(), self.scrub_photo.height()) != image.size:
+                self.scrub_photo = ImageTk.PhotoImage(image)
+            else:
+                self.scrub_photo.paste(image)
+        self.scrub_preview.configure(image=self.scrub_photo if frame is not None else "",
+                                     text=self.format_time(seconds))
+        self.scrub_preview.place(in_=self.progress_bar, x=event.x, y=-6, anchor="s")
+        self.scrub_preview.lift()
 
     def toggle_play(self):
         if not self.video_loaded:
@@ -541,9 +755,56 @@ class MediaPlayer(ctk.CTk):
         self.playing = is_playing
         self.play_button.configure(text="Pause" if self.playing else "Play")
         if self.playing:
+            self.clock.resume(self.get_current_video_time())
             self.start_audio(self.get_current_video_time())
         else:
-            self.stop_audio()
+            self.clock.pause()
+            self.pause_audio()
+            self.update_level_meter()
+
+    def set_rate(self, rate: float):
+        # The clock runs `rate` times faster, audio is time-stretched and the decoder
+        # skips frames that could never be shown at that speed
+        rate = clamp_rate(rate)
+        if rate == self.rate:
+            return
+        self.rate = rate
+        self.speed_button.configure(text=f"{rate:g}×")
+        self.clock.set_rate(rate)
+        if self.video:
+            self.video.set_rate(rate)
+            self.match_decoder_to_rate()
+        if self.audio_player:
+            try:
+                self.audio_player.set_rate(rate, self.clock.now() if self.playing else None)
+            except Exception as e:
+                print(f"⚠️ Audio rate change error: {e}")
+
+    def match_decoder_to_rate(self):
+        # The OpenCV decoder decodes every frame it skips and cannot keep up past
+        # FAST_RATE, so faster playback reopens the file with the ffmpeg decoder
+        # (and slower playback with OpenCV again) at the frame on screen
+        if self.video is None or not self.video_path:
+            return
+        wanted = backend_for_rate(self.rate)
+        if wanted == self.video.backend or self.video.backend not in ("opencv", "scaled"):
+            return
+        media_time = self.clock.now() if self.playing else self.get_current_video_time()
+        try:
+            video = create_decoder(self.video_path, wanted, rate=self.rate)
+        except Exception as e:
+            print(f"⚠️ Decoder switch failed: {e}")
+            return
+        if not video.is_opened() or video.backend == self.video.backend:
+            video.release()
+            return
+        old, self.video = self.video, video
+        video.set_display_box(self.video_renderer.width, self.video_renderer.height)
+        video.set_index(old.index)
+        video.seek(int(round(media_time * video.fps)))
+        video.start()
+        self.needs_poster = not self.playing
+        PreparedMedia(self.video_path, old).release_async()
 
     def toggle_mute(self):
         self.muted = not self.muted
@@ -561,143 +822,256 @@ class MediaPlayer(ctk.CTk):
             except Exception as e:
                 print(f"⚠️ Mute toggle error: {e}")
 
-    def get_gesture_name(self, fingers):
-        if fingers == [0, 1, 1, 1, 1]:
-            return "✋ PLAY", "play"
-        elif fingers == [0, 0, 0, 0, 0]:
-            return "✊ PAUSE", "pause"
-        elif fingers == [0, 1, 0, 0, 0]:
-            return "☝️ FORWARD", "forward"
-        elif fingers == [1, 0, 0, 0, 0]:
-            return "👍 REWIND", "rewind"
-        elif fingers == [0, 1, 1, 0, 0]:
-            return "✌️ MUTE/UNMUTE", "mute"
-        elif fingers == [0, 1, 0, 0, 1]:
-            return "🤘 RESTART", "restart"
-        elif fingers == [0, 1, 1, 1, 0]:
-            return "⏭ NEXT", "next"
-        elif fingers == [0, 0, 1, 1, 1]:
-            return "⏮ PREVIOUS", "previous"
+    def update_gesture_labels(self, result):
+        hands = self.hand_tracker.visible()
+        owner = self.gesture_arbiter.owner
+        if len(hands) > 1 and owner is not None:
+            # Several hands: show the one in control, since that is whose gestures act
+            track = self.hand_tracker.get(owner)
+            fingers = track.fingers if track else None
+            display = get_gesture_name(fingers)[0] if fingers else "None"
+            self.current_gesture_label.configure(text=f"Hand {owner} of {len(hands)}: {display}")
+            self.finger_status_label.configure(text=f"Fingers: {format_finger_status(fingers)}")
+            return
+        self.current_gesture_label.configure(text=f"Current Gesture: {result.gesture_display}")
+        self.finger_status_label.configure(text=f"Fingers: {result.finger_status}")
+
+    def dispatch_gesture(self, gesture):
+        fps = self.video.fps if self.video else 0
+        pos = self.video.position if self.video else 0
+
+        if gesture == "play":
+            self.set_playing(True)
+        elif gesture == "pause":
+            self.set_playing(False)
+        elif gesture == "forward" and self.video:
+            self.seek_to_frame(pos + int(fps * 2))
+        elif gesture == "rewind" and self.video:
+            self.seek_to_frame(max(0, pos - int(fps * 2)))
+        elif gesture == "mute":
+            self.toggle_mute()
+        elif gesture == "restart" and self.video:
+            self.video.seek(0)
+            self.set_playing(True)
+        elif gesture == "next":
+            self.play_next(auto=False)
+        elif gesture == "previous":
+            self.play_previous(auto=False)
+        elif gesture == "faster":
+            self.set_rate(step_rate(self.rate, 1))
+        elif gesture == "slower":
+            self.set_rate(step_rate(self.rate, -1))
+
+    def on_video_resize(self, width: int, height: int):
+        # Decode straight to the new canvas size from here on
+        if self.video is not None:
+            self.video.set_display_box(width, height)
+
+    # ===== Performance instrumentation =====
+    def toggle_perf_overlay(self):
+        if self.perf_overlay is None:
+            profiler.set_enabled(True)
+            self.perf_overlay = self.video_canvas.create_text(
+                10, 10, anchor="nw", text="collecting…", fill="#00FF00", font=("Courier", 10)
+            )
         else:
-            return "❓ UNKNOWN", None
+            self.video_canvas.delete(self.perf_overlay)
+            self.perf_overlay = None
+            profiler.set_enabled(False)
+
+    def update_perf_overlay(self):
+        profiler.set_counter("dropped_frames", self.video.ring.dropped if self.video else 0)
+        if self.audio_player and self.audio_player.is_open():
+            stats = self.audio_player.buffer_stats()
+            profiler.set_counter("audio_underruns", stats["underruns"] + stats["device_underflows"])
+        if self.perf_overlay is not None:
+            self.video_canvas.itemconfigure(self.perf_overlay, text=profiler.overlay_text())
+            self.video_canvas.tag_raise(self.perf_overlay)
+
+    def export_perf_trace(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        try:
+            self.update_perf_overlay()
+            profiler.export_json(f"perf_trace_{stamp}.json")
+            profiler.export_csv(f"perf_trace_{stamp}.csv")
+            print(f"📈 Wrote perf_trace_{stamp}.json / .csv")
+        except Exception as e:
+            print(f"⚠️ Trace export failed: {e}")
 
     def update_frames(self):
         if not self.running:
             return
+        delay_ms = 16
+        tick_start = profiler.start()
         try:
-            ret_cam, cam_frame = self.cam.read()
-            if ret_cam:
-                cam_frame = cv2.flip(cam_frame, 1)
-                cam_rgb = cv2.cvtColor(cam_frame, cv2.COLOR_BGR2RGB)
-                results = hands.process(cam_rgb)
-
-                gesture = None
-                gesture_display = "None"
-                finger_status = "- - - - -"
-
-                if results and results.multi_hand_landmarks:
-                    for handLms in results.multi_hand_landmarks:
-                        mp_draw.draw_landmarks(cam_frame, handLms, mp_hands.HAND_CONNECTIONS)
-                        fingers = self.get_fingers_up(handLms)
-                        finger_names = ["👍", "☝️", "🖕", "💍", "🤙"]
-                        finger_status = " ".join([finger_names[i] if fingers[i] == 1 else "✖" for i in range(5)])
-                        gesture_display, gesture = self.get_gesture_name(fingers)
-
-                self.current_gesture_label.configure(text=f"Current Gesture: {gesture_display}")
-                self.finger_status_label.configure(text=f"Fingers: {finger_status}")
-
-                current_time = time.time()
-                if gesture and self.video_loaded and (gesture != self.last_gesture or current_time - self.last_time > self.gesture_cooldown):
-                    fps = self.video.get(cv2.CAP_PROP_FPS) if self.video else 0
-                    pos = self.video.get(cv2.CAP_PROP_POS_FRAMES) if self.video else 0
-
-                    if gesture == "play":
-                        self.set_playing(True)
-                    elif gesture == "pause":
-                        self.set_playing(False)
-                    elif gesture == "forward" and self.video:
-                        self.video.set(cv2.CAP_PROP_POS_FRAMES, pos + int(fps * 2))
-                        if self.playing:
-                            self.stop_audio()
-                            self.start_audio(self.get_current_video_time())
-                    elif gesture == "rewind" and self.video:
-                        self.video.set(cv2.CAP_PROP_POS_FRAMES, max(0, pos - int(fps * 2)))
-                        if self.playing:
-                            self.stop_audio()
-                            self.start_audio(self.get_current_video_time())
-                    elif gesture == "mute":
-                        self.toggle_mute()
-                    elif gesture == "restart" and self.video:
-                        self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                        self.set_playing(True)
-                    elif gesture == "next":
-                        self.play_next(auto=False)
-                    elif gesture == "previous":
-                        self.play_previous(auto=False)
-
-                    self.last_gesture = gesture
-                    self.last_time = current_time
-
-                cam_frame = cv2.cvtColor(cam_frame, cv2.COLOR_BGR2RGB)
-                cam_frame = cv2.resize(cam_frame, (320, 240))
-                cam_photo = ImageTk.PhotoImage(Image.fromarray(cam_frame))
-                self.gesture_canvas.create_image(0, 0, anchor="nw", image=cam_photo)
-                self.gesture_canvas.image = cam_photo
+            # Only consume the newest gesture result; inference runs in GestureWorker
+            result = self.gesture_worker.results.peek()
+            if result is not None and result.seq != self.last_gesture_seq:
+                self.last_gesture_seq = result.seq
+                # Preview-only frames (between inferences) carry no gesture
+                if result.inferred:
+                    t0 = profiler.start()
+                    fired = self.hand_tracker.update(result.landmarks, result.timestamp)
+                    actions = self.gesture_arbiter.select(self.hand_tracker, fired)
+                    profiler.stop("hand_tracking", t0)
+                    self.update_gesture_labels(result)
+                    if self.video_loaded:
+                        for gesture in actions:
+                            t0 = profiler.start()
+                            self.dispatch_gesture(gesture)
+                            profiler.stop("gesture_dispatch", t0)
+
+                t0 = profiler.start()
+                self.preview_renderer.show(result.preview)
+                profiler.stop("preview_blit", t0)
 
             if self.playing and self.video_loaded and self.video is not None:
-                ret_vid, frame = self.video.read()
-                if ret_vid:
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    video_ratio = frame.shape[1] / frame.shape[0]
-                    canvas_width = max(1, self.video_canvas.winfo_width())
-                    canvas_height = max(1, self.video_canvas.winfo_height())
-                    canvas_ratio = canvas_width / canvas_height
-
-                    if video_ratio > canvas_ratio:
-                        new_width = canvas_width
-                        new_height = int(canvas_width / video_ratio)
-                    else:
-                        new_height = canvas_height
-                        new_width = int(canvas_height * video_ratio)
-                    frame = cv2.resize(frame, (new_width, new_height))
-
+                # Show the newest decoded frame that is due on the master clock; late ones are skipped
+                media_time = self.clock.now()
+                dropped_before = self.video.ring.dropped
+                item = self.video.pop_due(media_time)
+                if item is not None:
+                    frame, pts, _ = item
+                    self.clock.record_frame(pts, media_time, self.video.ring.dropped - dropped_before)
                     volume = 0 if self.muted else self.volume_slider.get() / 100
-                    if volume < 0.1:
-                        frame = cv2.convertScaleAbs(frame, alpha=0.7)
-
-                    video_photo = ImageTk.PhotoImage(Image.fromarray(frame))
-                    x = (canvas_width - new_width) // 2
-                    y = (canvas_height - new_height) // 2
-                    self.video_canvas.create_image(x, y, anchor="nw", image=video_photo)
-                    self.video_canvas.image = video_photo
-
-                    total_frames = self.video.get(cv2.CAP_PROP_FRAME_COUNT)
-                    current_frame = self.video.get(cv2.CAP_PROP_POS_FRAMES)
-                    fps = self.video.get(cv2.CAP_PROP_FPS)
-                    if total_frames > 0 and fps and fps > 0:
-                        self.progress_bar.set(current_frame / total_frames)
-                        current_time_sec = current_frame / fps
-                        total_time = total_frames / fps
+
+                    t0 = profiler.start()
+                    self.video_renderer.show(frame, dim=volume < 0.1)
+                    profiler.stop("canvas_blit", t0)
+                    self.on_frame_shown()
+
+                    total_time = self.video.duration
+                    if total_time > 0:
+                        self.progress_bar.set(min(1.0, pts / total_time))
                         self.time_label.configure(
-                            text=f"{self.format_time(current_time_sec)} / {self.format_time(total_time)}"
+                            text=f"{self.format_time(pts)} / {self.format_time(total_time)}"
                         )
-                else:
+                        if total_time - pts <= self.preload_seconds:
+                            self.preload_next()
+                elif self.video.finished():
                     self.play_next(auto=True)
+
+                if self.playing and self.video is not None:
+                    delay_ms = self.clock.next_delay_ms(self.video.ring.next_pts())
+
+                now = time.time()
+                if now - self.last_sync_report > 0.5:
+                    self.last_sync_report = now
+                    self.update_sync_label()
+                if now - self.last_session_save > 5.0:
+                    self.save_session()
+                self.update_level_meter()
+            elif self.needs_poster and self.video_loaded and self.video is not None:
+                # Paused after a load or seek: show the frame we are parked on
+                item = self.video.pop_next()
+                if item is not None:
+                    self.video_renderer.show(item[0])
+                    self.video.position = item[2]
+                    self.on_frame_shown()
+
+            if self.restore_pending:
+                self.poll_session_restore()
+            if self.playlist_load_pending:
+                self.poll_playlist_load()
+            # The inference process can also give up long after startup
+            if not self.startup_reported or (self.gesture_worker.error and not self.gesture_error_shown):
+                self.check_startup()
+
+            # Only rows that are on screen get redrawn
+            self.playlist_view.refresh_paths(self.thumbnails.ready())
+            self.playlist_view.refresh_paths(self.media_info.ready())
+
+            if profiler.enabled and time.time() - self.last_overlay_update > 0.5:
+                self.last_overlay_update = time.time()
+                self.update_perf_overlay()
         except Exception as e:
             print(f"⚠️ Error in update_frames: {e}")
         finally:
+            profiler.stop("ui_tick", tick_start)
             if self.running:
-                self.after(16, self.update_frames)
+                self.after(delay_ms, self.update_frames)
+
+    def on_frame_shown(self):
+        self.needs_poster = False
+        if self.transition_start is not None:
+            # Track change -> first frame of the new item on screen
+            elapsed = time.perf_counter() - self.transition_start
+            self.last_transition_ms = elapsed * 1000.0
+            profiler.record("track_switch", elapsed, self.transition_start)
+            self.transition_start = None
+        if self.first_frame_ms is None:
+            self.first_frame_ms = startup.elapsed_ms()
+            startup.mark("first_frame")
+            print(f"⏱️ First frame {self.first_frame_ms:.0f} ms after launch")
+
+    # ===== Session =====
+    def poll_session_restore(self):
+        if self.restore_path is None:
+            state = self.session.restored
+            if state is not None:
+                self.apply_session(state)
+            return
+        if self.preloader.status(self.restore_path) == "pending":
+            return
+        path, self.restore_path = self.restore_path, None
+        self.restore_pending = False
+        if self.video_path is None:
+            # Opened on the preloader thread; this is just the swap
+            self.current_index = self.playlist.index_of(path)
+            self.load_video_file(path, announce=False)
+            self.resume_position(path)
+            self.playlist_view.set_current(self.current_index)
+
+    def apply_session(self, state):
+        self.saved_positions.update(state.positions)
+        self.set_playlist_name(state.playlist_name)
+        if state.volume is not None:
+            self.volume_slider.set(state.volume)
+            self.on_volume_change(None)
+        if state.muted and not self.muted:
+            self.toggle_mute()
+        self.media_info.request(self.playlist.extend(state.playlist))
+        self.render_playlist()
+        if state.missing:
+            print(f"⚠️ {state.missing} playlist file(s) no longer exist and were skipped")
+        if state.current_path and self.video_path is None:
+            self.restore_path = state.current_path
+            self.preloader.prepare(state.current_path, (self.video_renderer.width, self.video_renderer.height))
+        else:
+            self.restore_pending = False
+
+    def resume_position(self, path: str):
+        seconds = self.saved_positions.get(path, 0.0)
+        if seconds > 0 and self.video is not None and self.video.fps > 0:
+            self.seek_to_frame(int(seconds * self.video.fps))
+
+    def remember_position(self):
+        if self.video is None or self.video_path is None:
+            return
+        seconds = self.get_current_video_time()
+        if seconds < 1.0 or seconds > self.video.duration - 5.0:
+            seconds = 0.0  # barely started or finished: next time starts from the top
+        self.saved_positions[self.video_path] = seconds
+        self.session.save_position(self.video_path, seconds)
+
+    def save_session(self):
+        self.last_session_save = time.time()
+        self.remember_position()
+        self.session.save_settings(volume=self.volume_slider.get(), muted=self.muted, current_path=self.video_path)
 
     def cleanup(self):
         self.running = False
+        self.save_session()
+        self.session.close()
         time.sleep(0.1)
         self.stop_audio()
-        if self.cam:
-            self.cam.release()
+        if self.gesture_worker:
+            self.gesture_worker.stop()
+        self.thumbnails.stop()
+        self.media_info.stop()
+        self.preloader.cancel()
         if self.video:
             self.video.release()
-        cv2.destroyAllWindows()
         self.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+import hashlib
+import os
+
+
+def cache_root() -> str:
+    root = os.environ.get("GESTURE_PLAYER_CACHE_DIR")
+    if not root:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        root = os.path.join(base, "gesture_player")
+    return root
+
+
+def cache_dir(kind: str) -> str:
+    path = os.path.join(cache_root(), kind)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_key(file_path: str) -> str:
+    # Identifies one version of a media file: path + size + mtime
+    st = os.stat(file_path)
+    ident = f"{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+
+def touch(path: str):
+    # Marks a cache entry as recently used for prune_lru()
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def prune_lru(kind: str, max_bytes: int, keep=()):
+    # Deletes least recently used entries until the directory fits in max_bytes.
+    # An entry is every file sharing a key prefix (e.g. <key>.npy + <key>.json).
+    path = cache_dir(kind)
+    entries = {}
+    for name in os.listdir(path):
+        full = os.path.join(path, name)
+        try:
+            st = os.stat(full)
+        except OSError:
+            continue
+        key = name.split(".", 1)[0]
+        size, used, files = entries.get(key, (0, 0.0, []))
+        entries[key] = (size + st.st_size, max(used, st.st_mtime), files + [full])
+
+    total = sum(size for size, _, _ in entries.values())
+    for key, (size, _, files) in sorted(entries.items(), key=lambda kv: kv[1][1]):
+        if total <= max_bytes:
+            break
+        if key in keep:
+            continue
+        for full in files:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+        total -= size
+    return total
@@ -0,0 +1,191 @@
+import csv
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 133]
+
+
+# === Per-stage statistics ===
+class StageStats:
+    def __init__(self, window: int = 600):
+        self.recent = deque(maxlen=window)
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds: float):
+        ms = seconds * 1000.0
+        self.recent.append(ms)
+        self.histogram[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.worst:
+            self.worst = ms
+
+    def summary(self) -> dict:
+        recent = sorted(self.recent)
+        if not recent:
+            return {"count": self.count}
+
+        def pct(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))]
+
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": self.worst,
+            "histogram": dict(zip([f"<{b}" for b in BUCKETS_MS] + [f">={BUCKETS_MS[-1]}"], self.histogram)),
+        }
+
+
+# === Profiler ===
+class Profiler:
+    # Usage on a hot path:
+    #     t0 = profiler.start()
+    #     ...
+    #     profiler.stop("decode", t0)
+    # start() returns 0.0 while disabled and stop() ignores a zero start, so a
+    # disabled profiler costs one attribute check per call site.
+    def __init__(self, enabled: bool = False, window: int = 600, trace_limit: int = 50000):
+        self.enabled = bool(enabled)
+        self.window = window
+        self.stages = {}
+        self.counters = {}
+        self.trace = deque(maxlen=trace_limit)
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = bool(enabled)
+
+    def start(self) -> float:
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, stage: str, t0: float):
+        if not t0:
+            return
+        t1 = time.perf_counter()
+        self.record(stage, t1 - t0, t0)
+
+    def record(self, stage: str, seconds: float, t0: float = None):
+        if not self.enabled:
+            return
+        stats = self.stages.get(stage)
+        if stats is None:
+            with self.lock:
+                stats = self.stages.setdefault(stage, StageStats(self.window))
+        stats.add(seconds)
+        if t0 is None:
+            t0 = time.perf_counter() - seconds
+        self.trace.append((stage, t0 - self.origin, seconds, threading.get_ident()))
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_counter(self, name: str, value):
+        if self.enabled:
+            self.counters[name] = value
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.trace.clear()
+            self.origin = time.perf_counter()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            stages = dict(self.stages)
+        return {
+            "stages": {name: stats.summary() for name, stats in sorted(stages.items())},
+            "counters": dict(self.counters),
+        }
+
+    def overlay_text(self) -> str:
+        snap = self.snapshot()
+        lines = [f"{'stage':<16}{'p50':>7}{'p95':>7}{'max':>7}  ms"]
+        for name, s in snap["stages"].items():
+            if "p50_ms" in s:
+                lines.append(f"{name:<16}{s['p50_ms']:>7.1f}{s['p95_ms']:>7.1f}{s['max_ms']:>7.1f}")
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def export_json(self, path: str):
+        # Chrome trace-event format (chrome://tracing, Perfetto) plus the summary
+        events = [
+            {"name": stage, "ph": "X", "ts": start * 1e6, "dur": dur * 1e6, "pid": 0, "tid": tid}
+            for stage, start, dur, tid in list(self.trace)
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "summary": self.snapshot()}, f)
+
+    def export_csv(self, path: str):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "start_s", "duration_ms", "thread"])
+            for stage, start, dur, tid in list(self.trace):
+                writer.writerow([stage, f"{start:.6f}", f"{dur * 1000.0:.4f}", tid])
+
+
+# === Startup phases ===
+class StartupTimer:
+    # One-shot timings of everything between launch and a usable player, from
+    # whichever thread does the work. Unlike the profiler this is always on:
+    # each phase runs once, so recording costs nothing that matters.
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = []  # (name, start_s, duration_s, thread name), relative to origin
+        self.lock = threading.Lock()
+
+    def add(self, name: str, t0: float, t1: float = None):
+        t1 = time.perf_counter() if t1 is None else t1
+        with self.lock:
+            self.phases.append((name, t0 - self.origin, t1 - t0, threading.current_thread().name))
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.add(name, now, now)
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, t0)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.origin) * 1000.0
+
+    def report(self) -> str:
+        with self.lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        lines = [f"{'startup phase':<20}{'at':>9}{'took':>9}  thread"]
+        for name, start, dur, thread in phases:
+            lines.append(f"{name:<20}{start * 1000.0:>9.0f}{dur * 1000.0:>9.0f}  {thread}")
+        return "\n".join(lines)
+
+    def export_json(self, path: str):
+        with self.lock:
+            phases = [
+                {"phase": name, "start_ms": start * 1000.0, "duration_ms": dur * 1000.0, "thread": thread}
+                for name, start, dur, thread in sorted(self.phases, key=lambda p: p[1])
+            ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"phases": phases}, f, indent=2)
+
+
+# Shared instances used by the player and its worker threads
+profiler = Profiler()
+startup = StartupTimer()
@@ -0,0 +1,153 @@
+import time
+from collections import deque
+
+# Speeds offered by the UI and the faster/slower gestures
+RATE_STEPS = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0, 4.0)
+MIN_RATE, MAX_RATE = RATE_STEPS[0], RATE_STEPS[-1]
+
+
+def clamp_rate(rate: float) -> float:
+    return max(MIN_RATE, min(MAX_RATE, float(rate)))
+
+
+def step_rate(rate: float, steps: int) -> float:
+    # The RATE_STEPS entry `steps` away from the one nearest `rate`
+    nearest = min(range(len(RATE_STEPS)), key=lambda i: abs(RATE_STEPS[i] - rate))
+    return RATE_STEPS[max(0, min(len(RATE_STEPS) - 1, nearest + steps))]
+
+
+# === Drift statistics ===
+class DriftStats:
+    def __init__(self, window: int = 240):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if abs(value) > abs(self.worst):
+            self.worst = value
+
+    def reset(self):
+        self.samples.clear()
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    @property
+    def last(self) -> float:
+        return self.samples[-1] if self.samples else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def recent_mean(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "last_ms": self.last * 1000.0,
+            "mean_ms": self.mean * 1000.0,
+            "recent_mean_ms": self.recent_mean() * 1000.0,
+            "worst_ms": self.worst * 1000.0,
+        }
+
+
+# === Master presentation clock ===
+class PlaybackClock:
+    # Media time follows the audio device while audio is flowing (samples the
+    # player has handed to the device, minus what is still buffered) and falls
+    # back to the wall clock when muted, silent or stalled. The wall anchor
+    # tracks the audio clock while it runs so a fallback never jumps. Media
+    # time advances `rate` seconds per wall second.
+    def __init__(self):
+        self.audio = None
+        self.rate = 1.0
+        self.anchor_wall = time.monotonic()
+        self.anchor_time = 0.0
+        self.paused = True
+        self.source = "wall"
+        self.audio_origin = (self.anchor_wall, 0.0)
+        self.av_drift = DriftStats()     # frame pts - master clock when a frame is shown
+        self.audio_drift = DriftStats()  # audio clock - wall clock
+        self.late_frames = 0
+
+    def attach_audio(self, player):
+        self.audio = player
+
+    def detach_audio(self):
+        # The wall anchor already follows audio, so playback carries on from here
+        self.audio = None
+
+    def reset(self, media_time: float):
+        self.anchor_wall = time.monotonic()
+        self.anchor_time = float(media_time)
+        # Audio restarts after a seek, so measure its drift from scratch
+        self.source = "wall"
+
+    def pause(self):
+        if not self.paused:
+            self.reset(self.now())
+        self.paused = True
+
+    def resume(self, media_time: float):
+        self.reset(media_time)
+        self.paused = False
+
+    def set_rate(self, rate: float):
+        # Re-anchor first so the time already played is not rescaled
+        media_time = self.now()
+        self.rate = clamp_rate(rate)
+        self.reset(media_time)
+
+    def _wall_time(self) -> float:
+        if self.paused:
+            return self.anchor_time
+        return self.anchor_time + (time.monotonic() - self.anchor_wall) * self.rate
+
+    def now(self) -> float:
+        wall = self._wall_time()
+        audio_time = None
+        if self.audio is not None and not self.paused:
+            try:
+                audio_time = self.audio.clock_time()
+            except Exception:
+                audio_time = None
+
+        if audio_time is None:
+            self.source = "wall"
+            return wall
+
+        mono = time.monotonic()
+        if self.source != "audio":
+            self.source = "audio"
+            self.audio_origin = (mono, audio_time)
+        origin_mono, origin_time = self.audio_origin
+        self.audio_drift.add(audio_time - (origin_time + (mono - origin_mono) * self.rate))
+        self.anchor_wall = mono
+        self.anchor_time = audio_time
+        return audio_time
+
+    def record_frame(self, pts: float, media_time: float, skipped: int = 0):
+        self.av_drift.add(pts - media_time)
+        self.late_frames += skipped
+
+    def next_delay_ms(self, next_pts, default_ms: int = 16, min_ms: int = 1) -> int:
+        # Sleep until the next frame is due, but never longer than the UI tick
+        if next_pts is None or self.paused:
+            return default_ms
+        delay = (next_pts - self.now()) * 1000.0 / self.rate
+        return int(max(min_ms, min(default_ms, delay)))
+
+    def report(self) -> dict:
+        return {
+            "source": self.source,
+            "av_drift": self.av_drift.summary(),
+            "audio_drift": self.audio_drift.summary(),
+            "late_frames": self.late_frames,
+        }
@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import threading
+from collections import deque
+
+from media_cache import cache_root, file_key
+from video_pipeline import VideoInfo, probe_video
+
+
+# === Playlist model ===
+class Playlist:
+    # Ordered, duplicate-free list of paths. Positions are kept in a dict, so
+    # membership and index lookups stay O(1) on playlists of thousands of items.
+    def __init__(self, paths=()):
+        self.items = []
+        self.positions = {}
+        self.extend(paths)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __contains__(self, path):
+        return path in self.positions
+
+    def index_of(self, path: str) -> int:
+        return self.positions.get(path, -1)
+
+    def add(self, path: str) -> int:
+        # Position of path, appending it first if it is new
+        index = self.positions.get(path)
+        if index is None:
+            index = len(self.items)
+            self.items.append(path)
+            self.positions[path] = index
+        return index
+
+    def extend(self, paths):
+        # Returns only the paths that were actually added
+        added = []
+        for path in paths:
+            if path not in self.positions:
+                self.add(path)
+                added.append(path)
+        return added
+
+    def clear(self):
+        self.items.clear()
+        self.positions.clear()
+
+
+# === Media metadata ===
+class MetadataCache:
+    # Duration/resolution/fps per file, probed on a worker thread and persisted in
+    # SQLite keyed by file_key(), so a reopened playlist never re-probes. The UI
+    # reads get() and polls ready() from its tick, like ThumbnailCache.
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(cache_root(), "metadata.sqlite")
+        self.info = {}  # path -> VideoInfo
+        self.failed = set()
+        self.queued = set()
+        self.queue = deque()
+        self.done = deque()
+        self.cond = threading.Condition()
+        self.stop_flag = threading.Event()
+        self.thread = None
+
+    def get(self, path: str):
+        return self.info.get(path)
+
+    def request(self, paths, urgent: bool = False):
+        with self.cond:
+            for path in paths:
+                if path in self.info or path in self.failed:
+                    continue
+                if path in self.queued:
+                    if not urgent:
+                        continue
+                    self.queue.remove(path)
+                self.queued.add(path)
+                if urgent:
+                    self.queue.appendleft(path)
+                else:
+                    self.queue.append(path)
+            self.cond.notify()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def ready(self):
+        items = []
+        while self.done:
+            items.append(self.done.popleft())
+        return items
+
+    def _open_db(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        db = sqlite3.connect(self.db_path)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            "key TEXT PRIMARY KEY, width INTEGER, height INTEGER, fps REAL, frame_count INTEGER, duration REAL)"
+        )
+        return db
+
+    def _run(self):
+        try:
+            db = self._open_db()
+        except Exception as e:
+            print(f"⚠️ Metadata cache unavailable, probing without it: {e}")
+            db = None
+        pending_writes = 0
+        while not self.stop_flag.is_set():
+            with self.cond:
+                if not self.queue:
+                    if db is not None and pending_writes:
+                        db.commit()
+                        pending_writes = 0
+                    self.cond.wait(0.5)
+                    continue
+                path = self.queue.popleft()
+                self.queued.discard(path)
+            try:
+                key = file_key(path)
+                row = None
+                if db is not None:
+                    row = db.execute(
+                        "SELECT width, height, fps, frame_count, duration FROM media WHERE key = ?", (key,)
+                    ).fetchone()
+                if row is not None:
+                    info = VideoInfo(*row)
+                else:
+                    info = probe_video(path)
+                    if db is not None:
+                        db.execute("INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?)", (key, *info))
+                        pending_writes += 1
+                        if pending_writes >= 100:
+                            db.commit()
+                            pending_writes = 0
+                self.info[path] = info
+                self.done.append(path)
+            except Exception as e:
+                self.failed.add(path)
+                print(f"⚠️ Could not read metadata for {os.path.basename(path)}: {e}")
+        if db is not None:
+            db.commit()
+            db.close()
+
+    def stop(self):
+        self.stop_flag.set()
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        self.thread = None
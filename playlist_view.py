@@ -0,0 +1,167 @@
+import os
+from tkinter import Canvas
+
+import customtkinter as ctk
+
+ROW_BG = "#2B2B2B"
+ROW_BG_CURRENT = "#1F6AA5"
+ROW_TEXT = "#DCE4EE"
+ROW_DETAIL = "#9A9A9A"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+# === Virtualized playlist ===
+class PlaylistView:
+    # Draws only the rows that fit in the canvas, from a fixed pool of canvas items
+    # that are re-pointed at different playlist entries as the view scrolls.
+    # Cost per scroll, track change or metadata update is O(visible rows),
+    # independent of playlist length.
+    def __init__(self, master, playlist, on_activate, thumbnail=None, info=None,
+                 width: int = 280, height: int = 200, row_height: int = 34):
+        self.playlist = playlist
+        self.on_activate = on_activate
+        self.thumbnail = thumbnail  # thumbnail(path) -> PhotoImage or None
+        self.info = info            # info(path) -> VideoInfo or None
+        self.row_height = int(row_height)
+        self.first = 0
+        self.current = -1
+        self.rows = []  # pool of (bg, image, title, detail) item ids
+
+        self.frame = ctk.CTkFrame(master)
+        self.canvas = Canvas(self.frame, width=width, height=height, bg=ROW_BG, highlightthickness=0)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.width = width
+        self.height = height
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda _e: self.scroll(-1))
+        self.canvas.bind("<Button-5>", lambda _e: self.scroll(1))
+        self._ensure_rows()
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # ----- geometry -----
+    def visible_count(self) -> int:
+        return max(1, -(-self.height // self.row_height))
+
+    def _ensure_rows(self):
+        while len(self.rows) < self.visible_count():
+            y = len(self.rows) * self.row_height
+            bg = self.canvas.create_rectangle(0, y, self.width, y + self.row_height - 2, fill=ROW_BG, width=0)
+            image = self.canvas.create_image(4, y + (self.row_height - 2) // 2, anchor="w")
+            title = self.canvas.create_text(58, y + 4, anchor="nw", fill=ROW_TEXT, font=("Helvetica", 10))
+            detail = self.canvas.create_text(58, y + self.row_height - 4, anchor="sw", fill=ROW_DETAIL,
+                                             font=("Helvetica", 8))
+            self.rows.append((bg, image, title, detail))
+
+    def _on_configure(self, event):
+        if (event.width, event.height) == (self.width, self.height):
+            return
+        self.width, self.height = event.width, event.height
+        for bg, _, _, _ in self.rows:
+            x0, y0, _, y1 = self.canvas.coords(bg)
+            self.canvas.coords(bg, x0, y0, self.width, y1)
+        self._ensure_rows()
+        self.refresh()
+
+    def _max_first(self) -> int:
+        return max(0, len(self.playlist) - self.height // self.row_height)
+
+    # ----- scrolling -----
+    def scroll(self, rows: int):
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first: int):
+        first = max(0, min(int(first), self._max_first()))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def see(self, index: int):
+        visible = max(1, self.height // self.row_height)
+        if index < self.first:
+            self.scroll_to(index)
+        elif index >= self.first + visible:
+            self.scroll_to(index - visible + 1)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.playlist)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= max(1, self.height // self.row_height)
+            self.scroll(step)
+
+    def _update_scrollbar(self):
+        total = len(self.playlist)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        visible = self.height / self.row_height
+        self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+
+    def _on_click(self, event):
+        index = self.first + int(event.y // self.row_height)
+        if 0 <= index < len(self.playlist):
+            self.on_activate(index)
+
+    # ----- drawing -----
+    def _draw_row(self, slot: int):
+        bg, image, title, detail = self.rows[slot]
+        index = self.first + slot
+        if index >= len(self.playlist) or slot >= self.visible_count():
+            self.canvas.itemconfigure(bg, state="hidden")
+            self.canvas.itemconfigure(image, state="hidden")
+            self.canvas.itemconfigure(title, state="hidden")
+            self.canvas.itemconfigure(detail, state="hidden")
+            return
+
+        path = self.playlist[index]
+        is_current = index == self.current
+        self.canvas.itemconfigure(bg, state="normal", fill=ROW_BG_CURRENT if is_current else ROW_BG)
+        photo = self.thumbnail(path) if self.thumbnail else None
+        self.canvas.itemconfigure(image, state="normal" if photo is not None else "hidden", image=photo or "")
+        self.canvas.itemconfigure(title, state="normal",
+                                  text=("▶ " if is_current else "") + os.path.basename(path))
+        info = self.info(path) if self.info else None
+        text = ""
+        if info is not None:
+            text = f"{format_duration(info.duration)}  ·  {info.width}x{info.height}  ·  {info.fps:.0f} fps"
+        self.canvas.itemconfigure(detail, state="normal", text=text)
+
+    def refresh(self):
+        # Redraw every visible row, e.g. after items were added
+        self.first = min(self.first, self._max_first())
+        for slot in range(len(self.rows)):
+            self._draw_row(slot)
+        self._update_scrollbar()
+
+    def refresh_index(self, index: int):
+        slot = index - self.first
+        if 0 <= slot < len(self.rows):
+            self._draw_row(slot)
+
+    def refresh_paths(self, paths):
+        for path in paths:
+            index = self.playlist.index_of(path)
+            if index >= 0:
+                self.refresh_index(index)
+
+    def set_current(self, index: int):
+        # Only the old and new current rows change
+        previous, self.current = self.current, index
+        self.refresh_index(previous)
+        self.see(index)
+        self.refresh_index(index)
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+from keyframe_index import load_or_build_async
+from ffmpeg_backend import create_decoder
+
+
+# === Prepared playlist item ===
+class PreparedMedia:
+    # A decoder that has already opened its file and buffered its first frames,
+    # plus an audio player with PCM decoding under way, ready to be swapped in
+    def __init__(self, file_path: str, video, audio_player=None):
+        self.file_path = file_path
+        self.video = video
+        self.audio_player = audio_player
+        self.prepare_ms = 0.0
+
+    def release(self):
+        if self.audio_player is not None:
+            try:
+                self.audio_player.stop()
+            except Exception:
+                pass
+        if self.video is not None:
+            self.video.release()
+        self.audio_player = None
+        self.video = None
+
+    def release_async(self):
+        # Joining decoder threads and reaping ffmpeg can take tens of ms; keep it off the UI thread
+        threading.Thread(target=self.release, daemon=True).start()
+
+
+# === Preloader ===
+class Preloader:
+    # Opens the next playlist item on a background thread while the current one
+    # is still playing. take() hands it over only once it is fully ready, so a
+    # track change is an object swap rather than open + probe + spawn on the UI thread.
+    def __init__(self, make_audio=None, first_frames: int = 2, ready_timeout: float = 3.0):
+        self.make_audio = make_audio  # make_audio(file_path, video) -> audio player
+        self.first_frames = int(first_frames)
+        self.ready_timeout = float(ready_timeout)
+        self.lock = threading.Lock()
+        self.requested = None  # path asked for last; not retried if it fails
+        self.pending = None    # path currently being prepared
+        self.prepared = None   # PreparedMedia, once ready
+        self.thread = None
+
+    def prepare(self, file_path: str, display_box, rate: float = 1.0):
+        with self.lock:
+            if file_path == self.requested:
+                return
+            stale, self.prepared = self.prepared, None
+            self.requested = self.pending = file_path
+        if stale is not None:
+            stale.release_async()
+        self.thread = threading.Thread(target=self._run, args=(file_path, display_box, rate), daemon=True)
+        self.thread.start()
+
+    def _run(self, file_path: str, display_box, rate: float):
+        t0 = time.perf_counter()
+        media = None
+        try:
+            video = create_decoder(file_path, rate=rate)
+            media = PreparedMedia(file_path, video)
+            if not video.is_opened():
+                raise RuntimeError("cannot open video")
+            video.set_display_box(*display_box)
+            video.start()
+            load_or_build_async(file_path, video.set_index)
+            if self.make_audio is not None:
+                media.audio_player = self.make_audio(file_path, video)
+
+            # Ready means the first frames are sitting in the ring
+            deadline = time.monotonic() + self.ready_timeout
+            while len(video.ring) < self.first_frames and not video.eof and time.monotonic() < deadline:
+                time.sleep(0.005)
+            media.prepare_ms = (time.perf_counter() - t0) * 1000.0
+        except Exception as e:
+            print(f"⚠️ Preload failed for {os.path.basename(file_path)}: {e}")
+            if media is not None:
+                media.release()
+            media = None
+
+        with self.lock:
+            if self.pending != file_path:
+                # Superseded or cancelled while we were working
+                if media is not None:
+                    media.release()
+                return
+            self.pending = None
+            self.prepared = media
+
+    def status(self, file_path: str):
+        # "ready", "pending", or None when file_path is not being (or failed to be) prepared
+        with self.lock:
+            if self.prepared is not None and self.prepared.file_path == file_path:
+                return "ready"
+            if self.pending == file_path:
+                return "pending"
+            return None
+
+    def take(self, file_path: str):
+        # The prepared item for file_path, or None if it is not (yet) ready
+        with self.lock:
+            media = self.prepared
+            if media is None or media.file_path != file_path:
+                return None
+            self.prepared = None
+            self.requested = None
+            return media
+
+    def cancel(self):
+        with self.lock:
+            stale, self.prepared = self.prepared, None
+            self.requested = self.pending = None
+        if stale is not None:
+            stale.release_async()
@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+from video_pipeline import fit_size
+
+
+# === Canvas renderer ===
+class CanvasRenderer:
+    # Owns a single image item and PhotoImage on a Tk canvas. Geometry is only
+    # recomputed on <Configure>; each frame is pasted into the existing photo,
+    # and any resize/dim work goes into one preallocated buffer.
+    def __init__(self, canvas, on_resize=None, fit: bool = True, dim_alpha: float = 0.7):
+        self.canvas = canvas
+        self.on_resize = on_resize
+        self.fit = fit
+        self.dim_alpha = float(dim_alpha)
+        self.width = max(1, int(float(canvas.cget("width"))))
+        self.height = max(1, int(float(canvas.cget("height"))))
+        self.photo = None
+        self.item = None
+        self.position = None
+        self.buf = None
+        canvas.bind("<Configure>", self._on_configure, add="+")
+
+    def _on_configure(self, event):
+        width, height = max(1, event.width), max(1, event.height)
+        if (width, height) == (self.width, self.height):
+            return
+        self.width, self.height = width, height
+        self.position = None
+        if self.on_resize:
+            self.on_resize(width, height)
+
+    def target_size(self, frame_width: int, frame_height: int):
+        if not self.fit:
+            return frame_width, frame_height
+        return fit_size(frame_width, frame_height, self.width, self.height)
+
+    def _buffer(self, width: int, height: int):
+        if self.buf is None or self.buf.shape[0] != height or self.buf.shape[1] != width:
+            self.buf = np.empty((height, width, 3), dtype=np.uint8)
+        return self.buf
+
+    def show(self, frame, dim: bool = False):
+        height, width = frame.shape[:2]
+        target_w, target_h = self.target_size(width, height)
+
+        if abs(target_w - width) <= 1 and abs(target_h - height) <= 1:
+            # Decoder output already fits; don't resample over a rounding pixel
+            target_w, target_h = width, height
+
+        src = frame
+        if (target_w, target_h) != (width, height):
+            buf = self._buffer(target_w, target_h)
+            cv2.resize(frame, (target_w, target_h), dst=buf)
+            src = buf
+        if dim:
+            # In place when we already resized, so dimming never costs an extra copy
+            buf = self._buffer(target_w, target_h)
+            cv2.convertScaleAbs(src, dst=buf, alpha=self.dim_alpha)
+            src = buf
+
+        image = Image.fromarray(src)
+        if self.photo is None or self.photo.width() != target_w or self.photo.height() != target_h:
+            self.photo = ImageTk.PhotoImage(image)
+            if self.item is None:
+                self.item = self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+                self.canvas.tag_lower(self.item)
+            else:
+                self.canvas.itemconfigure(self.item, image=self.photo)
+            self.position = None
+        else:
+            self.photo.paste(image)
+
+        position = ((self.width - target_w) // 2, (self.height - target_h) // 2)
+        if position != self.position:
+            self.canvas.coords(self.item, *position)
+            self.position = position
+
+    def clear(self):
+        if self.item is not None:
+            self.canvas.delete(self.item)
+        self.item = None
+        self.photo = None
+        self.position = None
@@ -0,0 +1,152 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from perf import startup
+
+SessionState = namedtuple("SessionState", ["playlist", "missing", "current_path", "positions", "volume", "muted",
+                                           "playlist_name"])
+LoadedPlaylist = namedtuple("LoadedPlaylist", ["name", "playlist", "missing"])
+
+DEFAULT_PLAYLIST = "default"
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS playlist_items ("
+    "name TEXT NOT NULL, position INTEGER NOT NULL, path TEXT NOT NULL, PRIMARY KEY (name, position))",
+    "CREATE TABLE IF NOT EXISTS resume (path TEXT PRIMARY KEY, seconds REAL NOT NULL, updated REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+]
+
+
+def data_root() -> str:
+    root = os.environ.get("GESTURE_PLAYER_DATA_DIR")
+    if not root:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        root = os.path.join(base, "gesture_player")
+    return root
+
+
+def connect(path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=5.0)
+    # WAL lets the metadata worker read and write the same file concurrently;
+    # NORMAL skips the fsync per commit, which only risks the last few saves on power loss
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        db.execute(statement)
+    return db
+
+
+# === Session store ===
+class SessionStore:
+    # Playlists, resume positions and player settings in one SQLite file (which
+    # MetadataCache shares for probed media info). Every query runs on one
+    # background thread: the UI queues writes and polls `restored` once at startup
+    # (and `loaded` after asking for another playlist by name).
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(data_root(), "session.sqlite")
+        self.jobs = queue.Queue()
+        self.restored = None  # SessionState, once the startup load has finished
+        self.loaded = None    # LoadedPlaylist, once a load_playlist() request has finished
+        self.names = []       # saved playlist names, refreshed after every load and save
+        self.load_ms = 0.0
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True, name="session")
+            self.thread.start()
+            self.jobs.put(self._load)
+
+    def _run(self):
+        try:
+            db = connect(self.path)
+        except Exception as e:
+            print(f"⚠️ Session store unavailable: {e}")
+            self.restored = SessionState([], 0, None, {}, None, None, DEFAULT_PLAYLIST)
+            return
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                job(db)
+                if self.jobs.empty():
+                    db.commit()
+            except Exception as e:
+                print(f"⚠️ Session store error: {e}")
+        try:
+            db.commit()
+            db.close()
+        except Exception:
+            pass
+
+    def _load(self, db):
+        t0 = time.perf_counter()
+        settings = {key: json.loads(value) for key, value in db.execute("SELECT key, value FROM settings")}
+        name = settings.get("playlist") or DEFAULT_PLAYLIST
+        playlist, missing = self._read_playlist(db, name)
+        positions = dict(db.execute("SELECT path, seconds FROM resume"))
+        current = settings.get("current_path")
+        self.load_ms = (time.perf_counter() - t0) * 1000.0
+        startup.add("session_load", t0)
+        self.restored = SessionState(
+            playlist,
+            missing,
+            current if current in set(playlist) else None,
+            positions,
+            settings.get("volume"),
+            settings.get("muted"),
+            name,
+        )
+
+    def _read_playlist(self, db, name: str):
+        rows = db.execute("SELECT path FROM playlist_items WHERE name = ? ORDER BY position", (name,))
+        paths = [row[0] for row in rows]
+        # Validate here rather than on the UI thread; a few thousand stat() calls add up
+        playlist = [p for p in paths if os.path.isfile(p)]
+        self._refresh_names(db)
+        return playlist, len(paths) - len(playlist)
+
+    def _refresh_names(self, db):
+        self.names = [row[0] for row in db.execute("SELECT DISTINCT name FROM playlist_items ORDER BY name")]
+
+    def load_playlist(self, name: str):
+        # Reads another saved playlist; poll `loaded` for the result
+        self.loaded = None
+
+        def job(db):
+            playlist, missing = self._read_playlist(db, name)
+            self.loaded = LoadedPlaylist(name, playlist, missing)
+
+        self.jobs.put(job)
+
+    # ----- writes (queued) -----
+    def save_playlist(self, paths, name: str = DEFAULT_PLAYLIST):
+        rows = [(name, i, path) for i, path in enumerate(paths)]
+
+        def job(db):
+            db.execute("DELETE FROM playlist_items WHERE name = ?", (name,))
+            db.executemany("INSERT INTO playlist_items VALUES (?, ?, ?)", rows)
+            self._refresh_names(db)
+
+        self.jobs.put(job)
+
+    def save_position(self, path: str, seconds: float):
+        values = (path, float(seconds), time.time())
+        self.jobs.put(lambda db: db.execute("INSERT OR REPLACE INTO resume VALUES (?, ?, ?)", values))
+
+    def save_settings(self, **values):
+        rows = [(key, json.dumps(value)) for key, value in values.items()]
+        self.jobs.put(lambda db: db.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)", rows))
+
+    def close(self):
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join(timeout=2.0)
+            self.thread = None
@@ -0,0 +1,38 @@
+import os
+
+from annotate import annotate_videos, load_annotations, output_paths
+from benchmarks.common import make_test_video
+
+
+class _NoHands:
+    # Stands in for MediaPipe Hands: sees nothing, needs no model
+    multi_hand_landmarks = None
+
+    def process(self, image):
+        return self
+
+
+def no_hands(max_num_hands, min_detection_confidence):
+    return _NoHands()
+
+
+def test_same_named_inputs_keep_every_output(tmp_path):
+    first = make_test_video(str(tmp_path / "day1" / "cam.mp4"), 160, 120, 10, 1.0)
+    second = make_test_video(str(tmp_path / "day2" / "cam.mp4"), 160, 120, 10, 2.0)
+    out = str(tmp_path / "out")
+
+    written = annotate_videos([first, second], out, workers=1, hands_factory=no_hands)
+
+    assert set(written) == {first, second}
+    assert len(set(written.values())) == 2
+    for path, target in written.items():
+        assert os.path.isfile(target)
+        assert load_annotations(target)["meta"]["source"] == os.path.abspath(path)
+
+
+def test_unique_names_are_unchanged(tmp_path):
+    paths = [str(tmp_path / "a" / "cam.mp4"), str(tmp_path / "b" / "desk.mp4")]
+    assert output_paths("out", paths) == {
+        paths[0]: os.path.join("out", "cam.npz"),
+        paths[1]: os.path.join("out", "desk.npz"),
+    }
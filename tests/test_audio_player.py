@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+import pytest
+
+from audio_player import FFmpegAudioPlayer
+
+SR = 8000
+BLOCK = 256
+
+
+class _Source:
+    # Endless silence standing in for a decoded track (see ffmpeg_backend.SharedPCM)
+    def covers(self, start_frame: int, frames: int) -> bool:
+        return True
+
+    def read(self, start_frame: int, frames: int):
+        return np.zeros((frames, 2), dtype=np.int16)
+
+    def exhausted(self, start_frame: int) -> bool:
+        return False
+
+    def close(self):
+        pass
+
+
+class _Stream:
+    latency = 0.0
+
+
+class _TimeInfo:
+    def __init__(self):
+        self.currentTime = self.outputBufferDacTime = 0.0
+
+
+class _Status:
+    output_underflow = False
+
+
+@pytest.fixture
+def player():
+    player = FFmpegAudioPlayer("silence.wav", samplerate=SR, duration=60.0, block_frames=BLOCK,
+                               pcm_source=_Source())
+    player.stream = _Stream()  # the test plays the device's part by calling _callback
+    player.paused = False
+    yield player
+    player.stream = None
+    player.stop()
+
+
+def _play_block(player):
+    out = np.zeros((BLOCK, 2), dtype=np.int16)
+    player._callback(out, BLOCK, _TimeInfo(), _Status())
+
+
+def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_clock_follows_playback(player):
+    player.prime()
+    _wait_for(lambda: player.ring.readable() >= 2 * BLOCK)
+    _play_block(player)
+    _play_block(player)
+    assert player.clock_time() == pytest.approx(BLOCK / SR, abs=0.01)
+
+
+def test_seek_hides_old_position_until_flushed(player):
+    player.prime()
+    _wait_for(lambda: player.ring.readable() >= 2 * BLOCK)
+    _play_block(player)
+    assert player.clock_time() is not None
+
+    # The feeder has not seen the seek yet: the ring still holds the old position
+    player.stop_flag.set()
+    player.wake.set()
+    player.thread.join()
+    player.seek(30.0)
+    _play_block(player)
+    assert player.clock_time() is None
+
+    player.stop_flag.clear()
+    player.thread = None
+    player.prime()
+    _wait_for(lambda: player.timeline[3] == player.seek_generation
+              and player.ring.write_pos >= player.timeline[0] + BLOCK)
+    _play_block(player)
+    assert player.clock_time() == pytest.approx(30.0, abs=0.01)
+
+
+def test_mark_from_before_seek_is_ignored(player):
+    # A callback that computed its mark before seek() can still store it afterwards
+    player.prime()
+    _wait_for(lambda: player.ring.readable() >= 2 * BLOCK)
+    _play_block(player)
+    stale = player.write_mark
+    player.seek(30.0)
+    player.write_mark = stale
+    assert player.clock_time() is None
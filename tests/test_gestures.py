@@ -0,0 +1,88 @@
+import random
+
+from benchmarks.fixtures import gesture_sequence
+from gestures import GestureEngine, get_fingers_up, replay_sequence, synthetic_hand
+
+PLAY = [0, 1, 1, 1, 1]
+FORWARD = [0, 1, 0, 0, 0]
+
+
+def _labelled_gestures(labels):
+    # The recorded gestures in order; a hold broken by a misread frame is still one gesture
+    expected = []
+    for label in labels:
+        if label is not None and (not expected or expected[-1] != label):
+            expected.append(label)
+    return expected
+
+
+def _feed(engine, frames, start: int = 0, fps: float = 30.0):
+    fired = []
+    for i, hand in enumerate(frames, start):
+        fingers = get_fingers_up(hand) if hand is not None else None
+        action = engine.update(fingers, hand, timestamp=i / fps)
+        if action:
+            fired.append((i, action))
+    return fired
+
+
+def _held(fingers, count: int, seed: int = 0, offset=(0.0, 0.0)):
+    rng = random.Random(seed)
+    return [synthetic_hand(fingers, jitter=0.004, rng=rng, offset=offset) for _ in range(count)]
+
+
+def test_fixture_fires_each_gesture_once():
+    frames, labels, fps = gesture_sequence()
+    fired = replay_sequence(frames, fps)
+    assert [action for _, action in fired] == _labelled_gestures(labels)
+    # ...and each one while it is actually being held
+    for i, action in fired:
+        assert labels[i] == action
+
+
+def test_fixture_repeats_only_listed_gestures():
+    frames, labels, fps = gesture_sequence()
+    fired = replay_sequence(frames, fps, GestureEngine(repeat={"forward": 3.0}))
+    forward = [i for i, action in fired if action == "forward"]
+    assert len(forward) > 1
+    assert all(labels[i] == "forward" for i in forward)
+    others = [action for _, action in fired if action != "forward"]
+    assert others == [g for g in _labelled_gestures(labels) if g != "forward"]
+
+
+def test_long_hold_fires_once():
+    engine = GestureEngine()
+    assert [action for _, action in _feed(engine, _held(PLAY, 300))] == ["play"]
+
+
+def test_release_does_not_fire():
+    engine = GestureEngine()
+    fired = _feed(engine, _held(PLAY, 30) + [None] * 30)
+    assert [action for _, action in fired] == ["play"]
+
+
+def test_hold_after_release_fires_again():
+    engine = GestureEngine()
+    fired = _feed(engine, _held(PLAY, 30) + [None] * 30 + _held(PLAY, 30, seed=1))
+    assert [action for _, action in fired] == ["play", "play"]
+
+
+def test_brief_misread_does_not_refire():
+    engine = GestureEngine()
+    frames = _held(PLAY, 20) + _held(FORWARD, 1) + _held(PLAY, 20, seed=1)
+    assert [action for _, action in _feed(engine, frames)] == ["play"]
+
+
+def test_motion_gate_suppresses_firing():
+    # The hand jumps further than max_motion every frame, so no frame gets a vote
+    engine = GestureEngine(max_motion=0.08)
+    moving = [synthetic_hand(PLAY, offset=(0.15 if i % 2 else -0.15, 0.0)) for i in range(60)]
+    assert _feed(engine, moving) == []
+    assert engine.confidence == 0.0
+    # Once it settles the same pose fires
+    assert [action for _, action in _feed(engine, _held(PLAY, 20), start=60)] == ["play"]
+
+
+def test_motion_gate_threshold():
+    moving = [synthetic_hand(PLAY, offset=(0.15 if i % 2 else -0.15, 0.0)) for i in range(60)]
+    assert [action for _, action in _feed(GestureEngine(max_motion=1.0), moving)] == ["play"]
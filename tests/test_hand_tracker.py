@@ -0,0 +1,47 @@
+import random
+
+from gestures import synthetic_hand
+from hand_tracker import GestureArbiter, HandTracker
+
+FORWARD = [0, 1, 0, 0, 0]
+PLAY = [0, 1, 1, 1, 1]
+LEFT, RIGHT = (-0.25, 0.0), (0.25, 0.0)
+
+
+def _run(arbiter, left, right, lag: int, frames: int = 30, fps: float = 30.0):
+    # Left hand holds `left` from frame 0, right hand holds `right` from frame `lag`;
+    # returns [(frame, action)] as dispatched
+    rng = random.Random(3)
+    tracker = HandTracker()
+    dispatched = []
+    for i in range(frames):
+        hands = [synthetic_hand(left, jitter=0.004, rng=rng, offset=LEFT)]
+        if right is not None and i >= lag:
+            hands.append(synthetic_hand(right, jitter=0.004, rng=rng, offset=RIGHT))
+        fired = tracker.update(hands, i / fps)
+        dispatched += [(i, action) for action in arbiter.select(tracker, fired)]
+    return dispatched
+
+
+def test_combo_on_same_frame():
+    assert [a for _, a in _run(GestureArbiter("combo"), FORWARD, FORWARD, lag=0)] == ["next"]
+
+
+def test_combo_drops_first_hands_action():
+    # The right hand's engine fires one or two frames after the left's
+    for lag in (1, 2):
+        assert [a for _, a in _run(GestureArbiter("combo"), FORWARD, FORWARD, lag=lag)] == ["next"]
+
+
+def test_combo_part_dispatched_after_grace():
+    single = _run(GestureArbiter("combo"), FORWARD, None, lag=0)
+    with_play = _run(GestureArbiter("combo"), FORWARD, PLAY, lag=0)
+    assert [a for _, a in with_play] == ["forward"]
+    # Only held back while another hand could complete a combo
+    assert with_play[0][0] == single[0][0] + GestureArbiter("combo").grace
+
+
+def test_other_actions_not_held():
+    first = _run(GestureArbiter("first"), PLAY, FORWARD, lag=0)
+    combo = _run(GestureArbiter("combo"), PLAY, FORWARD, lag=0)
+    assert combo == first == [(first[0][0], "play")]
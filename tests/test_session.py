@@ -0,0 +1,66 @@
+import time
+
+from session import DEFAULT_PLAYLIST, SessionStore
+
+
+def _wait_for(get, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while get() is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    return get()
+
+
+def _videos(tmp_path, *names):
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b"")
+        paths.append(str(path))
+    return paths
+
+
+def _open(db_path):
+    store = SessionStore(str(db_path))
+    store.start()
+    _wait_for(lambda: store.restored)
+    return store
+
+
+def test_named_playlists_round_trip(tmp_path):
+    db_path = tmp_path / "session.sqlite"
+    a, b, c = _videos(tmp_path, "a.mp4", "b.mp4", "c.mp4")
+    store = _open(db_path)
+    assert store.restored.playlist_name == DEFAULT_PLAYLIST
+    store.save_playlist([a, b])
+    store.save_playlist([c, a], "evening")
+    store.save_settings(playlist="evening")
+    store.close()
+
+    store = _open(db_path)
+    assert store.restored.playlist_name == "evening"
+    assert store.restored.playlist == [c, a]
+    assert store.names == [DEFAULT_PLAYLIST, "evening"]
+
+    store.load_playlist(DEFAULT_PLAYLIST)
+    loaded = _wait_for(lambda: store.loaded)
+    assert loaded.name == DEFAULT_PLAYLIST
+    assert loaded.playlist == [a, b]
+    assert loaded.missing == 0
+    store.close()
+
+
+def test_missing_files_are_skipped(tmp_path):
+    db_path = tmp_path / "session.sqlite"
+    a, b = _videos(tmp_path, "a.mp4", "b.mp4")
+    store = _open(db_path)
+    store.save_playlist([a, b], "road")
+    store.close()
+    (tmp_path / "b.mp4").unlink()
+
+    store = _open(db_path)
+    store.load_playlist("road")
+    loaded = _wait_for(lambda: store.loaded)
+    assert loaded.playlist == [a]
+    assert loaded.missing == 1
+    store.close()
@@ -0,0 +1,214 @@
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from audio_player import find_ffmpeg, kill_process
+from media_cache import cache_dir, file_key, prune_lru, touch
+from video_pipeline import probe_video
+
+SPRITE_VERSION = 1
+SPRITE_WIDTH = 128
+SPRITE_MAX_FRAMES = 240
+SPRITE_MIN_INTERVAL = 1.0
+CACHE_LIMIT_MB = 512
+
+
+# === Preview sprites ===
+class Sprite:
+    # Downscaled RGB frames sampled every `interval` seconds, memory-mapped from
+    # the cache so a hover only touches the one frame it shows
+    def __init__(self, frames, interval: float, duration: float):
+        self.frames = frames  # (count, height, width, 3) uint8
+        self.interval = float(interval)
+        self.duration = float(duration)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame_at(self, seconds: float):
+        if not len(self.frames):
+            return None
+        i = int(max(0.0, seconds) / self.interval + 0.5)
+        return self.frames[min(i, len(self.frames) - 1)]
+
+    def thumbnail(self):
+        # A frame a little way in, past black leaders and fade-ins
+        if not len(self.frames):
+            return None
+        return self.frames[min(len(self.frames) - 1, len(self.frames) // 10)]
+
+
+def sprite_paths(file_path: str):
+    base = os.path.join(cache_dir("thumbnails"), file_key(file_path))
+    return base + ".npy", base + ".json"
+
+
+def build_sprite(file_path: str, width: int = SPRITE_WIDTH, max_frames: int = SPRITE_MAX_FRAMES,
+                 stop_flag=None) -> Sprite:
+    # One ffmpeg pass: sample with the fps filter, scale, and pipe raw RGB straight
+    # into the array that gets saved
+    src_w, src_h, _, _, duration = probe_video(file_path)
+    if src_w <= 0 or src_h <= 0:
+        raise RuntimeError(f"no video stream in {file_path}")
+    w = width - width % 2
+    h = max(2, int(round(w * src_h / src_w)) // 2 * 2)
+    interval = max(SPRITE_MIN_INTERVAL, duration / max_frames) if duration > 0 else SPRITE_MIN_INTERVAL
+
+    args = [
+        find_ffmpeg(), "-v", "error", "-i", file_path, "-an", "-sn",
+        "-vf", f"fps={1.0 / interval:.6f},scale={w}:{h}",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+    ]
+    proc = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        bufsize=0,
+        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+    )
+    frames = np.empty((max_frames, h, w, 3), dtype=np.uint8)
+    count = 0
+    try:
+        frame_bytes = w * h * 3
+        while count < max_frames:
+            if stop_flag is not None and stop_flag.is_set():
+                raise RuntimeError("cancelled")
+            view = memoryview(frames[count].reshape(-1))
+            got = 0
+            while got < frame_bytes:
+                n = proc.stdout.readinto(view[got:])
+                if not n:
+                    break
+                got += n
+            if got < frame_bytes:
+                break
+            count += 1
+    finally:
+        kill_process(proc)
+    if count == 0:
+        raise RuntimeError(f"no frames decoded from {file_path}")
+    return Sprite(frames[:count], interval, duration)
+
+
+def save_sprite(file_path: str, sprite: Sprite):
+    npy_path, meta_path = sprite_paths(file_path)
+    tmp = npy_path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(sprite.frames))
+    os.replace(tmp, npy_path)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"version": SPRITE_VERSION, "interval": sprite.interval, "duration": sprite.duration}, f)
+
+
+def load_sprite(file_path: str):
+    try:
+        npy_path, meta_path = sprite_paths(file_path)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != SPRITE_VERSION:
+            return None
+        frames = np.load(npy_path, mmap_mode="r")
+    except Exception:
+        return None
+    touch(npy_path)
+    touch(meta_path)
+    return Sprite(frames, meta["interval"], meta["duration"])
+
+
+# === Background cache ===
+class ThumbnailCache:
+    # Builds sprites one file at a time on a worker thread. The UI asks with
+    # get()/request() and polls ready() from its tick to learn what finished.
+    def __init__(self, limit_mb: float = None, memory_items: int = 32):
+        if limit_mb is None:
+            limit_mb = float(os.environ.get("GESTURE_PLAYER_THUMB_CACHE_MB", CACHE_LIMIT_MB))
+        self.limit_bytes = int(limit_mb * 1024 * 1024)
+        self.memory_items = int(memory_items)
+        self.sprites = OrderedDict()  # path -> Sprite, most recently used last
+        self.failed = set()
+        self.queue = deque()
+        self.done = deque()
+        self.cond = threading.Condition()
+        self.stop_flag = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def get(self, file_path: str):
+        # Sprite if it is in memory or on disk; never builds
+        with self.cond:
+            sprite = self.sprites.get(file_path)
+            if sprite is not None:
+                self.sprites.move_to_end(file_path)
+                return sprite
+        sprite = load_sprite(file_path)
+        if sprite is not None:
+            self._remember(file_path, sprite)
+        return sprite
+
+    def request(self, file_path: str, urgent: bool = False):
+        with self.cond:
+            if file_path in self.failed or file_path in self.sprites:
+                return
+            if file_path in self.queue:
+                if not urgent:
+                    return
+                self.queue.remove(file_path)
+            if urgent:
+                self.queue.appendleft(file_path)
+            else:
+                self.queue.append(file_path)
+            self.cond.notify()
+        self.start()
+
+    def ready(self):
+        # Paths whose sprite finished since the last call
+        items = []
+        while self.done:
+            items.append(self.done.popleft())
+        return items
+
+    def _remember(self, file_path: str, sprite: Sprite):
+        with self.cond:
+            self.sprites[file_path] = sprite
+            self.sprites.move_to_end(file_path)
+            while len(self.sprites) > self.memory_items:
+                self.sprites.popitem(last=False)
+
+    def _run(self):
+        while not self.stop_flag.is_set():
+            with self.cond:
+                while not self.queue and not self.stop_flag.is_set():
+                    self.cond.wait(0.5)
+                if self.stop_flag.is_set():
+                    return
+                file_path = self.queue.popleft()
+            try:
+                if load_sprite(file_path) is None:
+                    save_sprite(file_path, build_sprite(file_path, stop_flag=self.stop_flag))
+                    prune_lru("thumbnails", self.limit_bytes, keep=(file_key(file_path),))
+                sprite = load_sprite(file_path)
+                if sprite is None:
+                    raise RuntimeError("sprite missing after build")
+                self._remember(file_path, sprite)
+                self.done.append(file_path)
+            except Exception as e:
+                if not self.stop_flag.is_set():
+                    print(f"⚠️ Thumbnail build failed for {os.path.basename(file_path)}: {e}")
+                    self.failed.add(file_path)
+
+    def stop(self):
+        self.stop_flag.set()
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        self.thread = None
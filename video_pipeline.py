@@ -0,0 +1,336 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from perf import profiler
+
+# OpenCV's FFmpeg backend seeks to (target - 16) and decodes forward from the
+# keyframe before that, so a seek onto a keyframe still decodes the previous GOP
+OPENCV_SEEK_PREROLL = 16
+
+# Above 1x only every Nth frame is converted and shown, N chosen so that at
+# least this many frames per second still reach the screen
+PRESENT_FPS = 30.0
+
+
+def frame_step_for(rate: float, fps: float) -> int:
+    if rate <= 1.0 or fps <= 0:
+        return 1
+    return max(1, int(rate * fps / PRESENT_FPS))
+
+
+def fit_size(src_width, src_height, box_width, box_height):
+    # Aspect-fit (src_width x src_height) inside the box, never returning a zero dimension
+    box_width = max(1, int(box_width))
+    box_height = max(1, int(box_height))
+    if src_width <= 0 or src_height <= 0:
+        return box_width, box_height
+    video_ratio = src_width / src_height
+    if video_ratio > box_width / box_height:
+        return box_width, max(1, int(box_width / video_ratio))
+    return max(1, int(box_height * video_ratio)), box_height
+
+
+VideoInfo = namedtuple("VideoInfo", ["width", "height", "fps", "frame_count", "duration"])
+
+
+def probe_video(file_path: str) -> VideoInfo:
+    # Container metadata from a throwaway capture; never touches a playing decoder
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            raise RuntimeError(f"cannot open {file_path}")
+        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+    finally:
+        cap.release()
+    return VideoInfo(width, height, fps, frames, frames / fps if fps > 0 else 0.0)
+
+
+# === Frame ring ===
+class FrameRing:
+    # Bounded pool of preallocated RGB frames. The decoder owns a slot between
+    # acquire() and commit(); the renderer owns the slot it is currently showing
+    # until its next pop. Everything else is either free or ready, in pts order.
+    def __init__(self, capacity: int = 8):
+        self.capacity = int(capacity)
+        self.cond = threading.Condition()
+        self.buffers = [None] * self.capacity
+        self.free = deque(range(self.capacity))
+        self.ready = deque()  # (slot, pts, frame_index)
+        self.held = None
+        self.generation = 0
+        self.dropped = 0
+
+    def buffer(self, slot: int, width: int, height: int):
+        # Only called by the slot owner, so the buffer can be swapped without the lock
+        buf = self.buffers[slot]
+        if buf is None or buf.shape[0] != height or buf.shape[1] != width:
+            buf = np.empty((height, width, 3), dtype=np.uint8)
+            self.buffers[slot] = buf
+        return buf
+
+    def acquire(self, timeout: float = 0.05):
+        with self.cond:
+            if not self.free:
+                self.cond.wait(timeout)
+            if not self.free:
+                return None
+            return self.free.popleft()
+
+    def release(self, slot: int):
+        with self.cond:
+            self.free.append(slot)
+            self.cond.notify_all()
+
+    def commit(self, slot: int, generation: int, pts: float, frame_index: int):
+        with self.cond:
+            if generation != self.generation:
+                # Decoded before a flush; the frame belongs to the old position
+                self.free.append(slot)
+            else:
+                self.ready.append((slot, pts, frame_index))
+            self.cond.notify_all()
+
+    def flush(self):
+        with self.cond:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self.generation += 1
+        while self.ready:
+            self.free.append(self.ready.popleft()[0])
+        if self.held is not None:
+            self.free.append(self.held)
+            self.held = None
+        self.cond.notify_all()
+
+    def __len__(self):
+        return len(self.ready)
+
+    def next_pts(self):
+        with self.cond:
+            return self.ready[0][1] if self.ready else None
+
+    def pop_due(self, now_pts: float):
+        # Newest frame with pts <= now_pts; older due frames are late and get skipped
+        with self.cond:
+            chosen = None
+            while self.ready and self.ready[0][1] <= now_pts:
+                if chosen is not None:
+                    self.free.append(chosen[0])
+                    self.dropped += 1
+                chosen = self.ready.popleft()
+            if chosen is None:
+                return None
+            return self._hold_locked(chosen)
+
+    def pop_next(self):
+        with self.cond:
+            if not self.ready:
+                return None
+            return self._hold_locked(self.ready.popleft())
+
+    def _hold_locked(self, entry):
+        slot, pts, frame_index = entry
+        if self.held is not None:
+            self.free.append(self.held)
+        self.held = slot
+        self.cond.notify_all()
+        return self.buffers[slot], pts, frame_index
+
+
+# === Background decoder ===
+class VideoDecoder:
+    backend = "opencv"
+
+    def __init__(self, file_path: str, capacity: int = 8, info: VideoInfo = None):
+        # Subclasses that decode some other way pass `info` and never open a capture
+        self.file_path = file_path
+        self.cap = cv2.VideoCapture(file_path) if info is None else None
+        self.fps = 0.0
+        self.frame_count = 0
+        self.width = 0
+        self.height = 0
+        if info is not None:
+            self.width, self.height, self.fps, self.frame_count, _ = info
+        elif self.cap.isOpened():
+            self.fps = float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0)
+            self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+            self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+            self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+
+        self.ring = FrameRing(capacity)
+        self.display_size = (max(1, self.width), max(1, self.height))
+        self.frame_step = 1  # see set_rate
+        self.seek_target = None
+        self.next_index = 0
+        self.position = 0  # index of the next frame the renderer expects
+        self.eof = False
+        self.stop_flag = threading.Event()
+        self.thread = None
+        self._scaled = None
+        self.index = None  # KeyframeIndex, set once the background scan finishes
+        self.seek_times = deque(maxlen=100)
+
+    def is_opened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.fps if self.fps > 0 else 0.0
+
+    def frame_time(self, frame_index: int) -> float:
+        return frame_index / self.fps if self.fps > 0 else 0.0
+
+    def set_index(self, index):
+        self.index = index
+
+    def seek_stats(self) -> dict:
+        times = sorted(self.seek_times)
+        if not times:
+            return {"count": 0}
+        return {
+            "count": len(times),
+            "p50_ms": times[len(times) // 2] * 1000.0,
+            "max_ms": times[-1] * 1000.0,
+            "indexed": self.index is not None,
+        }
+
+    def set_display_box(self, box_width: int, box_height: int):
+        self.display_size = fit_size(self.width, self.height, box_width, box_height)
+
+    def set_rate(self, rate: float):
+        self.frame_step = frame_step_for(rate, self.fps)
+
+    def start(self):
+        if not self.is_opened() or self.thread is not None:
+            return
+        self.stop_flag.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def seek(self, frame_index: int):
+        frame_index = max(0, int(frame_index))
+        if self.frame_count > 0:
+            frame_index = min(frame_index, self.frame_count - 1)
+        with self.ring.cond:
+            self.seek_target = frame_index
+            self.position = frame_index
+            self.eof = False
+            self.ring._flush_locked()
+
+    def finished(self) -> bool:
+        return self.eof and len(self.ring) == 0
+
+    def pop_due(self, now_pts: float):
+        item = self.ring.pop_due(now_pts)
+        if item is not None:
+            self.position = item[2] + 1
+        return item
+
+    def pop_next(self):
+        item = self.ring.pop_next()
+        if item is not None:
+            self.position = item[2] + 1
+        return item
+
+    def _run(self):
+        try:
+            while not self.stop_flag.is_set():
+                slot = self.ring.acquire()
+                if slot is None:
+                    continue
+
+                with self.ring.cond:
+                    target, self.seek_target = self.seek_target, None
+                    generation = self.ring.generation
+                    at_eof = self.eof
+                if target is not None:
+                    t0 = time.perf_counter()
+                    self._seek_to(target)
+                    elapsed = time.perf_counter() - t0
+                    self.seek_times.append(elapsed)
+                    profiler.record("video_seek", elapsed, t0)
+                elif at_eof:
+                    self.ring.release(slot)
+                    self.stop_flag.wait(0.02)
+                    continue
+
+                t0 = profiler.start()
+                ret, frame = self.cap.read()
+                profiler.stop("video_decode", t0)
+                if not ret:
+                    self.ring.release(slot)
+                    with self.ring.cond:
+                        if generation == self.ring.generation:
+                            self.eof = True
+                    continue
+
+                t0 = profiler.start()
+                self.convert_into(frame, slot)
+                profiler.stop("video_scale", t0)
+                self.ring.commit(slot, generation, self.frame_time(self.next_index), self.next_index)
+                self.next_index += 1
+                if self.frame_step > 1:
+                    # grab() decodes without the colour conversion, scaling and copy into the ring
+                    t0 = profiler.start()
+                    for _ in range(self.frame_step - 1):
+                        if not self.cap.grab():
+                            break
+                        self.next_index += 1
+                    profiler.stop("video_skip", t0)
+        except Exception as e:
+            print(f"⚠️ Video decoder error: {e}")
+            self.eof = True
+
+    def _seek_to(self, target: int):
+        # cap.set() always restarts decoding from a keyframe, even when the target is
+        # a few frames ahead in the GOP we are already decoding. With a keyframe index
+        # we know what that costs, and grab() forward instead whenever it is cheaper.
+        # The index only makes that choice: OpenCV cannot be pointed at a keyframe
+        # (POS_FRAMES and POS_MSEC both preroll), but cap.set(target) lands on the
+        # planned keyframe anyway, since the plan models that preroll.
+        if self.index is not None:
+            plan = self.index.plan_seek(self.next_index, target, preroll=OPENCV_SEEK_PREROLL)
+            if plan[0] == "grab":
+                for _ in range(plan[1]):
+                    if not self.cap.grab():
+                        break
+                self.next_index = target
+                return
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        self.next_index = target
+
+    def convert_into(self, frame, slot: int):
+        width, height = self.display_size
+        buf = self.ring.buffer(slot, width, height)
+        if frame.shape[1] != width or frame.shape[0] != height:
+            # Scale first so the colour conversion only touches display-sized pixels
+            if self._scaled is None or self._scaled.shape != buf.shape:
+                self._scaled = np.empty_like(buf)
+            cv2.resize(frame, (width, height), dst=self._scaled)
+            frame = self._scaled
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buf)
+
+    def release(self):
+        self.stop_flag.set()
+        with self.ring.cond:
+            self.ring.cond.notify_all()
+        if self.thread and self.thread.is_alive() and threading.current_thread() != self.thread:
+            try:
+                self.thread.join(timeout=1.0)
+            except Exception:
+                pass
+        self.thread = None
+        if self.cap is not None:
+            try:
+                self.cap.release()
+            except Exception:
+                pass
+        self.cap = None